@@ -0,0 +1,62 @@
+"""
+Spread between "simultaneous" events: one send per event vs one batched send.
+
+Runs the comma-grouped `开关暂停` timeline from config.ini (`0 mouse_up left,
+key_down esc`) on the scheduler with a RecordingBackend. `SEND_COST` emulates
+the cost of one SendInput call. Run from the project root:
+
+    python benchmarks/bench_batching.py
+"""
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.backends import RecordingBackend
+from src.control import parse_config
+from src.log import log
+from src.plan import compile_timelines
+from src.runners import OneShotRun
+from src.scheduler import Scheduler
+
+RUNS = 200
+SEND_COST = 50e-6
+
+
+def measure(batched: bool):
+    backend = RecordingBackend(batched=batched, send_cost=SEND_COST)
+    scheduler = Scheduler(on_batch_end=backend.flush)
+    timelines = parse_config(os.path.join(ROOT, 'config.ini'))
+    compile_timelines(timelines, lambda target: None, backend)
+    timeline = next(t for t in timelines if t.name == '开关暂停')
+
+    spreads = []
+    for _ in range(RUNS):
+        backend.clear()
+        OneShotRun(timeline, scheduler, lambda key: False, backend=backend).start()
+        while scheduler.run_pending() is not None:
+            pass
+        spreads.extend(backend.spreads())
+    return spreads
+
+
+def main():
+    log.set_level('warning')  # Every run logs at info level, from the logger's own thread
+    _stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        results = {name: measure(batched) for name, batched in (('per-event', False), ('batched', True))}
+    finally:
+        sys.stdout.close()
+        sys.stdout = _stdout
+
+    print(f"{'backend':<10} | {'median us':>10} | {'p99 us':>10}")
+    print("-" * 36)
+    for name, spreads in results.items():
+        p99 = statistics.quantiles(spreads, n=100)[98]
+        print(f"{name:<10} | {statistics.median(spreads) * 1e6:>10.1f} | {p99 * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Concurrency policies under high-rate triggers, and the run-state under races.
+
+Part 1 presses the trigger of a short OneShot timeline (two actions 5 ms
+apart) every millisecond for a while, through the real activation path
+(`trigger_timeline` on a Scheduler with a RecordingBackend), once per
+`Concurrency:` policy with `Cooldown: 0`. It reports what the run-state
+counted, how many runs actually played (events / actions) and what a
+trigger costs on the pressing thread.
+
+Part 2 hammers one RunState from several threads (admit, attach, exit and
+queued launches with a tiny switch interval) and checks that nothing was
+lost: every admitted or queued activation ran and exited, no more than N
+ran at once. Restart drops a trigger that lands while the instance it would
+replace has been admitted but not attached yet. Run from the project root:
+
+    python benchmarks/bench_concurrency.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import control
+from src.backends import RecordingBackend
+from src.concurrency import RESTART, START, RunState
+from src.control import Timeline, trigger_timeline
+from src.log import log
+from src.plan import compile_timelines
+from src.scheduler import Scheduler
+from src.window import FakeWindowTracker
+
+PRESSES = 400
+PRESS_INTERVAL = 0.001
+POLICIES = (('drop', 1), ('queue', 4), ('restart', 1), ('parallel', 4))
+
+THREADS = 4
+ROUNDS = 20000
+
+
+def high_rate(policy: str, limit: int):
+    control.backend = RecordingBackend()
+    control.engine = Scheduler(on_batch_end=control.backend.flush)
+    control.engine.start()
+    t = Timeline("burst")
+    t.actions = [(0.0, 'press_key', ['a']), (0.005, 'press_key', ['b'])]
+    t.concurrency, t.concurrency_limit, t.cooldown = policy, limit, 0.0
+    compile_timelines([t], control.run_timeline_async, control.backend)
+    window = FakeWindowTracker("")
+    cost = 0.0
+    for _ in range(PRESSES):
+        start = time.perf_counter()
+        trigger_timeline(t, None, window, {}, control.engine.now())
+        cost += time.perf_counter() - start
+        time.sleep(PRESS_INTERVAL)
+    deadline = time.perf_counter() + 2.0
+    while (t.run_state.active or t.run_state.pending) and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    control.engine.stop()
+    events = control.backend.events
+    played = sum(1 for e in events if e[2:] == ('press_key', ('a',)))
+    completed = sum(1 for e in events if e[2:] == ('press_key', ('b',)))
+    return t.run_state, played, completed, cost / PRESSES
+
+
+class _Run:
+    pass
+
+
+def race_run_state(policy: str, limit: int):
+    state = RunState()
+    guard = threading.Lock()
+    totals = {'launched': 0, 'overlap': 0}
+
+    def observe():
+        with state.lock:
+            attached = len(state.runs)
+        with guard:
+            totals['overlap'] = max(totals['overlap'], attached)
+
+    def launch():
+        run = _Run()
+        state.attach(run)
+        observe()
+        with guard:
+            totals['launched'] += 1
+        return run
+
+    def worker():
+        for _ in range(ROUNDS):
+            result, victim = state.admit(policy, limit, None, 0.0, launch)
+            if result != START and result != RESTART:
+                continue
+            run = _Run()
+            state.attach(run)
+            observe()
+            # The run ends; queued activations its slot goes to run and end in turn
+            queued = state.exit(run)
+            while queued is not None:
+                queued = state.exit(queued())
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lost = state.queued - totals['launched']
+    clean = state.active == 0 and not state.runs and not state.pending and lost == 0
+    return state, totals['overlap'], lost, clean
+
+
+def main():
+    log.set_level('warning')  # Every run logs at info level
+    print(f"{PRESSES} presses, one every {PRESS_INTERVAL * 1e3:g} ms, on a 5 ms OneShot with Cooldown 0")
+    print(f"{'policy':<11} | {'started':>7} | {'dropped':>7} | {'queued':>6} | {'restarted':>9} | "
+          f"{'played':>6} | {'completed':>9} | {'us/trigger':>10}")
+    print("-" * 91)
+    for policy, limit in POLICIES:
+        state, played, completed, cost = high_rate(policy, limit)
+        name = policy if policy in ('drop', 'restart') else f"{policy} {limit}"
+        print(f"{name:<11} | {state.started:>7} | {state.dropped:>7} | {state.queued:>6} | {state.restarted:>9} | "
+              f"{played:>6} | {completed:>9} | {cost * 1e6:>10.1f}")
+        assert state.started == played, (state.started, played)
+    print()
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        print(f"{THREADS} threads x {ROUNDS} activations")
+        print(f"{'policy':<11} | {'started':>7} | {'dropped':>7} | {'queued':>6} | "
+              f"{'max at once':>11} | {'lost':>4} | {'consistent':>10}")
+        print("-" * 76)
+        for policy, limit in (('parallel', 2), ('queue', 4), ('restart', 1)):
+            state, overlap, lost, clean = race_run_state(policy, limit)
+            print(f"{policy + ' ' + str(limit):<11} | {state.started:>7} | {state.dropped:>7} | "
+                  f"{state.queued:>6} | {overlap:>11} | {lost:>4} | {'yes' if clean else 'NO':>10}")
+            assert clean and overlap <= limit
+    finally:
+        sys.setswitchinterval(switch)
+    log.stop()
+
+
+if __name__ == "__main__":
+    main()
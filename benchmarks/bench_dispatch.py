@@ -0,0 +1,82 @@
+"""
+Per-action dispatch cost: legacy `execute_action_wrapper` vs compiled plan.
+
+A no-op input backend is used so only the dispatch overhead is measured and
+no real input is sent. Run from the project root:
+
+    python benchmarks/bench_dispatch.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import control
+from src.backends import InputBackend
+from src.control import Timeline, execute_action_wrapper
+from src.plan import compile_timelines
+
+
+class NullBackend(InputBackend):
+    name = "null"
+
+    def key_down(self, key): pass
+    def key_up(self, key): pass
+    def press(self, key): pass
+    def mouse_down(self, button='left'): pass
+    def mouse_up(self, button='left'): pass
+    def click(self, button='left'): pass
+    def move_to(self, x, y): pass
+    def move(self, dx, dy): pass
+
+ITERATIONS = 200_000
+
+# run_timeline and wait are left out: both measure thread start / sleep time, not dispatch.
+ACTIONS = [
+    (0.0, 'key_down', ['esc']),
+    (0.001, 'key_up', ['esc']),
+    (0.007, 'mouse_down', ['left']),
+    (0.008, 'mouse_up', ['left']),
+    (0.010, 'move_mouse_relative', ['0', '-15']),
+    (0.020, 'move_mouse', ['960', '540']),
+    (0.030, 'click_mouse', []),
+    (0.070, 'press_key', ['3']),
+]
+
+
+def bench_legacy(timelines, actions):
+    start = time.perf_counter_ns()
+    for _ in range(ITERATIONS // len(actions)):
+        for _, command, args in actions:
+            execute_action_wrapper(command, args, timelines)
+    return (time.perf_counter_ns() - start) / ITERATIONS
+
+
+def bench_compiled(plan):
+    start = time.perf_counter_ns()
+    for _ in range(ITERATIONS // len(plan)):
+        for action in plan:
+            action.func()
+    return (time.perf_counter_ns() - start) / ITERATIONS
+
+
+def main():
+    timeline = Timeline("bench")
+    timeline.actions = list(ACTIONS)
+    # A realistic number of sibling timelines for the legacy name lookups
+    timelines = [timeline] + [Timeline(f"other_{i}") for i in range(20)]
+    control.backend = NullBackend()
+    compile_timelines(timelines, lambda target: None, control.backend)
+
+    legacy = bench_legacy(timelines, ACTIONS)
+    compiled = bench_compiled(timeline.plan)
+    print(f"{'path':<12} | {'ns/action':>10}")
+    print("-" * 26)
+    print(f"{'legacy':<12} | {legacy:>10.1f}")
+    print(f"{'compiled':<12} | {compiled:>10.1f}")
+    print(f"speedup: {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
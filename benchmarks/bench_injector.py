@@ -0,0 +1,103 @@
+"""
+Injection jitter: dispatch thread / worker pool vs the dedicated injector.
+
+Schedules single key presses at known deadlines and measures when the
+RecordingBackend actually sees them (lateness = backend call - deadline),
+once on an idle process and once with GIL contention from a 1 ms trigger
+poll loop over 500 timelines and a busy Python thread. The injector runs
+at normal priority and with priority `high` pinned to the first allowed CPU
+(`os.sched_setaffinity`; raising the priority needs root on Linux).
+Run from the project root:
+
+    python benchmarks/bench_injector.py
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tick import make_timelines
+
+from src.backends import RecordingBackend
+from src.injector import InjectorBackend
+from src.pool import WorkerPool
+from src.samples import percentile
+from src.scheduler import Scheduler
+from src.triggers import PollingTriggerSource, TriggerIndex
+
+RUNS = 1000
+
+
+class Load:
+    """Trigger poll loop plus a thread that keeps the interpreter busy."""
+
+    def __init__(self):
+        self.source = PollingTriggerSource(TriggerIndex(make_timelines(500)), read_vk=lambda vk: False)
+        self._stopping = False
+        self._threads = [threading.Thread(target=self.source.run, args=(lambda *a: None,), daemon=True),
+                         threading.Thread(target=self._busy, daemon=True)]
+
+    def _busy(self):
+        while not self._stopping:
+            # Formatting work in bursts, like a console writer
+            for i in range(2000):
+                "%s %d %.3f" % ("line", i, i * 0.5)
+            time.sleep(0.0005)
+
+    def __enter__(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopping = True
+        self.source.stop()
+        for thread in self._threads:
+            thread.join()
+
+
+def measure(kind: str):
+    recorder = RecordingBackend()
+    backend = recorder
+    pool = None
+    if kind == 'pool':
+        pool = WorkerPool(2)
+    elif kind.startswith('injector'):
+        cpus = (min(os.sched_getaffinity(0)),) if kind == 'injector high+pin' and hasattr(os, 'sched_getaffinity') else ()
+        backend = InjectorBackend(recorder, 'high' if cpus else 'normal', cpus).start()
+    scheduler = Scheduler(executor=pool)
+    scheduler.start()
+    deadlines = []
+    for i in range(RUNS):
+        deadline = time.perf_counter() + random.uniform(0.002, 0.004)
+        deadlines.append(deadline)
+        scheduler.call_at(deadline, backend.press, 'a')
+        time.sleep(deadline - time.perf_counter() + 0.0005)
+    time.sleep(0.01)
+    scheduler.stop()
+    if isinstance(backend, InjectorBackend):
+        backend.stop()
+    lateness = sorted((t - d) * 1e6 for (t, _, _, _), d in zip(recorder.events, deadlines))
+    return lateness
+
+
+def main():
+    kinds = ('dispatch thread', 'pool', 'injector', 'injector high+pin')
+    print(f"{'load':<6} | {'injection on':<18} | {'p50 us':>7} | {'p90 us':>7} | {'p99 us':>7} | {'max us':>8}")
+    print("-" * 68)
+    for loaded in (False, True):
+        for kind in kinds:
+            if loaded:
+                with Load():
+                    lateness = measure(kind)
+            else:
+                lateness = measure(kind)
+            print(f"{'busy' if loaded else 'idle':<6} | {kind:<18} | {percentile(lateness, 0.5):>7.0f} | "
+                  f"{percentile(lateness, 0.9):>7.0f} | {percentile(lateness, 0.99):>7.0f} | {lateness[-1]:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Control channel: round-trip latency and sustained commands per second.
+
+Runs the real request path on Linux: a ControlServer on a loopback port, a
+trigger loop (polling with a fake key reader, or the event-driven queue
+source) that runs requests between ticks, and `control_command` /
+`trigger_timeline` against OneShot timelines compiled to a RecordingBackend.
+Run from the project root:
+
+    python benchmarks/bench_ipc.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import control
+from src.backends import RecordingBackend
+from src.control import Timeline, control_command
+from src.ipc import ControlClient, ControlServer
+from src.log import log
+from src.plan import by_name, compile_timelines
+from src.samples import percentile
+from src.scheduler import Scheduler
+from src.triggers import PollingTriggerSource, QueueTriggerSource, TriggerIndex
+from src.window import FakeWindowTracker
+
+ROUND_TRIPS = 1000
+BATCH = 50
+SUSTAINED = 2.0  # Seconds per throughput run
+
+
+def setup(mode: str):
+    control.backend = RecordingBackend()
+    control.engine = Scheduler(on_batch_end=control.backend.flush)
+    control.engine.start()
+    timelines = [Timeline(f"t{i}") for i in range(100)]
+    for t in timelines:
+        t.actions = [(0.0, 'press_key', ['a'])]
+    compile_timelines(timelines, control.run_timeline_async, control.backend)
+    names = by_name(timelines)
+    window = FakeWindowTracker("")
+    last_triggered = {}
+    index = TriggerIndex(timelines)
+    source = PollingTriggerSource(index, read_vk=lambda vk: False) if mode == 'poll' else QueueTriggerSource(index)
+    server = ControlServer(lambda verb, name: control_command(verb, name, names, window, last_triggered),
+                           port=0, wake=source.wake).start()
+
+    def on_tick():
+        if not server.requests.empty():
+            server.process()
+
+    thread = threading.Thread(target=source.run, args=(lambda *a: None, on_tick), daemon=True)
+    thread.start()
+    return server, source, thread
+
+
+def main():
+    log.set_level('warning')  # Every trigger logs at info level
+    print(f"{'trigger loop':<12} | {'request':<22} | {'p50 us':>7} | {'p99 us':>7} | {'cmds/s':>9}")
+    print("-" * 70)
+    for mode in ('poll', 'queue'):
+        server, source, thread = setup(mode)
+        client = ControlClient(server.port)
+        for name, commands in (('status', ['status t1']),
+                               ('trigger', ['trigger t{}']),
+                               (f'{BATCH} x status / request', ['status t1'] * BATCH)):
+            samples = []
+            for i in range(ROUND_TRIPS // (10 if len(commands) > 1 else 1)):
+                request = [c.format(i % 100) for c in commands]
+                start = time.perf_counter()
+                replies = client.request(*request)
+                samples.append(time.perf_counter() - start)
+                assert len(replies) == len(request), replies
+            samples.sort()
+            count = 0
+            end = time.perf_counter() + SUSTAINED
+            while time.perf_counter() < end:
+                count += len(client.request(*[c.format(count % 100) for c in commands]))
+            print(f"{mode:<12} | {name:<22} | {percentile(samples, 0.5) * 1e6:>7.0f} | "
+                  f"{percentile(samples, 0.99) * 1e6:>7.0f} | {count / SUSTAINED:>9.0f}")
+        client.close()
+        source.stop()
+        thread.join()
+        server.stop()
+        control.engine.stop()
+    log.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cost of logging on the calling (dispatch) thread.
+
+Compares a synchronous print() to a console that blocks on every write
+(emulated with a short sleep, like a busy Windows console) with the ring
+logger, where the caller only stores a record and the writer thread pays for
+formatting and output. Disabled debug calls are measured too.
+Run from the project root:
+
+    python benchmarks/bench_logging.py
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.log import INFO, RingLogger
+
+CALLS = 2000
+WRITE_COST = 0.0005
+
+
+class SlowConsole:
+    """Stream whose writes block for WRITE_COST, outside the GIL."""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(WRITE_COST)
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def measure(call):
+    samples = []
+    for i in range(CALLS):
+        t0 = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main():
+    console = SlowConsole()
+    logger = RingLogger(level=INFO, stream=console)
+    cases = [
+        ("print()", lambda i: print(f"[Action] 'timeline {i}' (OneShot) started. Triggered by: e", file=console)),
+        ("log.info (ring)", lambda i: logger.info("[Action] '%s' (OneShot) started. Triggered by: %s", f"timeline {i}", "e")),
+        ("log.debug (disabled)", lambda i: logger.debug("[Debug] Key '%s' detected.", "e")),
+    ]
+    print(f"Caller-side cost per log call over {CALLS} calls, console write blocks {WRITE_COST * 1e6:.0f} us")
+    print(f"{'Method':<22} | {'mean us':>8} | {'p99 us':>8} | {'max us':>8}")
+    print("-" * 56)
+    for label, call in cases:
+        samples = sorted(measure(call))
+        print(f"{label:<22} | {statistics.mean(samples) * 1e6:>8.2f} | "
+              f"{samples[int(0.99 * len(samples))] * 1e6:>8.2f} | {samples[-1] * 1e6:>8.2f}")
+    logger.stop()
+    print(f"\nRing logger wrote {console.lines - CALLS} line(s), dropped {logger.dropped}.")
+
+
+if __name__ == "__main__":
+    main()
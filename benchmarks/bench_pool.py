@@ -0,0 +1,109 @@
+"""
+Worker pool: activation latency and head-of-line blocking.
+
+1. Time from handing off an activation to the first line of its callback:
+   a new threading.Thread per activation (the old run_timeline behaviour)
+   vs. a pre-started WorkerPool.
+2. Two timelines due at the same time, one of them slow (each event blocks
+   in a GIL-releasing sleep, like a SendInput call stuck in the console or
+   driver): how late the fast timeline's event lands when the
+   dispatch thread runs everything vs. with a pool, and the pool's queue wait
+   and saturation numbers for each busy policy.
+
+Run from the project root:
+
+    python benchmarks/bench_pool.py
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backends import RecordingBackend
+from src.pool import POOL_POLICIES, WorkerPool
+from src.samples import percentile
+from src.scheduler import Scheduler
+
+RUNS = 500
+SLOW_COST = 0.002
+
+
+class BlockingBackend(RecordingBackend):
+    """Each send blocks outside the GIL, as a ctypes call into SendInput does."""
+
+    def _send(self):
+        time.sleep(self.send_cost)
+
+
+def activation_latency(kind: str):
+    latencies = []
+    started = threading.Event()
+    entered = [0.0]
+
+    def callback():
+        entered[0] = time.perf_counter()
+        started.set()
+
+    pool = WorkerPool(2) if kind == 'pool' else None
+    if pool:
+        pool.start()
+    for _ in range(RUNS):
+        started.clear()
+        t0 = time.perf_counter()
+        if pool:
+            pool.submit(callback)
+        else:
+            threading.Thread(target=callback, daemon=True).start()
+        started.wait()
+        latencies.append(entered[0] - t0)
+        time.sleep(0.0005)
+    if pool:
+        pool.stop()
+    return latencies
+
+
+def head_of_line(workers: int, policy: str = 'queue'):
+    slow = BlockingBackend(send_cost=SLOW_COST)
+    fast = RecordingBackend()
+    pool = WorkerPool(workers, policy) if workers else None
+    scheduler = Scheduler(executor=pool)
+    scheduler.start()
+    lateness = []
+    for _ in range(RUNS // 5):
+        deadline = time.perf_counter() + 0.003
+        # Slow event first: on a single thread the fast one waits behind it
+        scheduler.call_at(deadline, slow.press, 'a')
+        scheduler.call_at(deadline, fast.press, 'b')
+        time.sleep(0.008)
+        lateness.append(fast.events[-1][0] - deadline)
+    scheduler.stop()
+    return lateness, pool.stats if pool else None
+
+
+def main():
+    print(f"Activation hand-off latency over {RUNS} activations")
+    print(f"{'Method':<22} | {'p50 us':>8} | {'p99 us':>8} | {'max us':>8}")
+    print("-" * 56)
+    for kind, label in (('thread', 'new Thread per call'), ('pool', 'pre-started pool')):
+        samples = sorted(activation_latency(kind))
+        print(f"{label:<22} | {statistics.median(samples) * 1e6:>8.0f} | "
+              f"{percentile(samples, 0.99) * 1e6:>8.0f} | {max(samples) * 1e6:>8.0f}")
+
+    print()
+    print(f"Fast event lateness behind a {SLOW_COST * 1000:.0f} ms event at the same deadline")
+    print(f"{'Executor':<22} | {'p50 us':>8} | {'p99 us':>8} | pool stats")
+    print("-" * 100)
+    cases = [(0, 'queue')] + [(2, policy) for policy in POOL_POLICIES] + [(1, 'queue'), (1, 'inline')]
+    for workers, policy in cases:
+        samples, stats = head_of_line(workers, policy)
+        samples.sort()
+        label = "dispatch thread" if not workers else f"{workers} worker(s), {policy}"
+        print(f"{label:<22} | {statistics.median(samples) * 1e6:>8.0f} | "
+              f"{percentile(samples, 0.99) * 1e6:>8.0f} | {stats if stats else '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Recorder compression: raw transcription vs compressed timeline.
+
+Generates a synthetic capture (a 1000 Hz mouse stream with curves and
+drags, key taps, held keys with OS auto-repeat, clicks) and feeds it to a
+Recorder. Compares a one-to-one transcription with `compress()` output:
+actions, lines, backend calls and the time to dispatch one replay through
+compiled plans, plus where the cursor ends up. Run from the project root:
+
+    python benchmarks/bench_recorder.py
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.plan import compile_timelines
+from src.recorder import Recorder, compress, format_timeline
+
+SECONDS = 10
+REPEAT = 20
+
+
+def synthetic_capture():
+    recorder = Recorder()
+    recorder.move(960, 540, t=0.0)
+    for ms in range(1, SECONDS * 1000):
+        t = ms / 1000.0
+        phase = ms % 2000
+        if phase < 1200:
+            # Wandering camera movement, one sample per millisecond
+            recorder.move(960 + int(300 * math.sin(t * 1.7)), 540 + int(200 * math.sin(t * 2.3)), t=t)
+        if phase == 1300:
+            recorder.button('left', True, t=t)
+        if phase == 1306:
+            recorder.button('left', False, t=t)
+        if phase == 1400:
+            recorder.key('w', True, t=t)
+        if 1400 < phase < 1900 and phase % 33 == 0:
+            recorder.key('w', True, t=t)  # Auto-repeat while held
+        if phase == 1900:
+            recorder.key('w', False, t=t)
+        if phase == 1950:
+            recorder.key('e', True, t=t)
+            recorder.key('shift', True, t=t + 0.002)
+        if phase == 1955:
+            recorder.key('e', False, t=t)
+            recorder.key('shift', False, t=t + 0.001)
+    return recorder
+
+
+def replay_stats(lines):
+    _, timelines, _ = parse_lines(format_timeline(lines, "bench").splitlines())
+    backend = RecordingBackend()
+    compile_timelines(timelines, lambda target: None, backend)
+    plan = timelines[0].plan
+    best = None
+    for _ in range(REPEAT):
+        backend.clear()
+        start = time.perf_counter()
+        for action in plan:
+            action.func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    calls = len(backend.events) + sum(1 for e in backend.events if e[2] in ('press_key', 'click_mouse'))
+    dx = sum(int(args[0]) for _, _, name, args in backend.events if name == 'move_mouse_relative')
+    dy = sum(int(args[1]) for _, _, name, args in backend.events if name == 'move_mouse_relative')
+    return len(plan), calls, best, (960 + dx, 540 + dy)
+
+
+def main():
+    recorder = synthetic_capture()
+    last = next(args for _, kind, args in reversed(recorder.events) if kind == 'move')
+    print(f"{len(recorder.events)} recorded events over {SECONDS} s ({recorder.repeats} auto-repeats dropped), "
+          f"cursor ends at {last}")
+    print(f"{'output':<12} | {'lines':>6} | {'actions':>7} | {'input events':>12} | {'dispatch ms':>11} | {'cursor end':>12}")
+    print("-" * 76)
+    for name, lines in (('raw', compress(recorder.events, 0.0, 0.0, 0.0)), ('compressed', compress(recorder.events))):
+        actions, calls, elapsed, end = replay_stats(lines)
+        print(f"{name:<12} | {len(lines):>6} | {actions:>7} | {calls:>12} | {elapsed * 1e3:>11.2f} | {str(end):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Repeat blocks vs fully expanded timelines: load time, memory, streaming cost.
+
+"Click every 50 ms" farming timelines of growing length, written once as
+one line per action and once as a `repeat` block. Each config is loaded
+(`load_startup` without cache: parse + compile) in a fresh process, which
+reports the load time and how much the peak RSS grew over the process after
+imports (`ru_maxrss`; Unix only, shown as n/a elsewhere). The last columns walk the plan the way a run
+does (`iter_plan`) and report the time per action and the peak Python
+memory while streaming (tracemalloc). Run from the project root:
+
+    python benchmarks/bench_repeat.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.control import load_startup
+from src.plan import iter_plan
+
+MINUTES = (1, 10, 60)
+PERIOD_MS = 50
+
+
+def expanded_config(repetitions: int) -> str:
+    lines = ["[Timeline: farm]", "Trigger: f8"]
+    for i in range(repetitions):
+        lines.append(f"{i * PERIOD_MS} click_mouse left")
+        lines.append(f"{i * PERIOD_MS + 20} move_mouse_relative 0 1")
+    return "\n".join(lines) + "\n"
+
+
+def repeat_config(repetitions: int) -> str:
+    return "\n".join(["[Timeline: farm]", "Trigger: f8",
+                      f"0 repeat {repetitions} {PERIOD_MS}",
+                      "0 click_mouse left",
+                      "20 move_mouse_relative 0 1",
+                      "end"]) + "\n"
+
+
+def peak_rss_kb():
+    """Peak RSS of this process (KB on Linux), or None without the `resource` module."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(path: str):
+    """Runs in a fresh process: load once, report time and peak RSS growth."""
+    base = peak_rss_kb()
+    start = time.perf_counter()
+    _, timelines, errors, _ = load_startup(path, use_cache=False)
+    elapsed = time.perf_counter() - start
+    grown = None if base is None else peak_rss_kb() - base
+    print(json.dumps({'load': elapsed, 'rss_kb': grown, 'errors': errors}))
+
+
+def measure_load(path: str) -> dict:
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure_stream(path: str):
+    _, timelines, _, _ = load_startup(path, use_cache=False)
+    plan = timelines[0].plan
+    start = time.perf_counter()
+    count = 0
+    last = 0.0
+    for offset, _ in iter_plan(plan):
+        count += 1
+        last = offset
+    elapsed = time.perf_counter() - start
+    # Second walk under tracemalloc, which slows it down too much to time it
+    tracemalloc.start()
+    for _ in iter_plan(plan):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, last, elapsed / count, peak
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    print(f"{'length':>6} | {'config':<8} | {'lines':>6} | {'plan':>6} | {'load ms':>8} | {'RSS +KB':>8} | "
+          f"{'actions':>7} | {'ns/action':>9} | {'stream KB':>9}")
+    print("-" * 92)
+    try:
+        for minutes in MINUTES:
+            repetitions = minutes * 60 * 1000 // PERIOD_MS
+            for kind, make in (('expanded', expanded_config), ('repeat', repeat_config)):
+                path = os.path.join(workdir, f"{kind}_{minutes}.ini")
+                text = make(repetitions)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                load = measure_load(path)
+                assert load['errors'] == 0
+                count, last, per_action, peak = measure_stream(path)
+                _, timelines, _, _ = load_startup(path, use_cache=False)
+                print(f"{str(minutes) + ' min':>6} | {kind:<8} | {text.count(chr(10)):>6} | {len(timelines[0].plan):>6} | "
+                      f"{load['load'] * 1e3:>8.1f} | {'n/a' if load['rss_kb'] is None else load['rss_kb']:>8} | {count:>7} | {per_action * 1e9:>9.0f} | "
+                      f"{peak / 1024:>9.1f}")
+                assert count == 2 * repetitions and abs(last - (repetitions - 1) * PERIOD_MS / 1000 - 0.02) < 1e-6
+    finally:
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+    else:
+        main()
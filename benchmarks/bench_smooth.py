@@ -0,0 +1,110 @@
+"""
+Smooth mouse moves: hand-written relative moves vs `move_mouse_smooth`.
+
+Generates configs with many 200 ms, 120 Hz moves written either as one
+`move_mouse_relative` line per step (what configs had to do before) or as
+one `move_mouse_smooth` line, and compares load time (parse + compile) and
+plan size. Dispatch time per move is measured on the compiled plans and
+against computing each step at dispatch time (easing, rounding and the
+delta, as a runtime interpolator would). All three must end on the same
+pixel. Uses easeInOutQuad when pytweening is installed, linear otherwise.
+Run from the project root:
+
+    python benchmarks/bench_smooth.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.plan import compile_timelines, easing_function, smooth_steps
+
+MOVES = 500
+DX, DY, DURATION, RATE = 300, -120, 0.2, 120
+REPEAT = 5
+
+try:
+    EASING = 'easeInOutQuad'
+    easing_function(EASING)
+except ValueError:
+    EASING = 'linear'
+
+
+def handwritten_config():
+    lines = []
+    steps = smooth_steps(DX, DY, DURATION, easing_function(EASING), RATE)
+    for i in range(MOVES):
+        lines.append(f"[Timeline: m{i}]")
+        lines.extend(f"{offset * 1000:.3f} move_mouse_relative {x} {y}" for offset, x, y in steps)
+    return lines
+
+
+def smooth_config():
+    lines = []
+    for i in range(MOVES):
+        lines.append(f"[Timeline: m{i}]")
+        lines.append(f"0 move_mouse_smooth {DX} {DY} {DURATION * 1000:g} {EASING} {RATE:g}")
+    return lines
+
+
+def load(lines, backend):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        _, timelines, _ = parse_lines(lines)
+        compile_timelines(timelines, lambda target: None, backend)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, timelines
+
+
+def dispatch_plan(plan):
+    for action in plan:
+        action.func()
+
+
+def dispatch_runtime(backend, easing):
+    # Interpolate at dispatch time: every step computes its eased position
+    count = round(DURATION * RATE)
+    x = y = 0
+    for i in range(1, count + 1):
+        p = easing(i / count) if i < count else 1.0
+        nx, ny = round(DX * p), round(DY * p)
+        if nx != x or ny != y:
+            backend.move(nx - x, ny - y)
+            x, y = nx, ny
+
+
+def timed_dispatch(backend, run):
+    best = None
+    for _ in range(REPEAT):
+        backend.clear()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    end = (sum(e[3][0] for e in backend.events), sum(e[3][1] for e in backend.events))
+    return best, len(backend.events), end
+
+
+def main():
+    backend = RecordingBackend()
+    easing = easing_function(EASING)
+    print(f"{MOVES} moves of ({DX}, {DY}) over {DURATION * 1000:g} ms at {RATE:g} Hz, easing {EASING}")
+    print(f"{'written as':<21} | {'lines':>6} | {'load ms':>8} | {'plan':>6} | {'us/move':>8} | {'events':>6} | {'cursor end':>11}")
+    print("-" * 83)
+    for name, lines in (('move_mouse_relative', handwritten_config()), ('move_mouse_smooth', smooth_config())):
+        load_time, timelines = load(lines, backend)
+        plan = timelines[0].plan
+        elapsed, events, end = timed_dispatch(backend, lambda: dispatch_plan(plan))
+        print(f"{name:<21} | {len(lines):>6} | {load_time * 1e3:>8.1f} | {sum(len(t.plan) for t in timelines):>6} | "
+              f"{elapsed * 1e6:>8.1f} | {events:>6} | {str(end):>11}")
+    elapsed, events, end = timed_dispatch(backend, lambda: dispatch_runtime(backend, easing))
+    print(f"{'runtime interpolation':<21} | {'-':>6} | {'-':>8} | {'-':>6} | {elapsed * 1e6:>8.1f} | {events:>6} | {str(end):>11}")
+
+
+if __name__ == "__main__":
+    main()
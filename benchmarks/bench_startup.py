@@ -0,0 +1,82 @@
+"""
+Cold vs warm startup: parse + compile vs loading the startup cache.
+
+For generated configs of growing size, measures `load_startup` with an empty
+cache (parse, compile, write the cache entry) and with a warm cache (read and
+rebuild the timelines), plus binding the plans to a backend, which both paths
+do. The last column is a full `python -c "load_startup(...)"` process,
+including interpreter start and imports. Run from the project root:
+
+    python benchmarks/bench_startup.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_dispatch import NullBackend
+from run_suite import generate_config
+
+from src.cache import CACHE_DIR
+from src.control import load_startup
+from src.plan import bind_timelines
+
+SIZES = [(50, 10), (500, 15), (2000, 20), (5000, 25)]
+REPEAT = 3
+
+
+def timed(func):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def process_time(path):
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); from src.control import load_startup; load_startup({path!r})"
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    backend = NullBackend()
+    print(f"{'lines':>7} | {'cold ms':>8} | {'warm ms':>8} | {'bind ms':>8} | {'speedup':>7} | {'proc cold ms':>12} | {'proc warm ms':>12}")
+    print("-" * 82)
+    try:
+        for timelines, actions in SIZES:
+            text = generate_config(timelines, actions)
+            path = os.path.join(workdir, f"gen_{timelines}.ini")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            cache_dir = os.path.join(workdir, CACHE_DIR)
+
+            def cold():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                return load_startup(path)
+
+            cold_time, _ = timed(cold)
+            warm_time, (_, loaded, _, cached) = timed(lambda: load_startup(path))
+            assert cached, "warm load missed the cache"
+            bind_time, _ = timed(lambda: bind_timelines(loaded, lambda target: None, backend))
+
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            proc_cold = process_time(path)
+            proc_warm = min(process_time(path) for _ in range(REPEAT))
+            print(f"{text.count(chr(10)):>7} | {cold_time * 1e3:>8.1f} | {warm_time * 1e3:>8.1f} | {bind_time * 1e3:>8.1f} | "
+                  f"{cold_time / warm_time:>6.1f}x | {proc_cold * 1e3:>12.1f} | {proc_warm * 1e3:>12.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
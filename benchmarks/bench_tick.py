@@ -0,0 +1,80 @@
+"""
+Poll-loop tick cost against the number of timelines.
+
+Compares the old per-timeline scan (key_check for every trigger key of every
+timeline) with the TriggerIndex poll (one query per distinct VK code).
+GetAsyncKeyState is replaced by a fake that reports every key as released,
+which is the common case between presses. Run from the project root:
+
+    python benchmarks/bench_tick.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.control import Timeline
+from src.key_mapping import VK_MAPPING
+from src.triggers import TriggerIndex
+
+TICKS = 2000
+KEY_POOL = ['e', 'q', 't', 'r', 'f', 'xbutton1', 'xbutton2', 'rbutton', 'f1', 'f2', 'f3', 'f4', '1', '2', '3', '4']
+
+
+def fake_get_async_key_state(vk):
+    return 0
+
+
+def legacy_key_check(key_name):
+    # Mirrors the pre-index key_check: lookup + lower() + one API call per call
+    if not key_name:
+        return False
+    vk = VK_MAPPING.get(key_name.lower())
+    if vk is None:
+        if len(key_name) == 1:
+            vk = ord(key_name.upper())
+        else:
+            return False
+    return (fake_get_async_key_state(vk) & 0x8000) != 0
+
+
+def make_timelines(count):
+    timelines = []
+    for i in range(count):
+        t = Timeline(f"t{i}")
+        t.trigger_keys = [KEY_POOL[i % len(KEY_POOL)], KEY_POOL[(i * 7 + 3) % len(KEY_POOL)]]
+        timelines.append(t)
+    return timelines
+
+
+def bench_legacy(timelines):
+    start = time.perf_counter_ns()
+    for _ in range(TICKS):
+        for t in timelines:
+            if t.trigger_keys:
+                for key in t.trigger_keys:
+                    if legacy_key_check(key):
+                        break
+    return (time.perf_counter_ns() - start) / TICKS / 1000
+
+
+def bench_indexed(timelines):
+    index = TriggerIndex(timelines)
+    read_vk = lambda vk: (fake_get_async_key_state(vk) & 0x8000) != 0
+    start = time.perf_counter_ns()
+    for _ in range(TICKS):
+        index.poll(read_vk)
+    return (time.perf_counter_ns() - start) / TICKS / 1000
+
+
+def main():
+    print(f"{'timelines':>9} | {'legacy us/tick':>14} | {'indexed us/tick':>15}")
+    print("-" * 44)
+    for count in (5, 50, 150, 500, 2000):
+        timelines = make_timelines(count)
+        print(f"{count:>9} | {bench_legacy(timelines):>14.2f} | {bench_indexed(timelines):>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Trigger-to-first-action latency: polling vs event-driven trigger source.
+
+A single-action OneShot timeline is triggered repeatedly through each source
+and the time from the key press to the first RecordingBackend event is
+measured. The event-driven case pushes into QueueTriggerSource, the same path
+the pynput hook callbacks use, so it runs on Linux without real hooks.
+Run from the project root:
+
+    python benchmarks/bench_trigger_latency.py
+"""
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backends import RecordingBackend
+from src.concurrency import START
+from src.control import Timeline
+from src.log import log
+from src.plan import compile_timelines
+from src.runners import OneShotRun
+from src.scheduler import Scheduler
+from src.triggers import PollingTriggerSource, QueueTriggerSource, TriggerIndex
+
+RUNS = 300
+TRIGGER_VK = 0x45  # 'e'
+
+
+def measure(mode: str):
+    timeline = Timeline("latency")
+    timeline.trigger_keys = ['e']
+    timeline.actions = [(0.0, 'key_down', ['a'])]
+    backend = RecordingBackend()
+    compile_timelines([timeline], lambda target: None, backend)
+    scheduler = Scheduler(on_batch_end=backend.flush)
+    scheduler.start()
+
+    index = TriggerIndex([timeline])
+    key_down = [False]
+    if mode == 'poll':
+        source = PollingTriggerSource(index, read_vk=lambda vk: key_down[0])
+    else:
+        source = QueueTriggerSource(index)
+
+    def on_key(vk, pressed, detected_at):
+        if pressed and timeline.run_state.admit('drop', 1, None, detected_at)[0] == START:
+            run = OneShotRun(timeline, scheduler, lambda key: False, backend=backend)
+            timeline.run_state.attach(run)
+            scheduler.call_soon(run.start)
+
+    thread = threading.Thread(target=source.run, args=(on_key,), daemon=True)
+    thread.start()
+
+    latencies = []
+    for _ in range(RUNS):
+        # Random phase relative to the poll interval
+        time.sleep(random.uniform(0.002, 0.004))
+        backend.clear()
+        start = time.perf_counter()
+        if mode == 'poll':
+            key_down[0] = True
+        else:
+            source.push(TRIGGER_VK, True)
+        while not backend.events and time.perf_counter() - start < 0.5:
+            time.sleep(0)
+        if backend.events:
+            latencies.append(backend.events[0][0] - start)
+        if mode == 'poll':
+            key_down[0] = False
+        else:
+            source.push(TRIGGER_VK, False)
+        while timeline.is_running:
+            time.sleep(0.0005)
+
+    source.stop()
+    scheduler.stop()
+    thread.join(1.0)
+    return latencies
+
+
+def main():
+    log.set_level('warning')  # Every run logs at info level, from the logger's own thread
+    _stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        results = {mode: measure(mode) for mode in ('poll', 'event')}
+    finally:
+        sys.stdout.close()
+        sys.stdout = _stdout
+
+    print(f"{'source':<8} | {'median ms':>10} | {'p99 ms':>10} | {'max ms':>10}")
+    print("-" * 46)
+    for mode, latencies in results.items():
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(f"{mode:<8} | {statistics.median(latencies) * 1e3:>10.3f} | {p99 * 1e3:>10.3f} | {max(latencies) * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Wait lateness and CPU cost for each wait strategy.
+
+Schedules EVENTS events at random gaps on a running Scheduler and reports how
+late each wait returned (from WaitStats) together with the CPU time the
+process used per second of wall time. Run from the project root:
+
+    python benchmarks/bench_wait.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scheduler import Scheduler
+from src.waiting import HybridWait, SpinWait, calibrate_margin, create_wait_strategy
+
+EVENTS = 300
+GAP = (0.001, 0.02)
+
+
+def measure(strategy):
+    scheduler = Scheduler(wait_strategy=strategy)
+    scheduler.start()
+    rng = random.Random(1)
+    deadline = time.perf_counter() + 0.01
+    for _ in range(EVENTS):
+        deadline += rng.uniform(*GAP)
+        scheduler.call_at(deadline, lambda: None)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    # One long sleep so this thread does not compete with the dispatch thread
+    time.sleep(deadline - wall_start + 0.05)
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    scheduler.stop()
+    return strategy.stats.summary(), cpu
+
+
+def main():
+    margin = calibrate_margin()
+    strategies = [
+        ('spin', SpinWait()),
+        ('hybrid 1ms', HybridWait(0.001)),
+        ('hybrid cal', HybridWait(margin)),
+    ]
+    timer = create_wait_strategy('timer')
+    if timer.name == 'timer':
+        strategies.append(('timer', timer))
+
+    print(f"calibrated hybrid margin: {margin * 1000:.3f} ms")
+    print(f"{'strategy':<11} | {'p50 us':>7} | {'p99 us':>7} | {'max us':>8} | {'spin %':>6} | {'cpu/wall':>8}")
+    print("-" * 62)
+    for name, strategy in strategies:
+        stats, cpu = measure(strategy)
+        print(f"{name:<11} | {stats['p50_us']:>7.1f} | {stats['p99_us']:>7.1f} | {stats['max_us']:>8.1f} | "
+              f"{stats['spin_share'] * 100:>6.1f} | {cpu:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Tick and press cost with many window-scoped timelines.
+
+Builds GAMES profiles of TIMELINES_PER_GAME timelines, each with its own
+`Target:` and eight trigger keys, plus a few global timelines.
+Compares polling with every group active (no per-window index) against the
+active set for one foreground window. Run from the project root:
+
+    python benchmarks/bench_window_profiles.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.control import Timeline
+from src.key_mapping import VK_MAPPING
+from src.triggers import TriggerIndex
+
+TICKS = 2000
+PRESSES = 2000
+GAMES = 20
+TIMELINES_PER_GAME = 50
+GLOBAL_TIMELINES = 5
+KEYS = [k for k in VK_MAPPING if len(k) == 1 or k.startswith(('f', 'numpad'))]
+
+
+def make_timelines():
+    timelines = []
+    for g in range(GAMES):
+        for i in range(TIMELINES_PER_GAME):
+            t = Timeline(f"game{g}_{i}")
+            t.target_window = f"Game {g} Window"
+            t.target_lower = t.target_window.lower()
+            t.trigger_keys = [KEYS[(g * 8 + i % 8) % len(KEYS)]]
+            timelines.append(t)
+    for i in range(GLOBAL_TIMELINES):
+        t = Timeline(f"global_{i}")
+        t.trigger_keys = [f"f{i + 1}"]
+        timelines.append(t)
+    return timelines
+
+
+def bench(index, title_lower):
+    read_vk = lambda vk: False
+    start = time.perf_counter_ns()
+    for _ in range(TICKS):
+        index.poll(read_vk)
+    tick_us = (time.perf_counter_ns() - start) / TICKS / 1000
+
+    # Press handling: every subscriber of a pressed key gets the target check
+    vks = index.vks
+    start = time.perf_counter_ns()
+    for i in range(PRESSES):
+        for binding in index.subscribers[vks[i % len(vks)]]:
+            t = binding.timeline
+            if t.target_lower is not None and t.target_lower not in title_lower:
+                continue
+    press_us = (time.perf_counter_ns() - start) / PRESSES / 1000
+    return len(vks), tick_us, press_us
+
+
+def main():
+    timelines = make_timelines()
+    title = "game 3 window"
+
+    everything = TriggerIndex(timelines)
+    everything.activate(" ".join(everything.targets))  # Every group active
+    profiled = TriggerIndex(timelines)
+    profiled.activate(title)
+
+    print(f"{len(timelines)} timelines, {GAMES} window groups")
+    print(f"{'index':<12} | {'keys':>5} | {'us/tick':>8} | {'us/press':>9}")
+    print("-" * 44)
+    for name, index in (('all groups', everything), ('per-window', profiled)):
+        keys, tick_us, press_us = bench(index, title)
+        print(f"{name:<12} | {keys:>5} | {tick_us:>8.2f} | {press_us:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Benchmark suite: parse, tick, dispatch, activation and wait lateness.
+
+Runs on Linux with fake backends (no input is sent) and writes every number
+to a JSON file so runs can be compared across versions:
+
+    python benchmarks/run_suite.py                  # -> benchmarks/results/<time>-<commit>.json
+    python benchmarks/run_suite.py --quick          # smaller sizes, for a smoke run
+    python benchmarks/run_suite.py --output out.json
+    python benchmarks/run_suite.py --compare old.json new.json
+
+Sections:
+- parse: parse_config + compile_timelines throughput on generated configs
+- tick: TriggerIndex poll cost against timeline and distinct trigger counts
+- dispatch: execute_action_wrapper vs compiled plan cost per command
+- activation: hand-off latency of a new thread, the scheduler and the worker pool
+- wait: scheduler wait lateness distribution per wait strategy
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_dispatch import ACTIONS, NullBackend
+from bench_tick import KEY_POOL
+from bench_wait import measure as measure_wait
+
+from src import control
+from src.control import Timeline, execute_action_wrapper, parse_config
+from src.plan import compile_timelines
+from src.pool import WorkerPool
+from src.samples import percentile
+from src.scheduler import Scheduler
+from src.triggers import TriggerIndex
+from src.waiting import HybridWait, SpinWait, calibrate_margin
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+COMMANDS = ['key_down esc', 'key_up esc', 'press_key 3', 'mouse_down left', 'mouse_up left',
+            'click_mouse right', 'move_mouse_relative 0 -15', 'move_mouse 960 540']
+
+
+def percentiles(samples, scale=1e6):
+    samples = sorted(samples)
+    pick = lambda q: percentile(samples, q) * scale
+    return {'p50': pick(0.50), 'p90': pick(0.90), 'p99': pick(0.99), 'max': samples[-1] * scale,
+            'mean': statistics.mean(samples) * scale}
+
+
+def generate_config(timelines: int, actions: int) -> str:
+    lines = ["RequireAdmin = False", ""]
+    for i in range(timelines):
+        lines.append(f"[Timeline: generated {i}]")
+        lines.append(f"Trigger: {KEY_POOL[i % len(KEY_POOL)]}, {KEY_POOL[(i * 7 + 3) % len(KEY_POOL)]}")
+        lines.append(f"Target: game {i % 20}")
+        lines.append("Mode: " + ('OneShot', 'Hold', 'Loop')[i % 3])
+        lines.append(f"Remark: generated timeline {i}")
+        for a in range(actions):
+            command = COMMANDS[(i + a) % len(COMMANDS)]
+            if a % 5 == 4:
+                lines.append(f"{a * 2} {command}, {COMMANDS[(i + a + 1) % len(COMMANDS)]}")
+            else:
+                lines.append(f"{a * 2} {command}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def bench_parse(sizes):
+    results = []
+    backend = NullBackend()
+    for timelines, actions in sizes:
+        text = generate_config(timelines, actions)
+        line_count = text.count("\n")
+        with tempfile.NamedTemporaryFile('w', suffix='.ini', delete=False, encoding='utf-8') as f:
+            f.write(text)
+            path = f.name
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                parsed = parse_config(path)
+                parse_time = time.perf_counter() - start
+                start = time.perf_counter()
+                compile_timelines(parsed, lambda target: None, backend)
+                compile_time = time.perf_counter() - start
+        finally:
+            os.unlink(path)
+        results.append({
+            'timelines': timelines, 'lines': line_count,
+            'parse_ms': parse_time * 1e3, 'compile_ms': compile_time * 1e3,
+            'lines_per_s': line_count / parse_time,
+        })
+        print(f"  parse {line_count:>7} lines: {parse_time * 1e3:8.1f} ms parse, {compile_time * 1e3:8.1f} ms compile")
+    return results
+
+
+def bench_tick(counts, ticks):
+    results = []
+    read_vk = lambda vk: False
+    for count in counts:
+        for distinct in (4, len(KEY_POOL)):
+            timelines = []
+            for i in range(count):
+                t = Timeline(f"t{i}")
+                t.trigger_keys = [KEY_POOL[i % distinct], KEY_POOL[(i * 7 + 3) % distinct]]
+                timelines.append(t)
+            index = TriggerIndex(timelines)
+            start = time.perf_counter_ns()
+            for _ in range(ticks):
+                index.poll(read_vk)
+            us = (time.perf_counter_ns() - start) / ticks / 1000
+            results.append({'timelines': count, 'distinct_triggers': len(index.vks), 'us_per_tick': us})
+            print(f"  tick {count:>5} timelines, {len(index.vks):>2} keys: {us:6.2f} us")
+    return results
+
+
+def bench_dispatch(iterations):
+    control.backend = NullBackend()
+    timeline = Timeline("bench")
+    timeline.actions = list(ACTIONS)
+    timelines = [timeline] + [Timeline(f"other_{i}") for i in range(20)]
+    compile_timelines(timelines, lambda target: None, control.backend)
+    results = {}
+    for (_, command, args), action in zip(ACTIONS, timeline.plan):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            execute_action_wrapper(command, args, timelines)
+        legacy = (time.perf_counter_ns() - start) / iterations
+        func = action.func
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            func()
+        compiled = (time.perf_counter_ns() - start) / iterations
+        results[command] = {'legacy_ns': legacy, 'compiled_ns': compiled}
+        print(f"  dispatch {command:<20} legacy {legacy:7.1f} ns, compiled {compiled:6.1f} ns")
+    return results
+
+
+def bench_activation(runs):
+    entered = [0.0]
+    done = threading.Event()
+
+    def callback():
+        entered[0] = time.perf_counter()
+        done.set()
+
+    scheduler = Scheduler()
+    scheduler.start()
+    pool = WorkerPool(2)
+    pool.start()
+    methods = {
+        'thread': lambda: threading.Thread(target=callback, daemon=True).start(),
+        'scheduler': lambda: scheduler.call_soon(callback),
+        'pool': lambda: pool.submit(callback),
+    }
+    results = {}
+    for name, hand_off in methods.items():
+        samples = []
+        for _ in range(runs):
+            done.clear()
+            start = time.perf_counter()
+            hand_off()
+            done.wait()
+            samples.append(entered[0] - start)
+            time.sleep(0.0005)
+        results[name] = percentiles(samples)
+        print(f"  activation {name:<10} p50 {results[name]['p50']:7.1f} us, p99 {results[name]['p99']:8.1f} us")
+    scheduler.stop()
+    pool.stop()
+    return results
+
+
+def bench_wait():
+    margin = calibrate_margin()
+    results = {'calibrated_margin_us': margin * 1e6}
+    for name, strategy in (('spin', SpinWait()), ('hybrid', HybridWait(margin))):
+        stats, cpu = measure_wait(strategy)
+        stats['cpu_per_wall'] = cpu
+        results[name] = stats
+        print(f"  wait {name:<7} p50 {stats['p50_us']:7.1f} us, p99 {stats['p99_us']:7.1f} us, cpu/wall {cpu:.2f}")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(quick: bool):
+    if quick:
+        sizes, counts, ticks, iterations, runs = [(200, 10)], [10, 100], 500, 20_000, 100
+    else:
+        sizes, counts, ticks, iterations, runs = [(500, 15), (2000, 20), (5000, 25)], [10, 100, 1000, 5000], 2000, 100_000, 300
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'quick': quick,
+        },
+        'parse': bench_parse(sizes),
+        'tick': bench_tick(counts, ticks),
+        'dispatch': bench_dispatch(iterations),
+        'activation': bench_activation(runs),
+        'wait': bench_wait(),
+    }
+
+
+def flatten(data, prefix=""):
+    """Numeric leaves as {'section.key.sub': value}; list items are keyed by their first field."""
+    items = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            items.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            label = f"{next(iter(value))}={next(iter(value.values()))}" if isinstance(value, dict) and value else str(i)
+            if isinstance(value, dict) and 'distinct_triggers' in value:
+                label += f",keys={value['distinct_triggers']}"
+            items.update(flatten(value, f"{prefix}{label}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        items[prefix[:-1]] = data
+    return items
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path, encoding='utf-8') as f:
+        old = flatten({k: v for k, v in json.load(f).items() if k != 'meta'})
+    with open(new_path, encoding='utf-8') as f:
+        new = flatten({k: v for k, v in json.load(f).items() if k != 'meta'})
+    print(f"{'metric':<55} | {'old':>12} | {'new':>12} | {'new/old':>7}")
+    print("-" * 95)
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key] if old[key] else float('nan')
+        print(f"{key:<55} | {old[key]:>12.2f} | {new[key]:>12.2f} | {ratio:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true', help="smaller sizes for a quick run")
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two result files")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args.quick)
+    path = args.output
+    if not path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{results['meta']['commit'] or 'nogit'}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
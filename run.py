@@ -4,7 +4,7 @@ import ctypes
 
 # 标准化导入：PyInstaller 可以静态分析出 src.control
 try:
-    from src.control import main_loop
+    from src.control import is_enabled, load_startup, main_loop
 except ImportError as e:
     print(f"Error: Failed to import core modules. {e}")
     sys.exit(1)
@@ -15,17 +15,6 @@ def is_admin():
     except:
         return False
 
-def check_admin_required(file_path: str):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip().lower()
-                if line.startswith('requireadmin') and ('true' in line or 'yes' in line or '1' in line):
-                    return True
-    except:
-        pass
-    return False
-
 if __name__ == "__main__":
     # 打印免责声明提示
     print("-" * 40)
@@ -40,7 +29,50 @@ if __name__ == "__main__":
     else:
         base_path = os.path.dirname(os.path.abspath(__file__))
 
-    if len(sys.argv) < 2:
+    # --simulate <脚本>: 在虚拟时钟上回放输入脚本并打印动作轨迹，不发送真实输入
+    args = sys.argv[1:]
+    simulate_script = None
+    if '--simulate' in args:
+        i = args.index('--simulate')
+        if i + 1 >= len(args):
+            print("用法: python run.py --simulate <输入脚本> [配置文件路径]")
+            sys.exit(1)
+        simulate_script = args[i + 1]
+        del args[i:i + 2]
+
+    # --send "<命令>; <命令>" [--port 端口]: 向正在运行的实例发送控制命令并打印回复
+    if '--send' in args:
+        i = args.index('--send')
+        port = args[args.index('--port') + 1] if '--port' in args[:-1] else None
+        if i + 1 >= len(args):
+            print('用法: python run.py --send "trigger 名称; status 名称" [--port 端口]')
+            sys.exit(1)
+        from src.ipc import DEFAULT_PORT, ControlClient
+        try:
+            client = ControlClient(int(port) if port else DEFAULT_PORT)
+            print("; ".join(client.request(args[i + 1])))
+            client.close()
+        except (OSError, ValueError) as e:
+            print(f"错误: 无法连接控制端口: {e}")
+            sys.exit(1)
+        sys.exit(0)
+
+    # --record <输出文件> [--name 名称] [--trigger 触发键] [--events 事件脚本]: 录制输入并追加为时间轴
+    if '--record' in args:
+        options = {}
+        for flag in ('--record', '--name', '--trigger', '--events'):
+            if flag in args:
+                i = args.index(flag)
+                if i + 1 >= len(args):
+                    print("用法: python run.py --record <输出文件> [--name 名称] [--trigger 触发键] [--events 事件脚本]")
+                    sys.exit(1)
+                options[flag[2:]] = args[i + 1]
+                del args[i:i + 2]
+        from src.recorder import record
+        record(options['record'], options.get('name'), options.get('trigger'), options.get('events'))
+        sys.exit(0)
+
+    if len(args) < 1:
         # No argument provided, try to find config.ini in the base path
         default_config = os.path.join(base_path, 'config.ini')
         if os.path.exists(default_config):
@@ -53,15 +85,23 @@ if __name__ == "__main__":
             input("按回车键退出...")
             sys.exit(1)
     else:
-        config_path = sys.argv[1]
+        config_path = args[0]
     
     if not os.path.exists(config_path):
         print(f"错误: 找不到配置文件 '{config_path}'")
         input("按回车键退出...")
         sys.exit(1)
 
+    if simulate_script:
+        from src.simulate import run_simulation
+        print(run_simulation(simulate_script, config_path))
+        sys.exit(0)
+
+    # 一次读取并编译配置（命中缓存时直接加载），之后交给 main_loop，不再重复解析
+    startup = load_startup(config_path)
+
     # 检查并请求管理员权限
-    if check_admin_required(config_path) and not is_admin():
+    if is_enabled(startup[0].get('requireadmin')) and not is_admin():
         print("Config requires administrator privileges. Requesting...")
         
         # 判断是否为打包后的 exe 环境
@@ -78,4 +118,4 @@ if __name__ == "__main__":
         
         sys.exit()
         
-    main_loop(config_path)
+    main_loop(config_path, startup)
@@ -0,0 +1,262 @@
+"""
+Input backends used to inject keyboard and mouse events.
+
+Compiled plans bind their actions to the methods of one backend:
+- PyDirectInputBackend: one pydirectinput call (one SendInput) per event.
+- BatchedSendInputBackend: queues events and sends everything due at the same
+  deadline as one SendInput array when the scheduler calls `flush()`.
+- RecordingBackend: keeps events in memory, for tests and benchmarks on Linux.
+"""
+import ctypes
+import ctypes.wintypes as wintypes
+import threading
+import time
+
+from src.key_mapping import vk_for_key
+
+
+class InputBackend:
+    """Interface shared by all backends. Method names mirror the config commands."""
+    name = "base"
+
+    def key_down(self, key: str): raise NotImplementedError
+    def key_up(self, key: str): raise NotImplementedError
+    def press(self, key: str): raise NotImplementedError
+    def mouse_down(self, button: str = 'left'): raise NotImplementedError
+    def mouse_up(self, button: str = 'left'): raise NotImplementedError
+    def click(self, button: str = 'left'): raise NotImplementedError
+    def move_to(self, x: int, y: int): raise NotImplementedError
+    def move(self, dx: int, dy: int): raise NotImplementedError
+
+    def flush(self):
+        """Send everything queued so far. Called after each batch of due events."""
+        pass
+
+
+class PyDirectInputBackend(InputBackend):
+    """The original behaviour: every event is its own pydirectinput call."""
+    name = "pydirectinput"
+
+    def __init__(self):
+        import pydirectinput
+        pydirectinput.PAUSE = 0.0  # Set to 0 for minimum latency
+        self.key_down = pydirectinput.keyDown
+        self.key_up = pydirectinput.keyUp
+        self.press = pydirectinput.press
+        self.mouse_down = lambda button='left': pydirectinput.mouseDown(button=button)
+        self.mouse_up = lambda button='left': pydirectinput.mouseUp(button=button)
+        self.click = lambda button='left': pydirectinput.click(button=button)
+        self.move_to = pydirectinput.moveTo
+        self.move = pydirectinput.move
+
+
+# --- SendInput structures (winuser.h) ---
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_SCANCODE = 0x0008
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_ABSOLUTE = 0x8000
+MAPVK_VK_TO_VSC_EX = 4
+
+# button -> (down flag, up flag, mouseData)
+MOUSE_BUTTON_FLAGS = {
+    'left': (0x0002, 0x0004, 0),
+    'right': (0x0008, 0x0010, 0),
+    'middle': (0x0020, 0x0040, 0),
+    'x1': (0x0080, 0x0100, 1), 'xbutton1': (0x0080, 0x0100, 1),
+    'x2': (0x0080, 0x0100, 2), 'xbutton2': (0x0080, 0x0100, 2),
+}
+
+ULONG_PTR = ctypes.c_size_t
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [('type', wintypes.DWORD), ('u', _INPUTUNION)]
+
+
+class BatchedSendInputBackend(InputBackend):
+    """
+    Queues events and sends them with a single SendInput call per flush, so
+    comma-grouped actions like `0 mouse_up left, key_down esc` arrive together.
+    Keys are sent as scan codes; relative moves are raw MOUSEEVENTF_MOVE deltas.
+    Each thread queues into its own buffer, so scheduler workers flush only
+    the events of the step they just ran.
+    """
+    name = "batched"
+    MAX_BATCH = 64
+
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+        self._local = threading.local()
+        self._scan_cache = {}  # key name -> (scan code, flags)
+        self._screen = (self.user32.GetSystemMetrics(0), self.user32.GetSystemMetrics(1))
+
+    def _scan(self, key: str):
+        cached = self._scan_cache.get(key)
+        if cached is None:
+            vk = vk_for_key(key)
+            if vk is None:
+                raise ValueError(f"unknown key '{key}'")
+            scan = self.user32.MapVirtualKeyW(vk, MAPVK_VK_TO_VSC_EX)
+            flags = KEYEVENTF_SCANCODE | (KEYEVENTF_EXTENDEDKEY if scan & 0xFF00 else 0)
+            cached = self._scan_cache[key] = (scan & 0xFF, flags)
+        return cached
+
+    def _queue(self):
+        local = self._local
+        if not hasattr(local, 'buffer'):
+            local.buffer = (INPUT * self.MAX_BATCH)()
+            local.count = 0
+        return local
+
+    def _slot(self, input_type):
+        local = self._queue()
+        if local.count == self.MAX_BATCH:
+            self.flush()
+        item = local.buffer[local.count]
+        local.count += 1
+        ctypes.memset(ctypes.byref(item), 0, ctypes.sizeof(INPUT))
+        item.type = input_type
+        return item
+
+    def _key(self, key: str, up: bool):
+        scan, flags = self._scan(key)
+        ki = self._slot(INPUT_KEYBOARD).u.ki
+        ki.wScan = scan
+        ki.dwFlags = flags | (KEYEVENTF_KEYUP if up else 0)
+
+    def _button(self, button: str, up: bool):
+        down_flag, up_flag, data = MOUSE_BUTTON_FLAGS[button.lower()]
+        mi = self._slot(INPUT_MOUSE).u.mi
+        mi.dwFlags = up_flag if up else down_flag
+        mi.mouseData = data
+
+    def key_down(self, key): self._key(key, False)
+    def key_up(self, key): self._key(key, True)
+    def press(self, key):
+        self._key(key, False)
+        self._key(key, True)
+    def mouse_down(self, button='left'): self._button(button, False)
+    def mouse_up(self, button='left'): self._button(button, True)
+    def click(self, button='left'):
+        self._button(button, False)
+        self._button(button, True)
+
+    def move_to(self, x, y):
+        mi = self._slot(INPUT_MOUSE).u.mi
+        # Absolute coordinates are normalised to 0..65535 across the primary screen
+        mi.dx = int(x * 65536 / self._screen[0]) + 1
+        mi.dy = int(y * 65536 / self._screen[1]) + 1
+        mi.dwFlags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE
+
+    def move(self, dx, dy):
+        mi = self._slot(INPUT_MOUSE).u.mi
+        mi.dx = dx
+        mi.dy = dy
+        mi.dwFlags = MOUSEEVENTF_MOVE
+
+    def flush(self):
+        local = self._queue()
+        if local.count:
+            count, local.count = local.count, 0
+            self.user32.SendInput(count, local.buffer, ctypes.sizeof(INPUT))
+
+
+class RecordingBackend(InputBackend):
+    """
+    In-memory backend. `events` holds `(time, batch, name, args)` tuples.
+    With `batched=True` queued events share the time of the flush that sends
+    them, like BatchedSendInputBackend; otherwise each event is stamped when
+    it is made. `send_cost` busy-waits per send to emulate the syscall.
+    Queued events are kept per thread, like BatchedSendInputBackend.
+    """
+    name = "recording"
+
+    def __init__(self, clock=time.perf_counter, batched: bool = False, send_cost: float = 0.0):
+        self.clock = clock
+        self.batched = batched
+        self.send_cost = send_cost
+        self.events = []
+        self.batch = 0
+        self._local = threading.local()
+
+    @property
+    def _queued(self):
+        local = self._local
+        if not hasattr(local, 'queued'):
+            local.queued = []
+        return local.queued
+
+    def _send(self):
+        if self.send_cost:
+            end = time.perf_counter() + self.send_cost
+            while time.perf_counter() < end:
+                pass
+
+    def _record(self, name, *args):
+        if self.batched:
+            self._queued.append((name, args))
+        else:
+            self._send()
+            self.events.append((self.clock(), self.batch, name, args))
+
+    def key_down(self, key): self._record('key_down', key)
+    def key_up(self, key): self._record('key_up', key)
+    def press(self, key): self._record('press_key', key)
+    def mouse_down(self, button='left'): self._record('mouse_down', button)
+    def mouse_up(self, button='left'): self._record('mouse_up', button)
+    def click(self, button='left'): self._record('click_mouse', button)
+    def move_to(self, x, y): self._record('move_mouse', x, y)
+    def move(self, dx, dy): self._record('move_mouse_relative', dx, dy)
+
+    def flush(self):
+        if self._queued:
+            self._send()
+            now = self.clock()
+            self.events.extend((now, self.batch, name, args) for name, args in self._queued)
+            self._queued.clear()
+        self.batch += 1
+
+    def clear(self):
+        self.events.clear()
+        self._queued.clear()
+        self.batch = 0
+
+    def spreads(self):
+        """Time between the first and last event of every flush batch with two or more events."""
+        groups = {}
+        for t, batch, _, _ in self.events:
+            lo, hi, n = groups.get(batch, (t, t, 0))
+            groups[batch] = (min(lo, t), max(hi, t), n + 1)
+        return [hi - lo for lo, hi, n in groups.values() if n > 1]
+
+
+BACKENDS = {
+    'pydirectinput': PyDirectInputBackend,
+    'batched': BatchedSendInputBackend,
+    'recording': RecordingBackend,
+}
+
+
+def create_backend(name: str = 'pydirectinput') -> InputBackend:
+    cls = BACKENDS.get((name or 'pydirectinput').strip().lower())
+    if cls is None:
+        print(f"[Warning] Unknown input backend '{name}', using pydirectinput.")
+        cls = PyDirectInputBackend
+    return cls()
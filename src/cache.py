@@ -0,0 +1,56 @@
+"""
+On-disk startup cache for compiled configs.
+
+Entries live in `.timelapse-cache/` next to the config file, one file per
+config. Each entry stores the key it was built for, a SHA-256 over the
+config bytes, the key mapping, the cache format and the Python version, so
+any change simply misses and the config is parsed again. Payloads are plain
+data (dicts, tuples, strings, numbers) written with `marshal`; callables are
+never cached and have to be bound after loading.
+"""
+import hashlib
+import marshal
+import os
+import sys
+
+CACHE_DIR = '.timelapse-cache'
+CACHE_VERSION = 3
+
+
+def cache_key(*blobs: bytes) -> str:
+    digest = hashlib.sha256(f"{CACHE_VERSION}|{sys.version}".encode())
+    for blob in blobs:
+        digest.update(len(blob).to_bytes(8, 'little'))
+        digest.update(blob)
+    return digest.hexdigest()
+
+
+def cache_path(config_path: str) -> str:
+    config_path = os.path.abspath(config_path)
+    return os.path.join(os.path.dirname(config_path), CACHE_DIR, os.path.basename(config_path) + '.cache')
+
+
+def read_cache(path: str, key: str):
+    """Returns the cached payload, or None if there is no entry for `key`."""
+    try:
+        with open(path, 'rb') as f:
+            stored_key, payload = marshal.loads(f.read())  # One read; marshal.load(f) reads piecemeal
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return payload if stored_key == key else None
+
+
+def write_cache(path: str, key: str, payload):
+    """Write atomically, so a concurrent start never reads a half-written entry."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(marshal.dumps((key, payload)))
+        os.replace(tmp, path)
+    except (OSError, ValueError) as e:
+        print(f"[Warning] Could not write config cache {path}: {e}")
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,140 @@
+"""
+Per-timeline activation policy and run-state.
+
+`Concurrency:` decides what a trigger does while the timeline is running:
+- drop (default): ignore it;
+- queue N: keep up to N activations and start them one by one as runs end;
+- restart: stop the running instance (Hold releases what it holds) and start again;
+- parallel N: run up to N instances at once, drop beyond that.
+
+`Cooldown:` (ms, default 300) ignores triggers that come sooner than that
+after the last accepted one.
+
+RunState is the only place that decides. Key presses and the control
+channel (trigger thread), `run_timeline` calls (dispatch thread or pool
+workers) and ending runs all go through `admit` / `exit` under one lock, so
+a press can never see a half-updated state, and a slot freed by an ending
+run goes straight to the next queued activation. Hot reload hands the same
+RunState to the new version of a timeline.
+"""
+import collections
+import threading
+
+CONCURRENCY_POLICIES = ('drop', 'queue', 'restart', 'parallel')
+
+# admit() results
+START = 'start'
+QUEUED = 'queued'
+RESTART = 'restart'
+DROPPED = 'dropped'
+DEBOUNCED = 'debounced'
+
+
+def parse_concurrency(value: str):
+    """`queue 3` -> ('queue', 3). N defaults to 1. Raises ValueError."""
+    parts = value.lower().replace(':', ' ').split()
+    if not parts or parts[0] not in CONCURRENCY_POLICIES:
+        raise ValueError(f"unknown policy '{value}'")
+    limit = int(parts[1]) if len(parts) > 1 else 1
+    if limit < 1:
+        raise ValueError("N must be at least 1")
+    return parts[0], limit
+
+
+class RunState:
+    """Active runs, queued activations and counters of one timeline."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0  # Admitted runs that have not exited (a slot is taken before the run exists)
+        self.runs = []  # Attached run objects, oldest first
+        self.pending = collections.deque()  # Queued activations: zero-argument start callables
+        self.limit = 1  # Concurrent runs allowed by the policy of the latest admit
+        self.last_accepted = None  # Time of the last accepted trigger, for the cooldown
+        self.started = 0
+        self.dropped = 0
+        self.queued = 0
+        self.restarted = 0
+        self.debounced = 0
+
+    def debounce(self, now: float, cooldown: float) -> bool:
+        """True (and the trigger counts as accepted) unless it comes within `cooldown` of the last one."""
+        with self.lock:
+            if not self._cool(now, cooldown):
+                return False
+            self.last_accepted = now
+            return True
+
+    def _cool(self, now, cooldown):
+        # cooldown None: not debounced (run_timeline calls)
+        if cooldown is not None and self.last_accepted is not None and now - self.last_accepted <= cooldown:
+            self.debounced += 1
+            return False
+        return True
+
+    def admit(self, policy: str, limit: int, cooldown: float, now: float, launch=None):
+        """
+        Decide on one activation. Returns (result, victim): on START / RESTART
+        the caller starts a run and `attach`es it, on RESTART after stopping
+        `victim`; on QUEUED `launch` is kept and called by `exit` later.
+        """
+        with self.lock:
+            if not self._cool(now, cooldown):
+                return DEBOUNCED, None
+            capacity = limit if policy == 'parallel' else 1
+            self.limit = capacity
+            if self.active < capacity:
+                self.active += 1
+                self.started += 1
+                self.last_accepted = now
+                return START, None
+            if policy == 'restart' and self.runs:
+                # The new run takes the slot over; the victim's exit no longer counts
+                victim = self.runs.pop()
+                self.restarted += 1
+                self.started += 1
+                self.last_accepted = now
+                return RESTART, victim
+            if policy == 'queue' and launch is not None and len(self.pending) < limit:
+                self.pending.append(launch)
+                self.queued += 1
+                self.last_accepted = now
+                return QUEUED, None
+            # Like before: presses ignored while running do not restart the cooldown
+            self.dropped += 1
+            return DROPPED, None
+
+    def attach(self, run):
+        with self.lock:
+            self.runs.append(run)
+
+    def exit(self, run):
+        """
+        `run` ended. Returns the next queued activation to call, which already
+        holds the freed slot, or None.
+        """
+        with self.lock:
+            try:
+                self.runs.remove(run)
+            except ValueError:
+                return None  # Replaced by a restart, or never admitted
+            self.active -= 1
+            if self.pending and self.active < self.limit:
+                self.active += 1
+                self.started += 1
+                return self.pending.popleft()
+            return None
+
+    def stop_all(self) -> list:
+        """Drop queued activations and return the runs to stop."""
+        with self.lock:
+            self.pending.clear()
+            return list(self.runs)
+
+    def counters(self) -> dict:
+        return {'started': self.started, 'dropped': self.dropped, 'queued': self.queued,
+                'restarted': self.restarted, 'debounced': self.debounced}
+
+    def __str__(self):
+        return (f"{self.started} started, {self.dropped} dropped, {self.queued} queued, "
+                f"{self.restarted} restarted, {self.debounced} within cooldown")
@@ -1,35 +1,113 @@
-import pydirectinput
 import time
 import sys
-import threading
 import ctypes
 import re
 import os
-from src.key_mapping import VK_MAPPING
+from functools import partial
+from src.backends import create_backend
+from src.injector import InjectorBackend, create_injector
+from src.ipc import create_control_server
+from src import key_mapping
+from src.cache import cache_key, cache_path, read_cache, write_cache
+from src.concurrency import DROPPED, QUEUED, RESTART, START, RunState, parse_concurrency
+from src.key_mapping import vk_for_key
+from src.log import log
+from src.plan import bind_timelines, by_name, compile_timelines, flatten_timelines, parse_offset, plain_plan
+from src.pool import create_pool
+from src.reload import ConfigWatcher
+from src.runners import OVERRUN_POLICIES, HoldRun, LoopRun, OneShotRun
+from src.scheduler import Scheduler
+from src.telemetry import Telemetry
+from src.triggers import TriggerIndex, create_trigger_source
+from src.waiting import create_wait_strategy
+from src.window import ForegroundWindowTracker
 
 # --- Configuration & Constants ---
-pydirectinput.PAUSE = 0.0  # Set to 0 for minimum latency
+
+COOLDOWN = 0.3 # Default debounce between two activations of the same timeline (`Cooldown:` in ms)
+DEFAULT_FPS = 60.0  # Frame rate for `2f` style offsets when neither the timeline nor the globals set FPS
+
+_TIMELINE_HEADER = re.compile(r'^\[Timeline(?::\s*(.*))?\]$', re.IGNORECASE)
+_TEMPLATE_HEADER = re.compile(r'^\[Template:\s*(.+)\]$', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'\$(\w+)')  # `$x` in template lines
+
+# Keys allowed before the first [Timeline] header
+GLOBAL_KEYS = ('requireadmin', 'inputbackend', 'triggermode', 'waitmode', 'inlinesubtimelines', 'workers', 'workerpolicy', 'loglevel', 'telemetry', 'telemetryexport', 'configcache', 'hotreload', 'injector', 'injectorpriority', 'injectoraffinity', 'controlport', 'fps', 'framealign', 'frameperiod')
+
+# Single dispatch engine shared by every running timeline instance
+engine = Scheduler()
+# InputBackend used by compiled plans, created in main_loop
+backend = None
+# Optional WorkerPool running the engine's due events (`Workers:` setting), created in main_loop
+pool = None
+# Per-action timing records (`Telemetry:` setting), created in main_loop
+telemetry = None
+# Live TriggerIndex; its key state snapshot answers key_check for tracked keys
+trigger_index = None
 
 class Timeline:
     def __init__(self, name="Unnamed"):
         self.name = name
         self.trigger_keys = [] # List of trigger keys
         self.target_window = None  # None or "ALL" means all, otherwise partial title match
+        self.target_lower = None  # Lowercased target_window, None for all windows (set by compile)
         self.remark = ""
         self.actions = []  # List of tuples: (timestamp, command, args)
+        self.plan = ()  # Tuple of PlannedAction, built by compile_timelines
+        self.action_keys = frozenset()  # Lowercased keys used by key_* actions
+        self.inline = None  # run_timeline inlining: None = auto, True / False = forced
+        self.fps = None  # `FPS:`; after parsing 1 / frame_period
+        self.frame_period = None  # Seconds per frame (`FramePeriod:` or from FPS), resolved after parsing
+        self.frame_align = None  # Start on the frame grid: None = global FrameAlign
+        self.frame_grid = None  # Grid period in seconds when aligned, None = start at once
         
         # New attributes for modes
         self.mode = "oneshot"  # 'oneshot', 'loop', 'hold'
         self.loop_interval = 0.1
+        self.loop_period = None  # Seconds; set for fixed-rate loops anchored to absolute deadlines
+        self.loop_overrun = "skip"  # Fixed-rate overrun policy: 'catchup', 'skip', 'stretch'
+        self.concurrency = "drop"  # Trigger while running: 'drop', 'queue', 'restart', 'parallel' (src/concurrency.py)
+        self.concurrency_limit = 1  # N of `queue N` / `parallel N`
+        self.cooldown = COOLDOWN  # Seconds
         
         # Runtime state
-        self.loop_stop_event = None
-        self.loop_thread = None
-        self.is_running = False # Flag to prevent overlapping executions for OneShot/Hold
+        self.loop_run = None  # Active LoopRun while a Loop timeline is toggled on
+        self.loop_stats = None  # LoopStats of the latest LoopRun
+        self.active_run = None  # Latest OneShotRun / HoldRun started by a trigger
+        self.run_state = RunState()  # Admitted runs, queued activations and counters
+        self.replaced_by = None  # Newer version of this timeline after a hot reload (src/reload.py)
+
+    @property
+    def is_running(self) -> bool:
+        return self.run_state.active > 0
 
     def __repr__(self):
         return f"<Timeline '{self.name}' Triggers: {self.trigger_keys} Mode: {self.mode}>"
 
+# Parsed / compiled attributes saved in the startup cache (runtime state and callables are not)
+CACHED_FIELDS = ('name', 'trigger_keys', 'target_window', 'target_lower', 'remark', 'actions',
+                 'action_keys', 'inline', 'mode', 'loop_interval', 'loop_period', 'loop_overrun',
+                 'fps', 'frame_align', 'frame_period', 'frame_grid', 'concurrency', 'concurrency_limit',
+                 'cooldown')
+
+def timeline_state(t: Timeline) -> dict:
+    """Plain-data snapshot of a compiled timeline for the startup cache."""
+    state = {field: getattr(t, field) for field in CACHED_FIELDS}
+    state['plan'] = plain_plan(t.plan)
+    return state
+
+def timeline_from_state(state: dict) -> Timeline:
+    """
+    Rebuild a timeline from `timeline_state`. Its plan holds plain
+    (offset, command, args) tuples until `bind_timelines` turns them into
+    bound PlannedActions.
+    """
+    t = Timeline(state['name'])
+    for field in CACHED_FIELDS:
+        setattr(t, field, state[field])
+    t.plan = state['plan']
+    return t
+
 # --- Core Functions ---
 
 def get_active_window_title():
@@ -43,142 +121,430 @@ def get_active_window_title():
 def key_check(key_name):
     """
     检查某个键是否被按下。
-    使用 Windows API GetAsyncKeyState.
+    Trigger keys are answered from the trigger loop's latest snapshot,
+    other keys with the Windows API GetAsyncKeyState.
     """
-    if not key_name:
-        return False
-    vk = VK_MAPPING.get(key_name.lower())
+    vk = vk_for_key(key_name)
     if vk is None:
-        if len(key_name) == 1:
-            vk = ord(key_name.upper())
-        else:
-            return False
-    
+        return False
+    if trigger_index is not None:
+        down = trigger_index.is_down(vk)
+        if down is not None:
+            return down
+
     return (ctypes.windll.user32.GetAsyncKeyState(vk) & 0x8000) != 0
 
-def parse_config(file_path: str):
+def parse_positive(value):
+    """float(value) if it is a number above 0, else None."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+def parse_duration(text: str):
+    """`Period:` / `Interval:` value: `0.05` seconds -> (0.05, 0.0), `3f` frames -> (0.0, 3.0)."""
+    if text[-1:] in ('f', 'F'):
+        return 0.0, float(text[:-1])
+    return float(text), 0.0
+
+def resolve_frames(t: Timeline, settings: dict, frame_actions=(), frame_fields=None):
+    """
+    Fix the frame length of `t` and convert the frame part of the actions in
+    `frame_actions` [(action list, index, frames)] and the `{attribute:
+    frames}` in `frame_fields` (Loop Period / Interval) to seconds. The
+    timeline's own FramePeriod / FPS win over the global ones; an explicit
+    period (e.g. 16.6833 ms for a 59.94 Hz display) beats the rounded FPS.
+    Also sets `t.frame_grid`.
+    """
+    if t.frame_period is None:
+        if t.fps is None:
+            period = parse_positive(settings.get('frameperiod'))
+            t.frame_period = period / 1000.0 if period else 1.0 / (parse_positive(settings.get('fps')) or DEFAULT_FPS)
+        else:
+            t.frame_period = 1.0 / t.fps
+    t.fps = 1.0 / t.frame_period
+    for actions, i, frames in frame_actions:
+        seconds, command, args = actions[i]
+        actions[i] = (seconds + frames * t.frame_period, command, args)
+    for attr, frames in (frame_fields or {}).items():
+        setattr(t, attr, frames * t.frame_period)
+    align = t.frame_align if t.frame_align is not None else is_enabled(settings.get('framealign'))
+    t.frame_grid = t.frame_period if align else None
+
+class Template:
+    """A `[Template: name]` section: action lines with `$param` placeholders, expanded by `use` lines."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.params = []  # [(name, default or None)]
+        self.lines = []
+
+    def bind(self, values) -> dict:
+        """Placeholder values for a `use` line's arguments; raises ValueError if one is missing."""
+        bound = {}
+        for i, (param, default) in enumerate(self.params):
+            if i < len(values):
+                bound[param] = values[i]
+            elif default is not None:
+                bound[param] = default
+            else:
+                raise ValueError(f"missing value for '${param}'")
+        return bound
+
+def collect_templates(lines) -> dict:
+    """Lowercased name -> Template for every `[Template: ...]` section in `lines`."""
+    templates = {}
+    current = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('['):
+            match = _TEMPLATE_HEADER.match(line)
+            current = Template(match.group(1).strip()) if match else None
+            if current is not None:
+                templates.setdefault(current.name.lower(), current)
+            continue
+        if current is None:
+            continue
+        if not line[0].isdigit() and line.lower() != 'end' and ('=' in line or ':' in line):
+            key, value = re.split(r'[:=]', line, 1)
+            if key.strip().lower() in ('params', 'param'):
+                for param in value.split(','):
+                    name, _, default = param.partition('=')
+                    if name.strip():
+                        current.params.append((name.strip().lstrip('$'), default.strip() if default else None))
+            continue
+        current.lines.append(line)
+    return templates
+
+class _ActionParser:
+    """
+    Action lines of one timeline. `repeat` blocks nest through a stack of
+    action lists; `use` lines expand a template in place, shifted by the
+    `use` time.
+    """
+
+    def __init__(self, timeline: Timeline, templates: dict):
+        self.timeline = timeline
+        self.templates = templates
+        self.stack = [timeline.actions]
+        self.lists = [timeline.actions]  # Every action list, sorted once frames are resolved
+        self.frames = []  # (action list, index, frames) for resolve_frames
+        self.frame_fields = {}  # {attribute: frames} of Period / Interval given in frames
+        self.expanding = []  # Templates being expanded, to stop recursion
+        self.errors = 0  # Lines skipped or only partly applied
+
+    def add(self, line: str, line_num: int, shift=(0.0, 0.0), shift_depth: int = None):
+        """Parse one action line. Times at stack depth `shift_depth` are moved by `shift` (seconds, frames)."""
+        if line.lower() == 'end':
+            if len(self.stack) > 1:
+                self.stack.pop()
+            else:
+                self.warn(line_num, "'end' without 'repeat' ignored.")
+            return
+        # Split the line into Timestamp and the Rest
+        parts = line.split(maxsplit=1)
+        if len(parts) < 2:
+            self.warn(line_num, f"'{line}' is not a setting or an action, ignored.")
+            return
+        try:
+            # First column is milliseconds, or frames with an `f` suffix (converted once FPS is known)
+            seconds, frames = parse_offset(parts[0])
+        except ValueError:
+            self.warn(line_num, f"invalid timestamp in '{line}' ignored.")
+            return
+        if len(self.stack) == shift_depth:
+            seconds += shift[0]
+            frames += shift[1]
+        head = parts[1].split(maxsplit=3)
+
+        if head[0] == 'repeat':
+            # `repeat <count> <period>` opens a block closed by `end`; with actions after the
+            # period, the rest of the line is a one-line body at offset 0
+            if len(head) < 3:
+                self.warn(line_num, "'repeat' needs a count and a period, ignored.")
+                return
+            body = []
+            self._append((seconds, 'repeat', [head[1], head[2], body]), frames)
+            self.lists.append(body)
+            depth = len(self.stack)
+            self.stack.append(body)
+            if len(head) == 4:
+                self.add("0 " + head[3], line_num)
+                del self.stack[depth:]
+            return
+
+        if head[0] == 'use':
+            self.use(parts[1].split()[1:], line_num, (seconds, frames))
+            return
+
+        # Split multiple actions by comma
+        for action_str in parts[1].split(','):
+            action_parts = action_str.strip().split()
+            if not action_parts:
+                continue
+            command = action_parts[0]
+            args = action_parts[1:]
+            self._append((seconds, command, args), frames)
+
+    def use(self, args, line_num: int, shift):
+        if not args:
+            self.warn(line_num, "'use' needs a template name, ignored.")
+            return
+        key = args[0].lower()
+        template = self.templates.get(key)
+        if template is None:
+            self.warn(line_num, f"unknown template '{args[0]}' ignored.")
+            return
+        if key in self.expanding:
+            self.warn(line_num, f"template '{template.name}' uses itself, ignored.")
+            return
+        try:
+            values = template.bind(args[1:])
+        except ValueError as e:
+            self.warn(line_num, f"template '{template.name}': {e}, ignored.")
+            return
+        substitute = lambda match: values.get(match.group(1), match.group(0))
+        depth = len(self.stack)
+        self.expanding.append(key)
+        for body_line in template.lines:
+            self.add(_PLACEHOLDER.sub(substitute, body_line), line_num, shift, depth)
+        self.expanding.pop()
+        if len(self.stack) > depth:
+            self.warn(line_num, f"template '{template.name}' leaves a 'repeat' block open, closed.")
+            del self.stack[depth:]
+
+    def warn(self, line_num: int, message: str):
+        print(f"[Warning] Line {line_num}: {message}")
+        self.errors += 1
+
+    def _append(self, action, frames):
+        actions = self.stack[-1]
+        if frames:
+            self.frames.append((actions, len(actions), frames))
+        actions.append(action)
+
+    def finish(self, settings: dict):
+        if len(self.stack) > 1:
+            print(f"[Warning] Timeline '{self.timeline.name}': {len(self.stack) - 1} 'repeat' block(s) without 'end', closed.")
+            self.errors += len(self.stack) - 1
+            del self.stack[1:]
+        resolve_frames(self.timeline, settings, self.frames, self.frame_fields)
+        for actions in self.lists:
+            actions.sort(key=lambda x: x[0])
+
+def parse_lines(lines, defaults: dict = None, templates: dict = None):
+    """
+    Single pass over the config lines. Returns (global settings, timelines,
+    errors); settings are the `Key = Value` lines before the first [Timeline]
+    header, errors counts the lines that were skipped or only partly applied.
+    `defaults` supplies globals the lines do not set (e.g. FPS when a hot
+    reload parses one section on its own), `templates` the templates `use`
+    lines may refer to (default: the `[Template]` sections in `lines`).
+    """
+    if templates is None:
+        lines = list(lines)
+        templates = collect_templates(lines)
+    settings = {}
     timelines = []
+    errors = 0
+    parsers = []
     current_timeline = None
-
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
+    in_globals = True
+    in_template = False
+
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('['):
+            in_globals = False
+            # Template sections were collected up front
+            in_template = _TEMPLATE_HEADER.match(line) is not None
+            if in_template:
+                continue
+        if in_template:
+            continue
+        # Global config keys (FPS / FrameAlign / FramePeriod may also be set per timeline)
+        if in_globals and line.lower().startswith(GLOBAL_KEYS):
+            parts = re.split(r'[:=]', line, 1)
+            key = parts[0].strip().lower()
+            if len(parts) == 2 and key in GLOBAL_KEYS:
+                settings[key] = parts[1].strip()
+            continue
+
+        # Parse Timeline Header
+        timeline_match = _TIMELINE_HEADER.match(line)
+        if timeline_match:
+            name = timeline_match.group(1) or f"Timeline_{len(timelines)+1}"
+            current_timeline = Timeline(name)
+            timelines.append(current_timeline)
+            parsers.append(_ActionParser(current_timeline, templates))
+            continue
+
+        if current_timeline is None:
+            current_timeline = Timeline("Default")
+            timelines.append(current_timeline)
+            parsers.append(_ActionParser(current_timeline, templates))
+
+        # Parse Key-Value Pairs
+        if '=' in line or ':' in line:
+            if not line[0].isdigit():
+                parts = re.split(r'[:=]', line, 1)
+                key = parts[0].strip().lower()
+                value = parts[1].strip()
                 
-                # Ignore global config keys that are handled separately
-                if line.lower().startswith('requireadmin'):
+                if key == 'trigger':
+                    # Support multiple keys separated by comma
+                    keys = [k.strip().lower() for k in value.split(',') if k.strip()]
+                    current_timeline.trigger_keys.extend(keys)
                     continue
-
-                # Parse Timeline Header
-                timeline_match = re.match(r'^\[Timeline(?::\s*(.*))?\]$', line, re.IGNORECASE)
-                if timeline_match:
-                    name = timeline_match.group(1) or f"Timeline_{len(timelines)+1}"
-                    current_timeline = Timeline(name)
-                    timelines.append(current_timeline)
+                elif key == 'remark' or key == 'description':
+                    current_timeline.remark = value
                     continue
-
-                if current_timeline is None:
-                    current_timeline = Timeline("Default")
-                    timelines.append(current_timeline)
-
-                # Parse Key-Value Pairs
-                if '=' in line or ':' in line:
-                    if not line[0].isdigit():
-                        parts = re.split(r'[:=]', line, 1)
-                        key = parts[0].strip().lower()
-                        value = parts[1].strip()
-                        
-                        if key == 'trigger':
-                            # Support multiple keys separated by comma
-                            keys = [k.strip().lower() for k in value.split(',') if k.strip()]
-                            current_timeline.trigger_keys.extend(keys)
-                            continue
-                        elif key == 'remark' or key == 'description':
-                            current_timeline.remark = value
-                            continue
-                        elif key == 'name':
-                            current_timeline.name = value
-                            continue
-                        elif key == 'target' or key == 'window':
-                            current_timeline.target_window = value
-                            continue
-                        elif key == 'mode':
-                            mode_val = value.lower()
-                            if 'loop' in mode_val: current_timeline.mode = 'loop'
-                            elif 'hold' in mode_val: current_timeline.mode = 'hold'
-                            else: current_timeline.mode = 'oneshot'
-                            continue
-                        elif key == 'interval' or key == 'loopinterval':
-                            try:
-                                current_timeline.loop_interval = float(value)
-                            except ValueError:
-                                pass
-                            continue
-
-                # Parse Actions
-                # Split the line into Timestamp and the Rest
-                parts = line.split(maxsplit=1)
-                if len(parts) >= 2:
+                elif key == 'name':
+                    current_timeline.name = value
+                    continue
+                elif key == 'target' or key == 'window':
+                    current_timeline.target_window = value
+                    continue
+                elif key == 'mode':
+                    mode_val = value.lower()
+                    if 'loop' in mode_val: current_timeline.mode = 'loop'
+                    elif 'hold' in mode_val: current_timeline.mode = 'hold'
+                    else: current_timeline.mode = 'oneshot'
+                    continue
+                elif key in ('interval', 'loopinterval', 'period', 'loopperiod'):
+                    # Seconds, or frames with an `f` suffix (converted once FPS is known)
+                    attr, label = ('loop_interval', 'Interval') if 'interval' in key else ('loop_period', 'Period')
                     try:
-                        # Treat first column as milliseconds, convert to seconds internally
-                        timestamp = float(parts[0]) / 1000.0
-                        actions_str = parts[1]
-                        
-                        # Split multiple actions by comma
-                        action_groups = actions_str.split(',')
-                        
-                        for action_str in action_groups:
-                            action_parts = action_str.strip().split()
-                            if not action_parts:
-                                continue
-                                
-                            command = action_parts[0]
-                            args = action_parts[1:]
-                            current_timeline.actions.append((timestamp, command, args))
-                            
+                        seconds, frames = parse_duration(value)
                     except ValueError:
-                        pass
+                        print(f"[Warning] Line {line_num}: invalid {label} '{value}' ignored.")
+                        errors += 1
+                        continue
+                    fields = parsers[-1].frame_fields
+                    fields.pop(attr, None)
+                    if attr == 'loop_period' and seconds + frames <= 0:
+                        current_timeline.loop_period = None  # Back to Interval timing
+                        continue
+                    if frames:
+                        fields[attr] = frames
+                    setattr(current_timeline, attr, seconds)
+                    continue
+                elif key == 'inline':
+                    current_timeline.inline = value.lower() in ('true', 'yes', '1')
+                    continue
+                elif key == 'fps':
+                    current_timeline.fps = parse_positive(value)
+                    if current_timeline.fps is None:
+                        print(f"[Warning] Line {line_num}: invalid FPS '{value}' ignored.")
+                        errors += 1
+                    continue
+                elif key == 'framealign':
+                    current_timeline.frame_align = is_enabled(value)
+                    continue
+                elif key == 'frameperiod':
+                    period = parse_positive(value)
+                    if period is None:
+                        print(f"[Warning] Line {line_num}: invalid FramePeriod '{value}' ignored.")
+                        errors += 1
+                    else:
+                        current_timeline.frame_period = period / 1000.0
+                    continue
+                elif key == 'overrun':
+                    overrun_val = value.lower()
+                    if overrun_val in OVERRUN_POLICIES:
+                        current_timeline.loop_overrun = overrun_val
+                    else:
+                        print(f"[Warning] Line {line_num}: unknown Overrun '{value}', using '{current_timeline.loop_overrun}'.")
+                        errors += 1
+                    continue
+                elif key == 'concurrency':
+                    try:
+                        current_timeline.concurrency, current_timeline.concurrency_limit = parse_concurrency(value)
+                    except ValueError as e:
+                        print(f"[Warning] Line {line_num}: invalid Concurrency '{value}' ignored ({e}).")
+                        errors += 1
+                    continue
+                elif key == 'cooldown':
+                    try:
+                        cooldown = float(value)
+                        if cooldown < 0:
+                            raise ValueError
+                        current_timeline.cooldown = cooldown / 1000.0
+                    except ValueError:
+                        print(f"[Warning] Line {line_num}: invalid Cooldown '{value}' ignored.")
+                        errors += 1
+                    continue
 
+        # Parse Actions
+        parsers[-1].add(line, line_num)
+
+    for key, label in (('fps', 'FPS'), ('frameperiod', 'FramePeriod')):
+        if key in settings and parse_positive(settings[key]) is None:
+            print(f"[Warning] Invalid {label} '{settings[key]}' ignored.")
+            errors += 1
+    frame_settings = dict(defaults or {}, **settings)
+    for parser in parsers:
+        parser.finish(frame_settings)
+        errors += parser.errors
+    
+    return settings, timelines, errors
+
+def load_config(file_path: str):
+    """Read the config once. Returns (global settings, timelines); ({}, []) if the file is missing."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            settings, timelines, _ = parse_lines(f)
+            return settings, timelines
     except FileNotFoundError:
         print(f"Error: Config file not found: {file_path}")
-        return []
+        return {}, []
 
-    for t in timelines:
-        t.actions.sort(key=lambda x: x[0])
-    
-    return timelines
+def parse_config(file_path: str):
+    return load_config(file_path)[1]
+
+def is_enabled(value) -> bool:
+    """Interpret a True/Yes/1 style setting value."""
+    return bool(value) and value.strip().lower() in ('true', 'yes', '1', 'on')
+
+def parse_global_settings(file_path: str) -> dict:
+    """Read the global `Key = Value` lines that appear before the first [Timeline] header."""
+    return load_config(file_path)[0]
 
 def execute_action_wrapper(command, args, all_timelines=None):
-    """Wrapper to call pydirectinput functions safely."""
+    """Parse and run one action through the active input backend (uncompiled path)."""
     try:
         if command == 'key_down':
-            if args: pydirectinput.keyDown(args[0])
+            if args: backend.key_down(args[0])
         elif command == 'key_up':
-            if args: pydirectinput.keyUp(args[0])
+            if args: backend.key_up(args[0])
         elif command == 'press_key':
-            if args: pydirectinput.press(args[0])
+            if args: backend.press(args[0])
         elif command == 'mouse_down':
             button = args[0] if args else 'left'
-            pydirectinput.mouseDown(button=button)
+            backend.mouse_down(button)
         elif command == 'mouse_up':
             button = args[0] if args else 'left'
-            pydirectinput.mouseUp(button=button)
+            backend.mouse_up(button)
         elif command == 'click_mouse':
             button = args[0] if args else 'left'
-            pydirectinput.click(button=button)
+            backend.click(button)
         elif command == 'move_mouse':
             if len(args) >= 2:
-                pydirectinput.moveTo(int(args[0]), int(args[1]))
+                backend.move_to(int(args[0]), int(args[1]))
         elif command == 'move_mouse_relative':
             if len(args) >= 2:
-                pydirectinput.move(int(args[0]), int(args[1]))
+                backend.move(int(args[0]), int(args[1]))
         elif command == 'wait':
              if args: time.sleep(float(args[0]))
         elif command == 'run_timeline':
             if not all_timelines:
-                print("  [Error] run_timeline called but timeline list not available.")
+                log.error("  [Error] run_timeline called but timeline list not available.")
                 return
             
             target_name = " ".join(args).strip()
@@ -186,172 +552,222 @@ def execute_action_wrapper(command, args, all_timelines=None):
             
             if target_t:
                 if target_t.mode == 'oneshot':
-                    if not target_t.is_running:
-                        print(f"  [Action] Starting async timeline '{target_t.name}'...")
-                        target_t.is_running = True # Mark as running to prevent re-entry
-                        threading.Thread(target=run_timeline_once, args=(target_t, None, all_timelines)).start()
-                    else:
-                        print(f"  [Warn] Skipped async call to '{target_t.name}': already running.")
+                    run_timeline_async(target_t)
                 else:
-                    print(f"  [Warn] Cannot call timeline '{target_name}' because it is not OneShot.")
+                    log.warning("  [Warn] Cannot call timeline '%s' because it is not OneShot.", target_name)
             else:
-                print(f"  [Warn] Timeline '{target_name}' not found.")
+                log.warning("  [Warn] Timeline '%s' not found.", target_name)
         else:
-            print(f"  [Warn] Unknown command: {command}")
+            log.warning("  [Warn] Unknown command: %s", command)
     except Exception as e:
-        print(f"  [Error] Failed to execute {command} {args}: {e}")
-
-# --- Execution Logic for Different Modes ---
-
-def run_timeline_once(timeline: Timeline, active_trigger_key: str, all_timelines: list = None):
-    """Standard OneShot execution."""
-    # Safety Check: Prevent trigger key from being used in actions to avoid recursive loops/conflicts
-    if active_trigger_key:
-        trigger_key_lower = active_trigger_key.lower()
-        for _, command, args in timeline.actions:
-            if args and args[0].lower() == trigger_key_lower:
-                if command in ['key_down', 'press_key', 'key_up']:
-                    print(f"[Error] Timeline '{timeline.name}' conflict: Trigger key '{active_trigger_key}' cannot be used in actions.")
-                    timeline.is_running = False
-                    return
-
-    print(f"[Action] '{timeline.name}' (OneShot) started. Triggered by: {active_trigger_key}")
-    
-    def wait_for_release(t: Timeline, trigger_key: str):
-        if trigger_key:
-            # Wait for key to be released (with debounce)
-            while True:
-                if not key_check(trigger_key):
-                    time.sleep(0.05)
-                    if not key_check(trigger_key):
-                        break
-                time.sleep(0.01)
-        t.is_running = False
-        print(f"[Action] '{t.name}' finished and ready for next trigger.")
+        log.error("  [Error] Failed to execute %s %s: %s", command, args, e)
 
-    try:
-        start_time = time.perf_counter()
-        for timestamp, command, args in timeline.actions:
-            target_time = start_time + timestamp
-            while True:
-                current_time = time.perf_counter()
-                if current_time >= target_time:
-                    break
-                wait_time = target_time - current_time
-                if wait_time > 0.002:
-                     time.sleep(wait_time - 0.001)
-
-            execute_action_wrapper(command, args, all_timelines)
-            
-    finally:
-        # Start release monitor in background so actions can finish independently
-        if active_trigger_key:
-             threading.Thread(target=wait_for_release, args=(timeline, active_trigger_key), daemon=True).start()
-        else:
-             timeline.is_running = False
-def run_timeline_loop(timeline: Timeline, stop_event: threading.Event, all_timelines: list = None):
-    """Loop execution until stop_event is set."""
-    # timeline.is_running = True <-- Handled in main_loop now
-    print(f"[Action] '{timeline.name}' (Loop) started. Interval: {timeline.loop_interval}s")
-    
-    try:
-        while not stop_event.is_set():
-            start_time = time.perf_counter()
-            for timestamp, command, args in timeline.actions:
-                if stop_event.is_set(): break
-                
-                target_time = start_time + timestamp
-                while True:
-                    current_time = time.perf_counter()
-                    if current_time >= target_time:
-                        break
-                    wait_time = target_time - current_time
-                    if wait_time > 0.002:
-                         time.sleep(wait_time - 0.001)
-                
-                execute_action_wrapper(command, args, all_timelines)
-            
-            # Wait for loop interval or stop signal
-            if not stop_event.is_set():
-                time.sleep(timeline.loop_interval)
-    finally:
-        print(f"[Action] '{timeline.name}' (Loop) stopped.")
-        timeline.is_running = False
-
-def run_timeline_hold(timeline: Timeline, active_trigger_key: str, all_timelines: list = None):
+def start_run(t: Timeline, trigger_key: str = None, detected_at: float = None, at_once: bool = False):
     """
-    Executes timeline once, tracks keys pressed down.
-    Waits for trigger key release to release tracked keys.
+    Start an admitted activation of `t` (or its newer version after a hot
+    reload) and attach the run to the run-state. Runs start on the dispatch
+    thread unless `at_once` (sub-timeline calls, already on it or a worker).
     """
-    # timeline.is_running = True <-- Handled in main_loop now
-    print(f"[Action] '{timeline.name}' (Hold) started. Hold trigger '{active_trigger_key}' to keep state.")
-    
-    try:
-        # Track keys that are explicitly pressed down
-        keys_held_down = set()
-        mouse_buttons_held = set()
+    while t.replaced_by is not None:
+        t = t.replaced_by  # Plans and queued activations from before a hot reload start the current version
+    if t.mode == 'loop':
+        run = t.loop_run = LoopRun(t, engine, key_check, backend=backend, detected_at=detected_at, telemetry=telemetry)
+    elif t.mode == 'hold':
+        run = t.active_run = HoldRun(t, engine, key_check, trigger_key, backend, detected_at, telemetry)
+    else:
+        run = t.active_run = OneShotRun(t, engine, key_check, trigger_key, backend, detected_at, telemetry)
+    t.run_state.attach(run)
+    if at_once:
+        run.start()
+    else:
+        engine.call_soon(run.start)
+    return run
+
+def _has_room(t: Timeline) -> bool:
+    # Whether a trigger would start a run now rather than queue / restart / drop (unlocked read)
+    return t.run_state.active < (t.concurrency_limit if t.concurrency == 'parallel' else 1)
+
+def run_timeline_async(target_t: Timeline):
+    """Start a OneShot sub-timeline on the scheduler, following its Concurrency policy if it is already running."""
+    while target_t.replaced_by is not None:
+        target_t = target_t.replaced_by  # Plans from before a hot reload start the current version
+    if pool is not None and _has_room(target_t) and not pool.admit():
+        log.warning("  [Warn] Skipped async call to '%s': all workers busy.", target_t.name)
+        return
+    # Sub-timeline calls are not debounced
+    result, victim = target_t.run_state.admit(target_t.concurrency, target_t.concurrency_limit, None, engine.now(),
+                                              partial(start_run, target_t))
+    if result == START or result == RESTART:
+        if victim is not None:
+            victim.stop()
+        log.info("  [Action] Starting async timeline '%s'...", target_t.name)
+        start_run(target_t, at_once=True)
+    elif result == QUEUED:
+        log.info("  [Action] Async call to '%s' queued.", target_t.name)
+    else:
+        log.warning("  [Warn] Skipped async call to '%s': already running.", target_t.name)
 
-        start_time = time.perf_counter()
-        for timestamp, command, args in timeline.actions:
-            target_time = start_time + timestamp
-            
-            # Precise wait loop
-            while True:
-                current_time = time.perf_counter()
-                if current_time >= target_time:
-                    break
-                wait_time = target_time - current_time
-                if wait_time > 0.002:
-                     time.sleep(wait_time - 0.001)
-
-            # Track state before executing
-            if command == 'key_down' and args:
-                keys_held_down.add(args[0])
-            elif command == 'key_up' and args:
-                if args[0] in keys_held_down:
-                    keys_held_down.remove(args[0])
-            elif command == 'mouse_down':
-                btn = args[0] if args else 'left'
-                mouse_buttons_held.add(btn)
-            elif command == 'mouse_up':
-                btn = args[0] if args else 'left'
-                if btn in mouse_buttons_held:
-                    mouse_buttons_held.remove(btn)
-
-            execute_action_wrapper(command, args, all_timelines)
-        
-        # Debug info
-        if keys_held_down or mouse_buttons_held:
-            print(f"  [Hold] Holding keys: {list(keys_held_down)}, Mouse: {list(mouse_buttons_held)}")
-        
-        print(f"  -> Script finished. Waiting for trigger '{active_trigger_key}' release...")
-        
-        # Wait for physical key release
-        if active_trigger_key:
-            while key_check(active_trigger_key):
-                time.sleep(0.005) # Increased poll rate for release check
-        
-        print("  -> Trigger released. Cleaning up keys.")
-        
-        # Cleanup: Release all held keys/buttons
-        for k in keys_held_down:
-            print(f"    [Cleanup] Releasing Key: {k}")
-            pydirectinput.keyUp(k)
-        for b in mouse_buttons_held:
-            print(f"    [Cleanup] Releasing Mouse: {b}")
-            pydirectinput.mouseUp(button=b)
-
-    finally:
-        print(f"[Debug] Setting is_running=False for '{timeline.name}'")
-        timeline.is_running = False
+def trigger_timeline(t: Timeline, active_trigger_key: str, window, last_triggered: dict, detected_at: float = None) -> bool:
+    """
+    Handle a press of one of `t`'s trigger keys: window check, then the
+    cooldown and Concurrency policy (src/concurrency.py) decide whether to
+    start, queue, restart or toggle. Returns True if the press was accepted.
+    """
+    # Window Check (the tracker only reads the title when it is actually needed)
+    # Times come from the engine clock, so a simulated run (src/simulate.py) sees virtual time
+    if t.target_lower is not None:
+        if t.target_lower not in window.title_lower():
+            now = engine.now()
+            last_log = last_triggered.get(t.name + "_log")
+            if last_log is None or now - last_log > 1.0: # Log max once per second per timeline
+                log.debug("[Debug] Key '%s' ignored. Target '%s' not found in current window '%s'.", active_trigger_key, t.target_window, window.title())
+                last_triggered[t.name + "_log"] = now
+            return False
+
+    now = engine.now()
+    state = t.run_state
+
+    if t.mode == 'loop':
+        # Toggle Logic: a loop runs once at most, the next press stops it
+        if t.loop_run and not t.loop_run.finished:
+            if not state.debounce(now, t.cooldown):
+                return False
+            t.loop_run.stop()
+            t.loop_run = None
+            log.info("[System] Loop '%s' toggled OFF.", t.name)
+            return True
+        policy, limit = 'drop', 1
+    else:
+        policy, limit = t.concurrency, t.concurrency_limit
+
+    if pool is not None and _has_room(t) and not pool.admit():
+        log.warning("[Warn] '%s' skipped: all workers busy.", t.name)
+        return False
+    # Queued activations start later: their trigger latency would say nothing about the press
+    launch = partial(start_run, t, active_trigger_key) if policy == 'queue' else None
+    result, victim = state.admit(policy, limit, t.cooldown, now, launch)
+
+    if result == START or result == RESTART:
+        if victim is not None:
+            log.info("[Action] '%s' restarted by '%s'.", t.name, active_trigger_key)
+            victim.stop()
+        log.debug("[Debug] Key '%s' detected. Starting %s run for '%s'", active_trigger_key, t.mode, t.name)
+        start_run(t, active_trigger_key, detected_at)
+        if t.mode == 'loop':
+            log.info("[System] Loop '%s' toggled ON.", t.name)
+        return True
+    if result == QUEUED:
+        log.debug("[Debug] '%s' queued (%d waiting).", t.name, len(state.pending))
+        return True
+    if result == DROPPED:
+        log.debug("[Debug] '%s' %s skipped (already running).", t.name, t.mode)
+    # Otherwise within the cooldown
+    return False
+
+def stop_timeline(t: Timeline) -> bool:
+    """Stop the running instances of `t` (Hold releases what it holds) and clear its queue. Returns False if nothing runs."""
+    runs = [run for run in t.run_state.stop_all() if not run.finished]
+    if not runs:
+        return False
+    for run in runs:
+        run.stop()
+    if t.loop_run is not None:
+        t.loop_run = None
+        log.info("[System] Loop '%s' toggled OFF.", t.name)
+    return True
+
+def control_command(verb: str, name: str, timelines_by_name: dict, window, last_triggered: dict) -> str:
+    """Run one command of a control channel request (src/ipc.py) and return its reply."""
+    if verb == 'ping':
+        return "pong"
+    if verb == 'list':
+        return ", ".join(t.name for t in timelines_by_name.values())
+    t = timelines_by_name.get(name.lower())
+    if t is None:
+        return "error unknown timeline"
+    if verb == 'status':
+        return "running" if t.is_running else "idle"
+    if verb == 'stop':
+        return "ok" if stop_timeline(t) else "idle"
+    if verb == 'toggle' and t.is_running:
+        return "off" if stop_timeline(t) else "busy"
+    if trigger_timeline(t, None, window, last_triggered, engine.now()):
+        if t.mode == 'loop':
+            return "on" if t.loop_run else "off"
+        return "ok"
+    return "skipped"
 
 # --- Main Loop ---
 
-def main_loop(file_path: str):
-    timelines = parse_config(file_path)
+def load_startup(file_path: str, use_cache: bool = True):
+    """
+    Load and compile a config in one pass, through the on-disk startup cache
+    keyed by the config bytes and the key mapping (see src/cache.py).
+    Returns (settings, timelines, errors, cached). Plans are unbound: call
+    `bind_timelines` once the backend is known.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        print(f"Error: Config file not found: {file_path}")
+        return {}, [], 0, False
+
+    key = cache_key(data, key_mapping.mapping_fingerprint())
+    path = cache_path(file_path)
+    if use_cache:
+        payload = read_cache(path, key)
+        if payload is not None:
+            settings, states, errors = payload
+            return settings, [timeline_from_state(state) for state in states], errors, True
+
+    settings, timelines, errors = parse_lines(data.decode('utf-8').splitlines())
+    errors += compile_timelines(timelines)
+    if use_cache and timelines and is_enabled(settings.get('configcache', 'true')):
+        write_cache(path, key, (settings, [timeline_state(t) for t in timelines], errors))
+    return settings, timelines, errors, False
+
+def main_loop(file_path: str, startup=None):
+    """`startup` is a `load_startup` result, so run.py does not load the config a second time."""
+    global backend, pool, telemetry, trigger_index
+    if key_mapping.MAPPING_STATUS:
+        print(key_mapping.MAPPING_STATUS)
+    settings, timelines, errors, cached = startup or load_startup(file_path)
     if not timelines:
         print("No timelines loaded.")
         return
+    if cached:
+        print(f"[System] Loaded compiled config from cache ({cache_path(file_path)})")
+
+    log.set_level(settings.get('loglevel', 'info'))
+    telemetry = Telemetry(clock=engine.clock) if is_enabled(settings.get('telemetry', 'true')) else None
+    telemetry_export = settings.get('telemetryexport')
+    backend = create_injector(create_backend(settings.get('inputbackend', 'pydirectinput')), settings.get('injector'),
+                              settings.get('injectorpriority'), settings.get('injectoraffinity'))
+    engine.on_batch_end = backend.flush
+    print(f"[System] Input backend: {backend.name}")
+    if isinstance(backend, InjectorBackend):
+        cpus = ",".join(map(str, backend.cpus)) or "any"
+        print(f"[System] Injector thread: priority {backend.priority}, CPU(s) {cpus}")
+    engine.wait_strategy = create_wait_strategy(settings.get('waitmode', 'hybrid'))
+    margin = getattr(engine.wait_strategy, 'margin', None)
+    margin_str = f" (spin margin {margin * 1000:.2f} ms)" if margin is not None else ""
+    print(f"[System] Wait strategy: {engine.wait_strategy.name}{margin_str}")
+    pool = create_pool(settings.get('workers'), settings.get('workerpolicy'), on_task_end=backend.flush)
+    engine.executor = pool
+    if pool is not None:
+        print(f"[System] Worker pool: {pool.size} thread(s), policy {pool.policy}")
+
+    bind_timelines(timelines, run_timeline_async, backend)
+    if errors:
+        where = "See errors above." if not cached else "Set ConfigCache = False to see the errors again."
+        print(f"[Warning] {errors} invalid line(s) or action(s) were skipped. {where}")
+    if is_enabled(settings.get('inlinesubtimelines')):
+        inlined, skipped = flatten_timelines(timelines)
+        print(f"[System] Inlined {inlined} run_timeline call(s) at load time ({skipped} overlapping call(s) dropped).")
+    trigger_index = TriggerIndex(timelines)
+    trigger_source = create_trigger_source(settings.get('triggermode', 'poll'), trigger_index)
+    print(f"[System] Trigger source: {trigger_source.name}")
 
     print(f"Loaded {len(timelines)} timelines from {os.path.basename(file_path)}")
     print("-" * 70)
@@ -362,101 +778,89 @@ def main_loop(file_path: str):
         target = t.target_window if t.target_window else "ALL"
         print(f"{t.name:<20} | {triggers_str:<20} | {t.mode:<8} | {target:<10}")
     print("-" * 70)
-    print("Running... Press Ctrl+C to exit.")
-
+    watcher = None
+    if is_enabled(settings.get('hotreload', 'true')):
+        watcher = ConfigWatcher(file_path, timelines, trigger_index, settings, run_timeline_async, backend).start()
+        print(f"[System] Watching {os.path.basename(file_path)} for changes (HotReload)")
     last_triggered = {}
-    COOLDOWN = 0.3 # Basic debounce
-    last_heartbeat = time.time()
+    window = ForegroundWindowTracker()
+    timelines_by_name = by_name(timelines)
+    control = create_control_server(
+        settings.get('controlport'),
+        lambda verb, name: control_command(verb, name, timelines_by_name, window, last_triggered),
+        wake=trigger_source.wake)
+    if control is not None:
+        print(f"[System] Control channel on 127.0.0.1:{control.port}")
+    print("Running... Press Ctrl+C to exit.")
+    engine.start()
+
+    def refresh_active_set():
+        # Recompute the per-window active set only when the foreground window changed
+        if window.changed() and trigger_index.activate(window.title_lower()):
+            log.debug("[Debug] Window changed to '%s'. Active triggers: %d", window.title(), len(trigger_index.vks))
+
+    def on_key(vk, pressed, detected_at):
+        if pressed:
+            refresh_active_set()
+        for t, key in trigger_index.triggered(vk, pressed, detected_at):
+            trigger_timeline(t, key, window, last_triggered, detected_at)
+
+    def on_tick():
+        global trigger_index
+        nonlocal timelines, timelines_by_name
+        if watcher is not None and watcher.pending is not None:
+            # Swap in a reloaded config between two ticks
+            trigger_index = trigger_source.index = watcher.apply()
+            timelines = watcher.timelines
+            timelines_by_name = by_name(timelines)
+        refresh_active_set()
+        if control is not None and not control.requests.empty():
+            control.process()
+        for t, key in trigger_index.due(engine.now()):
+            # Hold-time triggers
+            trigger_timeline(t, key, window, last_triggered, engine.now())
 
     try:
-        while True:
-            # Heartbeat every 5 seconds
-            if time.time() - last_heartbeat > 5.0:
-                print(f"[System] Heartbeat. Active threads: {threading.active_count()}.")
-                # Print status of all timelines
-                for t in timelines:
-                    print(f"  -> Timeline '{t.name}': is_running={t.is_running}")
-                last_heartbeat = time.time()
-
-            current_window_title = get_active_window_title()
-
-            for t in timelines:
-                if t.trigger_keys:
-                    # Check all trigger keys for this timeline
-                    active_trigger_key = None
-                    for key in t.trigger_keys:
-                        if key_check(key):
-                            active_trigger_key = key
-                            break
-                    
-                    if active_trigger_key:
-                        # 2. Window Check
-                        if t.target_window and t.target_window.upper() != "ALL":
-                            if t.target_window.lower() not in current_window_title.lower():
-                                now = time.time()
-                                last_log = last_triggered.get(t.name + "_log", 0)
-                                if now - last_log > 1.0: # Log max once per second per timeline
-                                    print(f"[Debug] Key '{active_trigger_key}' ignored. Target '{t.target_window}' not found in current window '{current_window_title}'.")
-                                    last_triggered[t.name + "_log"] = now
-                                continue
-
-                        now = time.time()
-                        last_time = last_triggered.get(t.name, 0)
-                        time_since_last = now - last_time
-                        
-                        # Debug log for every press detection (throttled to avoid spamming console completely)
-                        # Only print if we are NOT running, to see if we are trying to start
-                        if not t.is_running and (time_since_last > COOLDOWN):
-                            print(f"[Debug] Key '{active_trigger_key}' detected. Mode: {t.mode}, Running: {t.is_running}, Cooldown: {time_since_last:.2f}s")
-
-                        if (time_since_last > COOLDOWN):
-                            if t.mode == 'loop':
-                                last_triggered[t.name] = now
-                                # Toggle Logic
-                                if t.loop_thread and t.loop_thread.is_alive():
-                                    t.loop_stop_event.set()
-                                    t.loop_thread.join()
-                                    print(f"[System] Loop '{t.name}' toggled OFF.")
-                                else:
-                                    if not t.is_running:
-                                        t.is_running = True 
-                                        t.loop_stop_event = threading.Event()
-                                        t.loop_thread = threading.Thread(target=run_timeline_loop, args=(t, t.loop_stop_event, timelines))
-                                        t.loop_thread.start()
-                                        print(f"[System] Loop '{t.name}' toggled ON.")
-                                    else:
-                                        print(f"[Debug] '{t.name}' loop skipped (flag is_running=True).")
-                            
-                            elif t.mode == 'hold':
-                                if not t.is_running:
-                                    last_triggered[t.name] = now
-                                    t.is_running = True 
-                                    print(f"[Debug] Starting Hold thread for '{t.name}'")
-                                    threading.Thread(target=run_timeline_hold, args=(t, active_trigger_key, timelines)).start()
-                                else:
-                                    # This is normal while holding
-                                    pass 
-                            
-                            else: # OneShot
-                                if not t.is_running:
-                                    last_triggered[t.name] = now
-                                    t.is_running = True 
-                                    print(f"[Debug] Starting OneShot thread for '{t.name}'")
-                                    threading.Thread(target=run_timeline_once, args=(t, active_trigger_key, timelines)).start()
-                                else:
-                                    print(f"[Debug] '{t.name}' oneshot skipped (flag is_running=True).")
-                        else:
-                             # Cooldown active
-                             pass
-
-            time.sleep(0.001) # Optimized polling rate
-
+        trigger_source.run(on_key, on_tick)
     except KeyboardInterrupt:
-        print("\nExiting...")
+        log.info("\nExiting...")
+        trigger_source.stop()
+        if watcher is not None:
+            watcher.stop()
+        if control is not None:
+            control.stop()
         # Cleanup loops
         for t in timelines:
-            if t.loop_stop_event:
-                t.loop_stop_event.set()
+            if t.loop_run:
+                t.loop_run.stop()
+        engine.stop()
+        if isinstance(backend, InjectorBackend):
+            backend.stop()  # Sends what the engine queued last
+        log.stop()  # Write out what the engine logged before the summaries
+        stats = engine.wait_strategy.stats.summary()
+        if stats['waits']:
+            print(f"[System] Wait lateness over {stats['waits']} waits: p50 {stats['p50_us']:.0f} us, "
+                  f"p99 {stats['p99_us']:.0f} us, max {stats['max_us']:.0f} us, spin share {stats['spin_share']:.0%}")
+        if pool is not None:
+            print(f"[System] Worker pool: {pool.stats}")
+        for t in timelines:
+            state = t.run_state
+            if state.dropped or state.queued or state.restarted:
+                print(f"[System] Activations '{t.name}': {state}")
+        if isinstance(backend, InjectorBackend):
+            print(f"[System] Injector: {backend.stats}")
+        if telemetry is not None and telemetry.count:
+            print("[System] Action timing:")
+            print(telemetry.format_summary('timeline'))
+            print(telemetry.format_summary('command'))
+            if telemetry_export:
+                try:
+                    written = telemetry.export(telemetry_export)
+                    print(f"[System] Exported {written} timing record(s) to {telemetry_export}")
+                except OSError as e:
+                    print(f"[Error] Could not export timing records: {e}")
+        if log.dropped:
+            print(f"[Warning] {log.dropped} log message(s) were dropped (ring buffer full).")
 
 if __name__ == "__main__":
     def is_admin():
@@ -465,25 +869,16 @@ if __name__ == "__main__":
         except:
             return False
 
-    def check_admin_required(file_path: str):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip().lower()
-                    if line.startswith('requireadmin') and ('true' in line or 'yes' in line or '1' in line):
-                        return True
-        except:
-            pass
-        return False
-
     if len(sys.argv) > 1:
         config_file = sys.argv[1]
-        if check_admin_required(config_file) and not is_admin():
+        # Loaded once: the settings answer RequireAdmin and main_loop reuses the result
+        startup = load_startup(config_file)
+        if is_enabled(startup[0].get('requireadmin')) and not is_admin():
             print("Config requires administrator privileges. Requesting...")
             params = " ".join([f'"{arg}"' for arg in sys.argv])
             ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, params, None, 1)
             sys.exit()
 
-        main_loop(config_file)
+        main_loop(config_file, startup)
     else:
         print("Usage: python control.py <config_file>")
@@ -0,0 +1,242 @@
+"""
+Dedicated injection thread.
+
+Without it, input is injected by whichever thread runs the due event: the
+scheduler's dispatch thread or a pool worker. `InjectorBackend` wraps the
+configured backend instead: every call (including `flush`) is pushed into a
+CommandRing and one dedicated thread, optionally with a raised OS priority
+and pinned to chosen CPUs, makes the real backend calls in order.
+
+The ring is a fixed array of slots. Producers claim a sequence number with
+an atomic counter and publish the slot by writing it; the consumer reads
+slots in sequence order. No lock is taken on either side; a producer that
+finds the ring full waits for the consumer. The injector only sleeps when
+the ring stays empty for SPIN_TIME, so a burst of actions is picked up
+without a wake-up.
+
+`stats` records the hand-off delay from push to the start of the backend call.
+"""
+import ctypes
+import os
+import sys
+import threading
+import time
+
+from src.backends import InputBackend
+from src.log import log
+from src.samples import STATS_SIZE, SampleRing, sequence
+
+RING_SIZE = 1024
+SPIN_TIME = 0.0005  # Seconds the injector polls an empty ring before it sleeps
+FULL_WAIT = 0.0001  # Producer back-off while the ring is full
+
+INJECTOR_PRIORITIES = ('normal', 'high', 'critical')
+# Windows thread priorities and Linux nice values per setting
+_WIN_PRIORITY = {'normal': 0, 'high': 2, 'critical': 15}  # THREAD_PRIORITY_NORMAL / HIGHEST / TIME_CRITICAL
+_NICE = {'normal': 0, 'high': -10, 'critical': -20}
+
+
+class CommandRing:
+    """Multi-producer, single-consumer ring of (func, args, pushed_at) commands."""
+
+    def __init__(self, size: int = RING_SIZE):
+        self.size = size
+        self._slots = [None] * size  # (seq, func, args, pushed_at)
+        self._claim = sequence()
+        self.tail = 0  # Next sequence number the consumer reads
+
+    def push(self, func, args, pushed_at: float) -> bool:
+        """Returns True if the ring was full and the push had to wait for the consumer."""
+        seq = next(self._claim)
+        full = False
+        while seq - self.tail >= self.size:
+            # A claimed sequence number must be published, so wait instead of overwriting an unread slot
+            full = True
+            time.sleep(FULL_WAIT)
+        self._slots[seq % self.size] = (seq, func, args, pushed_at)
+        return full
+
+    def pop(self):
+        """Next command in sequence order, or None if it is not published yet."""
+        item = self._slots[self.tail % self.size]
+        if item is None or item[0] != self.tail:
+            return None
+        self._slots[self.tail % self.size] = None
+        self.tail += 1
+        return item
+
+
+class InjectorStats:
+    """Hand-off delay ring (seconds) plus counters."""
+
+    def __init__(self, size: int = STATS_SIZE):
+        self.handoff = SampleRing(size)
+        self.full = 0  # Pushes that waited because the ring was full
+        self.sleeps = 0  # Times the injector went to sleep on an empty ring
+
+    @property
+    def count(self) -> int:
+        return self.handoff.count
+
+    def record(self, delay: float):
+        self.handoff.record(delay)
+
+    def __str__(self):
+        handoff = self.handoff.summary()
+        text = f"commands {self.count}, ring full {self.full}, sleeps {self.sleeps}"
+        if handoff is not None:
+            text += f", hand-off p50 {handoff['p50_us']:.0f} us, p99 {handoff['p99_us']:.0f} us, max {handoff['max_us']:.0f} us"
+        return text
+
+
+def parse_cpus(value) -> tuple:
+    """`InjectorAffinity` value such as `3` or `2,3` -> (2, 3). Empty -> ()."""
+    if not value:
+        return ()
+    return tuple(sorted({int(part) for part in str(value).replace(' ', '').split(',') if part}))
+
+
+def elevate_current_thread(priority: str = 'high', cpus=()):
+    """
+    Raise the calling thread's scheduling priority and pin it to `cpus`.
+    Failures (e.g. no permission for a negative nice value) are reported and ignored.
+    """
+    if sys.platform == 'win32':
+        kernel32 = ctypes.windll.kernel32
+        thread = kernel32.GetCurrentThread()
+        if priority != 'normal' and not kernel32.SetThreadPriority(thread, _WIN_PRIORITY[priority]):
+            log.warning("[Warning] Could not raise injector thread priority.")
+        if cpus:
+            mask = 0
+            for cpu in cpus:
+                mask |= 1 << cpu
+            if not kernel32.SetThreadAffinityMask(thread, mask):
+                log.warning("[Warning] Could not pin injector thread to CPU(s) %s.", cpus)
+        return
+    tid = threading.get_native_id()
+    if priority != 'normal' and hasattr(os, 'setpriority'):
+        try:
+            # On Linux the nice value is per thread
+            os.setpriority(os.PRIO_PROCESS, tid, _NICE[priority])
+        except OSError as e:
+            log.warning("[Warning] Could not raise injector thread priority: %s", e)
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError as e:
+            log.warning("[Warning] Could not pin injector thread to CPU(s) %s: %s", cpus, e)
+
+
+class InjectorBackend(InputBackend):
+    """Backend wrapper that hands every call to the injection thread."""
+
+    def __init__(self, inner: InputBackend, priority: str = 'high', cpus=(), ring_size: int = RING_SIZE,
+                 clock=time.perf_counter):
+        self.inner = inner
+        self.name = f"{inner.name} via injector"
+        self.priority = priority
+        self.cpus = tuple(cpus)
+        self.clock = clock
+        self.ring = CommandRing(ring_size)
+        self.stats = InjectorStats()
+        self._wake = threading.Event()
+        self._sleeping = False
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="injector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        """Run what is still queued, then stop the thread."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _push(self, func, *args):
+        if self._thread is None:
+            func(*args)  # Not started (or stopped): inject directly
+            return
+        if self.ring.push(func, args, self.clock()):
+            self.stats.full += 1
+        if self._sleeping:
+            self._wake.set()
+
+    def _execute(self, item):
+        _, func, args, pushed_at = item
+        self.stats.record(self.clock() - pushed_at)
+        try:
+            func(*args)
+        except Exception as e:
+            log.error("[Error] Injected %s%s failed: %s", getattr(func, '__name__', func), args, e)
+
+    def _run(self):
+        elevate_current_thread(self.priority, self.cpus)
+        ring = self.ring
+        clock = self.clock
+        wake = self._wake
+        while True:
+            item = ring.pop()
+            if item is not None:
+                self._execute(item)
+                continue
+            if self._stopping:
+                return
+            idle_until = clock() + SPIN_TIME
+            while item is None and clock() < idle_until:
+                item = ring.pop()
+            if item is not None:
+                self._execute(item)
+                continue
+            # Announce the sleep, then check once more so a push in between is not missed
+            wake.clear()
+            self._sleeping = True
+            item = ring.pop()
+            if item is None and not self._stopping:
+                self.stats.sleeps += 1
+                wake.wait()
+            self._sleeping = False
+            if item is not None:
+                self._execute(item)
+
+    def key_down(self, key): self._push(self.inner.key_down, key)
+    def key_up(self, key): self._push(self.inner.key_up, key)
+    def press(self, key): self._push(self.inner.press, key)
+    def mouse_down(self, button='left'): self._push(self.inner.mouse_down, button)
+    def mouse_up(self, button='left'): self._push(self.inner.mouse_up, button)
+    def click(self, button='left'): self._push(self.inner.click, button)
+    def move_to(self, x, y): self._push(self.inner.move_to, x, y)
+    def move(self, dx, dy): self._push(self.inner.move, dx, dy)
+
+    def flush(self):
+        self._push(self.inner.flush)
+
+
+def create_injector(backend: InputBackend, mode, priority=None, affinity=None):
+    """
+    `mode` is the Injector setting: 'thread' wraps `backend` in a started
+    InjectorBackend, anything else ('off', empty) returns `backend` unchanged.
+    """
+    mode = (mode or 'off').strip().lower()
+    if mode in ('off', 'false', 'no', '0', ''):
+        return backend
+    if mode != 'thread':
+        print(f"[Warning] Unknown injector mode '{mode}', injecting on the dispatch thread.")
+        return backend
+    priority = (priority or 'high').strip().lower()
+    if priority not in INJECTOR_PRIORITIES:
+        print(f"[Warning] Unknown injector priority '{priority}', using high.")
+        priority = 'high'
+    try:
+        cpus = parse_cpus(affinity)
+    except ValueError:
+        print(f"[Warning] Invalid injector affinity '{affinity}', not pinning.")
+        cpus = ()
+    return InjectorBackend(backend, priority, cpus).start()
@@ -0,0 +1,163 @@
+"""
+Local control channel: trigger, stop, toggle and query timelines by name.
+
+The server listens on a TCP socket bound to 127.0.0.1 only (`ControlPort`).
+A request is one line of `;`-separated commands, the reply one line with one
+result per command, in order:
+
+    trigger 连招; status 连招        ->  ok; running
+    toggle 自动开火                  ->  on
+    stop 自动开火; status nosuch     ->  ok; error unknown timeline
+
+Commands: `trigger <name>` (same as pressing its trigger key), `toggle <name>`
+(stop if running, else trigger), `stop <name>`, `status <name>` (`running` /
+`idle`), `list` (names, comma separated) and `ping`. Connections stay open
+for any number of requests.
+
+Connection threads only parse and queue requests. The trigger thread runs
+them between two ticks (`process()`), through the same activation path as
+key presses, so Concurrency, Cooldown and window rules apply unchanged.
+"""
+import queue
+import socket
+import threading
+
+DEFAULT_PORT = 47800
+MAX_LINE = 65536
+VERBS = ('trigger', 'toggle', 'stop', 'status', 'list', 'ping')
+
+
+def parse_request(line: str):
+    """`trigger a; status b` -> [('trigger', 'a'), ('status', 'b')]."""
+    commands = []
+    for part in line.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        verb, _, name = part.partition(' ')
+        commands.append((verb.lower(), name.strip()))
+    return commands
+
+
+class _Request:
+    __slots__ = ('commands', 'replies', 'done')
+
+    def __init__(self, commands):
+        self.commands = commands
+        self.replies = None
+        self.done = threading.Event()
+
+
+class ControlServer:
+    """
+    `handler(verb, name) -> reply` is called on the trigger thread from
+    `process()`; `wake()` (e.g. TriggerSource.wake) is called after a request
+    is queued so an event-driven trigger loop picks it up at once.
+    """
+
+    def __init__(self, handler, port: int = DEFAULT_PORT, host: str = '127.0.0.1', wake=None):
+        self.handler = handler
+        self.wake = wake
+        self.requests = queue.SimpleQueue()
+        self.handled = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(8)
+        self.port = self._sock.getsockname()[1]
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._accept_loop, name="control-accept", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        # Unblock connections waiting for a trigger loop that no longer runs
+        self.process(lambda verb, name: "error stopping")
+
+    def _accept_loop(self):
+        while not self._stopping:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), name="control-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        with conn, conn.makefile('r', encoding='utf-8', newline='\n') as reader:
+            for line in reader:
+                if len(line) > MAX_LINE:
+                    conn.sendall(b"error request too long\n")
+                    continue
+                commands = parse_request(line)
+                if not commands:
+                    continue
+                request = _Request(commands)
+                self.requests.put(request)
+                if self.wake is not None:
+                    self.wake()
+                request.done.wait()
+                try:
+                    conn.sendall(("; ".join(request.replies) + "\n").encode('utf-8'))
+                except OSError:
+                    return
+
+    def process(self, handler=None):
+        """Run every queued request. Call on the trigger thread between ticks."""
+        handler = handler or self.handler
+        requests = self.requests
+        while not requests.empty():
+            request = requests.get_nowait()
+            replies = []
+            for verb, name in request.commands:
+                if verb not in VERBS:
+                    replies.append(f"error unknown command '{verb}'")
+                    continue
+                try:
+                    replies.append(handler(verb, name))
+                except Exception as e:
+                    replies.append(f"error {e}")
+            request.replies = replies
+            self.handled += 1
+            request.done.set()
+
+
+class ControlClient:
+    """Blocking client for scripts and tools: `ControlClient().request('trigger a', 'status a')`."""
+
+    def __init__(self, port: int = DEFAULT_PORT, host: str = '127.0.0.1', timeout: float = 5.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile('r', encoding='utf-8', newline='\n')
+
+    def request(self, *commands) -> list:
+        self._sock.sendall(("; ".join(commands) + "\n").encode('utf-8'))
+        return [reply.strip() for reply in self._reader.readline().split(';')]
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+
+def create_control_server(port, handler, wake=None):
+    """`port` is the ControlPort setting (empty or 0 = off). Returns a started ControlServer or None."""
+    try:
+        port = int(port or 0)
+    except ValueError:
+        print(f"[Warning] Invalid control port '{port}', control channel disabled.")
+        return None
+    if port <= 0:
+        return None
+    try:
+        return ControlServer(handler, port, wake=wake).start()
+    except OSError as e:
+        print(f"[Warning] Could not open control port {port}: {e}")
+        return None
@@ -1,5 +1,6 @@
 # Windows Virtual Key Codes for GetAsyncKeyState
 # https://learn.microsoft.com/en-us/windows/win32/inputdev/virtual-key-codes
+import hashlib
 import json
 import os
 
@@ -50,6 +51,8 @@ else:
 
 # Try to load external JSON configuration from the base path
 json_path = os.path.join(base_path, 'key_mapping.json')
+# Outcome of loading key_mapping.json, printed by main_loop (importing stays silent)
+MAPPING_STATUS = None
 
 if os.path.exists(json_path):
     try:
@@ -59,6 +62,21 @@ if os.path.exists(json_path):
             # Normalize keys to lowercase for consistency
             for k, v in custom_mapping.items():
                 VK_MAPPING[k.lower()] = v
-        print(f"[System] Loaded external key mapping from {json_path}")
+        MAPPING_STATUS = f"[System] Loaded external key mapping from {json_path}"
     except Exception as e:
-        print(f"[Warning] Failed to load {json_path}: {e}")
\ No newline at end of file
+        MAPPING_STATUS = f"[Warning] Failed to load {json_path}: {e}"
+
+
+def mapping_fingerprint() -> bytes:
+    """Digest of the effective mapping, part of the startup cache key."""
+    return hashlib.sha256(repr(sorted(VK_MAPPING.items())).encode()).digest()
+
+
+def vk_for_key(key_name: str):
+    """Resolve a key name to a virtual-key code. Returns None for unknown names."""
+    if not key_name:
+        return None
+    vk = VK_MAPPING.get(key_name.lower())
+    if vk is None and len(key_name) == 1:
+        vk = ord(key_name.upper())
+    return vk
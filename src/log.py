@@ -0,0 +1,135 @@
+"""
+Non-blocking logger for the timing-critical threads.
+
+`log.info("[Action] '%s' started.", name)` only checks the level and stores
+`(seq, level, message, args)` in a preallocated ring; formatting and the
+console write happen on a background writer thread, so a slow console never
+delays the next action. If producers lap the writer, the oldest records are
+overwritten and counted in `dropped`.
+
+Messages keep their usual `[Action]` / `[Warn]` / `[Debug]` tags; the level
+only decides what is recorded. DEBUG is off unless `LogLevel = debug`.
+"""
+import atexit
+import sys
+import threading
+
+from src.samples import sequence
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'warn': WARNING, 'error': ERROR}
+RING_SIZE = 4096
+FLUSH_INTERVAL = 0.02
+
+
+class RingLogger:
+    def __init__(self, size: int = RING_SIZE, level: int = INFO, stream=None):
+        self.size = size
+        self.level = level
+        self.stream = stream  # None = sys.stdout at write time
+        self.dropped = 0
+        self._slots = [None] * size
+        self._seq = sequence()
+        self._read = 0
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._exit_hook = False
+        # False: no writer thread, the owner calls flush() (deterministic simulation output)
+        self.auto_flush = True
+
+    def set_level(self, level):
+        """Accepts a level number or a name from LEVELS."""
+        if isinstance(level, str):
+            name = level.strip().lower()
+            if name not in LEVELS:
+                self.warning("[Warning] Unknown log level '%s', using info.", level)
+                name = 'info'
+            level = LEVELS[name]
+        self.level = level
+
+    def log(self, level: int, message: str, *args):
+        if level < self.level:
+            return
+        seq = next(self._seq)
+        self._slots[seq % self.size] = (seq, level, message, args)
+        if self._thread is None and self.auto_flush:
+            self.start()
+
+    def debug(self, message: str, *args):
+        if DEBUG >= self.level:
+            self.log(DEBUG, message, *args)
+
+    def info(self, message: str, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message: str, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message: str, *args):
+        self.log(ERROR, message, *args)
+
+    # --- Writer side ---
+
+    def start(self):
+        with self._drain_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._writer, name="log-writer", daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                self._exit_hook = True
+                atexit.register(self.flush)
+
+    def flush(self):
+        """Format and write everything recorded so far on the calling thread."""
+        with self._drain_lock:
+            lines = self._collect()
+            if lines:
+                stream = self.stream or sys.stdout
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+
+    def stop(self):
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+        self.flush()
+
+    def _collect(self):
+        lines = []
+        slots = self._slots
+        size = self.size
+        read = self._read
+        while True:
+            record = slots[read % size]
+            if record is None or record[0] < read:
+                break  # Not written yet
+            seq, _, message, args = record
+            if seq > read:
+                # Producers lapped the writer: everything in between was overwritten
+                self.dropped += seq - read
+                lines.append(f"[Warning] Log overflow: {seq - read} message(s) dropped.")
+                read = seq
+            try:
+                lines.append(message % args if args else message)
+            except Exception as e:
+                lines.append(f"[Error] Bad log message {message!r} {args!r}: {e}")
+            read += 1
+        self._read = read
+        return lines
+
+    def _writer(self):
+        while not self._wake.wait(FLUSH_INTERVAL):
+            self.flush()
+        self._wake.clear()
+        self._thread = None
+
+
+# Process-wide logger used by the engine, runners and main loop
+log = RingLogger()
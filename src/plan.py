@@ -0,0 +1,447 @@
+"""
+Compile parsed timelines into immutable action plans.
+
+`parse_config` keeps actions as raw `(timestamp, command, args)` string tuples.
+Compiling resolves each command to a bound callable once at load time, so the
+runners only have to walk `timeline.plan` and call `action.func()`.
+
+`move_mouse_smooth` and `drag` are turned into their individual steps here,
+plain `move_mouse_relative` entries with the integer deltas precomputed, so
+running them costs no more than hand-written relative moves.
+
+A `repeat` block stays one plan entry, `PlannedAction(offset, 'repeat',
+(count, period, body plan), None, None)`. `iter_plan` expands it while the
+timeline runs, one repetition at a time, so a block of 12000 clicks costs
+the same to load and to keep in memory as a block of two.
+
+Compiling without a backend leaves `func` and `target` unset: such plans only
+hold plain data (offsets, commands, converted arguments) and can be cached on
+disk. `bind_timelines` fills in the callables afterwards.
+"""
+import heapq
+import time
+from collections import namedtuple
+from functools import partial
+from operator import itemgetter
+
+from src.backends import MOUSE_BUTTON_FLAGS
+from src.key_mapping import vk_for_key
+from src.log import log
+
+# offset: seconds from timeline start; args: converted arguments;
+# func: zero-argument callable; target: resolved Timeline for run_timeline.
+PlannedAction = namedtuple('PlannedAction', ['offset', 'command', 'args', 'func', 'target'])
+
+# Commands whose first argument is a keyboard key
+KEY_COMMANDS = ('key_down', 'key_up', 'press_key')
+
+# Relative moves eased over a duration, compiled into their steps
+SMOOTH_COMMANDS = ('move_mouse_smooth', 'drag')
+DEFAULT_STEP_RATE = 120.0  # Steps per second of move_mouse_smooth / drag
+
+
+def parse_offset(text: str):
+    """Time column / repeat period: `17` / `16.67` milliseconds -> (seconds, 0.0), `2f` / `1.5f` -> (0.0, frames)."""
+    if text[-1:] in ('f', 'F'):
+        return 0.0, float(text[:-1])
+    return float(text) / 1000.0, 0.0
+
+
+def _key_args(args):
+    if not args:
+        raise ValueError("missing key name")
+    if vk_for_key(args[0]) is None:
+        raise ValueError(f"unknown key '{args[0]}'")
+    return (args[0],)
+
+def _button_args(args):
+    button = args[0] if args else 'left'
+    if button.lower() not in MOUSE_BUTTON_FLAGS:
+        raise ValueError(f"unknown mouse button '{button}'")
+    return (button,)
+
+def _xy_args(args):
+    if len(args) < 2:
+        raise ValueError("expected two integer coordinates")
+    return (int(args[0]), int(args[1]))
+
+def _seconds_args(args):
+    if not args:
+        raise ValueError("missing duration")
+    return (float(args[0]),)
+
+# command -> (argument converter, factory taking (backend, converted args))
+_COMMANDS = {
+    'key_down': (_key_args, lambda b, a: partial(b.key_down, a[0])),
+    'key_up': (_key_args, lambda b, a: partial(b.key_up, a[0])),
+    'press_key': (_key_args, lambda b, a: partial(b.press, a[0])),
+    'mouse_down': (_button_args, lambda b, a: partial(b.mouse_down, a[0])),
+    'mouse_up': (_button_args, lambda b, a: partial(b.mouse_up, a[0])),
+    'click_mouse': (_button_args, lambda b, a: partial(b.click, a[0])),
+    'move_mouse': (_xy_args, lambda b, a: partial(b.move_to, a[0], a[1])),
+    'move_mouse_relative': (_xy_args, lambda b, a: partial(b.move, a[0], a[1])),
+    'wait': (_seconds_args, lambda b, a: partial(time.sleep, a[0])),
+}
+
+
+def _duration(timeline, text: str) -> float:
+    """Seconds for a `200` (ms) or `12f` (frames) argument."""
+    seconds, frames = parse_offset(text)
+    if frames and timeline.frame_period is None:
+        raise ValueError("frame period unknown")
+    return seconds + frames * (timeline.frame_period or 0.0)
+
+
+def _linear(p):
+    return p
+
+
+def easing_function(name: str):
+    """Easing curve for smooth moves: `linear` or a pytweening function name such as easeInOutQuad (any case)."""
+    if name.lower() == 'linear':
+        return _linear
+    try:
+        import pytweening
+    except ImportError:
+        raise ValueError(f"easing '{name}' needs pytweening") from None
+    for attr in dir(pytweening):
+        if attr.lower() == name.lower() and attr.startswith(('ease', 'linear')):
+            return getattr(pytweening, attr)
+    raise ValueError(f"unknown easing '{name}'")
+
+
+def smooth_steps(dx: int, dy: int, duration: float, easing=_linear, rate: float = DEFAULT_STEP_RATE):
+    """
+    [(offset, step dx, step dy)] of a relative move of (dx, dy) eased over
+    `duration` seconds at `rate` steps per second. Every step goes to the
+    rounded eased position, so rounding errors are carried into the next
+    step instead of adding up, and the path ends exactly on (dx, dy). Steps
+    that would not move the cursor are left out.
+    """
+    count = max(1, round(duration * rate))
+    steps = []
+    x = y = 0
+    for i in range(1, count + 1):
+        p = easing(i / count) if i < count else 1.0
+        nx, ny = round(dx * p), round(dy * p)
+        if nx != x or ny != y:
+            steps.append((duration * i / count, nx - x, ny - y))
+            x, y = nx, ny
+    return steps
+
+
+def _compile_smooth(timeline, timestamp, command, args, backend):
+    """
+    PlannedActions for `move_mouse_smooth dx dy duration [easing] [rate]` and
+    `drag dx dy duration [easing] [rate] [button]`; options may come in any
+    order. Raises ValueError.
+    """
+    if len(args) < 3:
+        raise ValueError("expected dx, dy and a duration")
+    dx, dy = int(args[0]), int(args[1])
+    duration = _duration(timeline, args[2])
+    if duration <= 0:
+        raise ValueError("duration must be above 0")
+    easing, rate, button = _linear, DEFAULT_STEP_RATE, 'left'
+    for option in args[3:]:
+        try:
+            number = float(option)
+        except ValueError:
+            number = None
+        if number is not None:
+            if number <= 0:
+                raise ValueError("step rate must be above 0")
+            rate = number
+        elif command == 'drag' and option.lower() in MOUSE_BUTTON_FLAGS:
+            button = option.lower()
+        else:
+            easing = easing_function(option)
+
+    def planned(offset, name, converted):
+        func = _COMMANDS[name][1](backend, converted) if backend is not None else None
+        return PlannedAction(offset, name, converted, func, None)
+
+    actions = []
+    if command == 'drag':
+        actions.append(planned(timestamp, 'mouse_down', (button,)))
+    for offset, step_x, step_y in smooth_steps(dx, dy, duration, easing, rate):
+        actions.append(planned(timestamp + offset, 'move_mouse_relative', (step_x, step_y)))
+    if command == 'drag':
+        actions.append(planned(timestamp + duration, 'mouse_up', (button,)))
+    return actions
+
+
+def _compile_repeat(timeline, timestamp, args, timelines_by_name, run_sub_timeline, backend):
+    """PlannedAction for a parsed `repeat` block. Returns (action or None, rejected actions)."""
+    count_text, period_text, body = args
+    try:
+        count = int(count_text)
+        period = _duration(timeline, period_text)
+        if count < 1 or period <= 0:
+            raise ValueError("count and period must be above 0")
+    except ValueError as e:
+        print(f"[Error] Timeline '{timeline.name}': {e} in 'repeat {count_text} {period_text}'. Block skipped.")
+        return None, 1 + len(body)
+    plan, errors = _compile_actions(timeline, body, timelines_by_name, run_sub_timeline, backend)
+    if not plan:
+        print(f"[Error] Timeline '{timeline.name}': empty body in 'repeat {count_text} {period_text}'. Block skipped.")
+        return None, errors + 1
+    if plan_span(plan) > period:
+        # Overlapping repetitions would not come out of iter_plan in time order
+        print(f"[Error] Timeline '{timeline.name}': body is longer than the period in 'repeat {count_text} {period_text}'. Block skipped.")
+        return None, errors + 1
+    return PlannedAction(timestamp, 'repeat', (count, period, plan), None, None), errors
+
+
+def _compile_actions(timeline, actions, timelines_by_name, run_sub_timeline, backend):
+    plan = []
+    errors = 0
+    smooth = False
+    for timestamp, command, args in actions:
+        if command == 'repeat':
+            action, rejected = _compile_repeat(timeline, timestamp, args, timelines_by_name, run_sub_timeline, backend)
+            errors += rejected
+            if action is not None:
+                plan.append(action)
+            continue
+        try:
+            if command in SMOOTH_COMMANDS:
+                plan.extend(_compile_smooth(timeline, timestamp, command, args, backend))
+                smooth = True
+                continue
+            if command == 'run_timeline':
+                target_name = " ".join(args).strip()
+                target_t = timelines_by_name.get(target_name.lower())
+                if target_t is None:
+                    raise ValueError(f"timeline '{target_name}' not found")
+                if target_t.mode != 'oneshot':
+                    raise ValueError(f"timeline '{target_name}' is not OneShot")
+                func = partial(run_sub_timeline, target_t) if backend is not None else None
+                plan.append(PlannedAction(timestamp, command, (target_t.name,), func, target_t if backend is not None else None))
+                continue
+
+            spec = _COMMANDS.get(command)
+            if spec is None:
+                raise ValueError("unknown command")
+            convert, bind = spec
+            converted = convert(args)
+            func = bind(backend, converted) if backend is not None else None
+            plan.append(PlannedAction(timestamp, command, converted, func, None))
+        except ValueError as e:
+            errors += 1
+            print(f"[Error] Timeline '{timeline.name}': {e} in '{command} {' '.join(args)}'. Action skipped.")
+    if smooth:
+        # Steps reach past later actions; the sort is stable, so equal offsets keep line order
+        plan.sort(key=lambda a: a.offset)
+    return tuple(plan), errors
+
+
+def compile_timeline(timeline, timelines_by_name: dict, run_sub_timeline, backend):
+    """
+    Build `timeline.plan` from `timeline.actions`.
+    Invalid actions are reported once here and left out of the plan.
+    With `backend` None the plan is left unbound (see `bind_timelines`).
+    Returns the number of rejected actions.
+    """
+    plan, errors = _compile_actions(timeline, timeline.actions, timelines_by_name, run_sub_timeline, backend)
+    timeline.plan = plan
+    # Lowercased `Target:` substring, None when the timeline applies to every window
+    target = timeline.target_window
+    timeline.target_lower = None if not target or target.upper() == "ALL" else target.lower()
+    # Lowercased keys used by keyboard actions, for the trigger conflict check
+    timeline.action_keys = frozenset(a.args[0].lower() for a in walk_plan(plan) if a.command in KEY_COMMANDS)
+    return errors
+
+
+def walk_plan(plan):
+    """Every action of `plan` except the repeat entries themselves, including those in repeat bodies, once each."""
+    for action in plan:
+        if action[1] == 'repeat':
+            yield from walk_plan(action[2][2])
+        else:
+            yield action
+
+
+def plan_span(plan) -> float:
+    """Offset of the last action the plan runs, repeats included."""
+    span = 0.0
+    for action in plan:
+        end = action.offset
+        if action.command == 'repeat':
+            count, period, body = action.args
+            end += (count - 1) * period + plan_span(body)
+        span = max(span, end)
+    return span
+
+
+def _shifted(actions, base):
+    for action in actions:
+        yield base + action.offset, action
+
+
+def _repetitions(action, base):
+    count, period, body = action.args
+    start = base + action.offset
+    if any(a.command == 'repeat' for a in body):
+        for k in range(count):
+            yield from iter_plan(body, start + k * period)
+        return
+    for k in range(count):
+        at = start + k * period
+        for a in body:
+            yield at + a.offset, a
+
+
+def iter_plan(plan, base: float = 0.0):
+    """
+    The actions a run dispatches, as (offset, action) in time order. Repeat
+    blocks are expanded lazily and merged with the actions around them; at
+    equal offsets entries keep their plan order.
+    """
+    if not any(action.command == 'repeat' for action in plan):
+        return _shifted(plan, base)
+    streams = []
+    segment = []
+    for action in plan:
+        if action.command == 'repeat':
+            if segment:
+                streams.append(_shifted(segment, base))
+                segment = []
+            streams.append(_repetitions(action, base))
+        else:
+            segment.append(action)
+    if segment:
+        streams.append(_shifted(segment, base))
+    if len(streams) == 1:
+        return streams[0]
+    return heapq.merge(*streams, key=itemgetter(0))
+
+
+def plain_plan(plan) -> tuple:
+    """(offset, command, args) tuples of a compiled plan, repeat bodies included, for the startup cache."""
+    return tuple((a[0], a[1], (a[2][0], a[2][1], plain_plan(a[2][2])) if a[1] == 'repeat' else a[2]) for a in plan)
+
+
+def by_name(timelines: list) -> dict:
+    """Lowercased name -> timeline."""
+    timelines_by_name = {}
+    for t in timelines:
+        # First definition wins, matching the old linear search
+        timelines_by_name.setdefault(t.name.lower(), t)
+    return timelines_by_name
+
+
+def compile_timelines(timelines: list, run_sub_timeline=None, backend=None):
+    """
+    Compile every timeline in place.
+    `run_sub_timeline(target)` is bound into `run_timeline` actions and
+    input commands are bound to the methods of `backend` (an InputBackend).
+    Without a backend the plans are validated but left unbound.
+    Returns the total number of rejected actions.
+    """
+    timelines_by_name = by_name(timelines)
+    errors = 0
+    for t in timelines:
+        errors += compile_timeline(t, timelines_by_name, run_sub_timeline, backend)
+    return errors
+
+
+def bind_plan(plan, timelines_by_name: dict, run_sub_timeline, backend) -> tuple:
+    """
+    Bound copy of a compiled plan. Entries may be PlannedActions or the plain
+    (offset, command, args) tuples of plans loaded from the startup cache.
+    """
+    bound = []
+    for action in plan:
+        offset, command, args = action[:3]
+        if command == 'repeat':
+            count, period, body = args
+            bound.append(PlannedAction(offset, command, (count, period, bind_plan(body, timelines_by_name, run_sub_timeline, backend)), None, None))
+        elif command == 'run_timeline':
+            target_t = timelines_by_name[args[0].lower()]
+            bound.append(PlannedAction(offset, command, args, partial(run_sub_timeline, target_t), target_t))
+        else:
+            bound.append(PlannedAction(offset, command, args, _COMMANDS[command][1](backend, args), None))
+    return tuple(bound)
+
+
+def bind_timelines(timelines: list, run_sub_timeline, backend):
+    """
+    (Re)bind the callables of already compiled plans to `backend` and
+    `run_sub_timeline` (see `bind_plan`).
+    """
+    timelines_by_name = by_name(timelines)
+    for t in timelines:
+        t.plan = bind_plan(t.plan, timelines_by_name, run_sub_timeline, backend)
+
+
+def _inlinable(target, base_plans) -> bool:
+    """
+    A OneShot target can be inlined unless it opts out with `Inline: false`,
+    has its own trigger keys (its run-state is then shared with key presses,
+    so it is only inlined with `Inline: true`), has a Concurrency policy
+    other than drop (queue / restart / parallel need its run-state too,
+    same exception) or uses `wait` or `repeat`.
+    """
+    if target.inline is False:
+        return False
+    if (target.trigger_keys or target.concurrency != 'drop') and target.inline is not True:
+        return False
+    return not any(a.command in ('wait', 'repeat') for a in base_plans[target])
+
+
+def _expand(timeline, plan, base, out, stack, busy_until, base_plans, counts):
+    for action in plan:
+        offset = base + action.offset
+        target = action.target
+        if target is None or not _inlinable(target, base_plans):
+            out.append((offset, len(stack), action._replace(offset=offset)))
+            continue
+        if target in stack:
+            # Leave the call to the runtime, where it is skipped because the target is running
+            chain = " -> ".join(t.name for t in stack + [target])
+            print(f"[Warning] Timeline '{timeline.name}': run_timeline cycle {chain} is not inlined.")
+            out.append((offset, len(stack), action._replace(offset=offset)))
+            continue
+        if offset < busy_until.get(target, float('-inf')):
+            # At runtime this call would be skipped: the earlier call is still running
+            counts['skipped'] += 1
+            continue
+        target_plan = base_plans[target]
+        busy_until[target] = offset + (target_plan[-1].offset if target_plan else 0.0)
+        counts['inlined'] += 1
+        _expand(timeline, target_plan, offset, out, stack + [target], busy_until, base_plans, counts)
+
+
+def flatten_timelines(timelines: list):
+    """
+    Optional pass after `compile_timelines`: replace `run_timeline` calls with
+    the actions of the called OneShot timeline, shifted by the call offset, so
+    no sub-timeline instance has to be started at runtime. Expands recursively;
+    cycles and non-inlinable targets keep runtime dispatch. Callers that use
+    `wait` are left as they are, since a wait would also delay inlined actions.
+    `action_keys` is not changed, so the trigger conflict check still only
+    looks at a timeline's own actions.
+    Returns (inlined calls, calls dropped because the runtime would skip them).
+    """
+    base_plans = {t: t.plan for t in timelines}
+    counts = {'inlined': 0, 'skipped': 0}
+    for t in timelines:
+        plan = base_plans[t]
+        if not any(a.target is not None for a in plan) or any(a.command == 'wait' for a in walk_plan(plan)):
+            continue
+        out = []
+        _expand(t, plan, 0.0, out, [t], {}, base_plans, counts)
+        # At equal offsets the caller's actions stay ahead of the sub-timeline's (stable sort
+        # by nesting depth), as they would when sub-timelines are started as separate instances
+        out.sort(key=lambda item: (item[0], item[1]))
+        t.plan = tuple(action for _, _, action in out)
+    return counts['inlined'], counts['skipped']
+
+
+def dispatch_action(action):
+    """Run one compiled PlannedAction."""
+    try:
+        action.func()
+    except Exception as e:
+        log.error("  [Error] Failed to execute %s %s: %s", action.command, list(action.args), e)
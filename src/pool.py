@@ -0,0 +1,170 @@
+"""
+Pre-started worker pool for the scheduler.
+
+By default the scheduler's dispatch thread runs every due event itself. With
+a pool, due events (timeline steps, release checks, activations) are handed
+to `size` worker threads created at startup, so a slow backend call in one
+timeline does not hold up the others and no thread is ever created at the
+moment of a trigger.
+
+When every worker is busy, `policy` decides what happens:
+- queue: the event waits for the next free worker (default).
+- inline: the dispatch thread runs the event itself.
+- drop: like queue for events of running timelines, but new activations are
+  refused (see `admit()`), so a busy pool never piles up more timelines.
+
+`stats` records how long events waited in the queue and how often the pool
+was saturated.
+"""
+import queue
+import threading
+import time
+
+from src.log import log
+from src.samples import STATS_SIZE, SampleRing
+
+POOL_POLICIES = ('queue', 'inline', 'drop')
+
+
+class PoolStats:
+    """Queue wait ring (seconds) plus saturation counters."""
+
+    def __init__(self, size: int = STATS_SIZE):
+        self.queue_wait = SampleRing(size)
+        self.submitted = 0
+        self.saturated = 0  # Submits that found no idle worker
+        self.inline = 0
+        self.dropped = 0  # Activations refused by the drop policy
+        self.peak_outstanding = 0  # Most events queued or running at once
+
+    def record_wait(self, wait: float):
+        self.queue_wait.record(wait)
+
+    def summary(self) -> dict:
+        wait = self.queue_wait.summary()
+        result = {
+            'submitted': self.submitted,
+            'saturated': self.saturated,
+            'saturation': self.saturated / self.submitted if self.submitted else 0.0,
+            'inline': self.inline,
+            'dropped': self.dropped,
+            'peak_outstanding': self.peak_outstanding,
+        }
+        if wait is not None:
+            result.update(p50_wait_us=wait['p50_us'], p99_wait_us=wait['p99_us'], max_wait_us=wait['max_us'])
+        return result
+
+    def __str__(self):
+        s = self.summary()
+        text = (f"submitted {s['submitted']}, saturated {s['saturated']} ({s['saturation']:.1%}), "
+                f"peak outstanding {s['peak_outstanding']}, inline {s['inline']}, dropped {s['dropped']}")
+        if 'p50_wait_us' in s:
+            text += f", queue wait p50 {s['p50_wait_us']:.0f} us, p99 {s['p99_wait_us']:.0f} us, max {s['max_wait_us']:.0f} us"
+        return text
+
+
+class WorkerPool:
+    def __init__(self, size: int, policy: str = 'queue', on_task_end=None, clock=time.perf_counter):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        if policy not in POOL_POLICIES:
+            raise ValueError(f"unknown pool policy '{policy}'")
+        self.size = size
+        self.policy = policy
+        # Called on the worker after each event, e.g. InputBackend.flush
+        self.on_task_end = on_task_end
+        self.clock = clock
+        self.stats = PoolStats()
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._outstanding = 0  # Events queued or running
+        self._threads = []
+
+    @property
+    def outstanding(self) -> int:
+        return self._outstanding
+
+    def start(self):
+        """Start every worker up front so no thread is created on a trigger."""
+        if self._threads:
+            return
+        for i in range(self.size):
+            thread = threading.Thread(target=self._worker, name=f"worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 1.0):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def admit(self) -> bool:
+        """Whether a new timeline activation may start. Only the drop policy refuses."""
+        if self.policy == 'drop' and self._outstanding >= self.size:
+            self.stats.dropped += 1
+            return False
+        return True
+
+    def submit(self, callback, *args):
+        stats = self.stats
+        stats.submitted += 1
+        with self._lock:
+            inline = False
+            if self._outstanding >= self.size:
+                stats.saturated += 1
+                inline = self.policy == 'inline'
+            if inline:
+                stats.inline += 1
+            else:
+                self._outstanding += 1
+                if self._outstanding > stats.peak_outstanding:
+                    stats.peak_outstanding = self._outstanding
+        if inline:
+            self._run(callback, args)
+        else:
+            self._queue.put((self.clock(), callback, args))
+
+    def _run(self, callback, args):
+        try:
+            callback(*args)
+        except Exception as e:
+            log.error("[Error] Scheduled event %s failed: %s", getattr(callback, '__qualname__', callback), e)
+        if self.on_task_end:
+            try:
+                self.on_task_end()
+            except Exception as e:
+                log.error("[Error] Batch flush failed: %s", e)
+
+    def _worker(self):
+        get = self._queue.get
+        lock = self._lock
+        stats = self.stats
+        while True:
+            item = get()
+            if item is None:
+                return
+            submitted_at, callback, args = item
+            stats.record_wait(self.clock() - submitted_at)
+            try:
+                self._run(callback, args)
+            finally:
+                with lock:
+                    self._outstanding -= 1
+
+
+def create_pool(size, policy: str = 'queue', on_task_end=None):
+    """`size` is the Workers setting (0 or empty = no pool). Returns a WorkerPool or None."""
+    try:
+        size = int(size or 0)
+    except ValueError:
+        print(f"[Warning] Invalid worker count '{size}', running events on the dispatch thread.")
+        return None
+    if size <= 0:
+        return None
+    policy = (policy or 'queue').strip().lower()
+    if policy not in POOL_POLICIES:
+        print(f"[Warning] Unknown worker policy '{policy}', using queue.")
+        policy = 'queue'
+    return WorkerPool(size, policy, on_task_end)
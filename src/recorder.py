@@ -0,0 +1,299 @@
+"""
+Record live input into a `[Timeline]` section in the config action syntax.
+
+A Recorder collects raw key, mouse button and mouse move events with their
+times. `compress()` turns them into few actions:
+- key / button presses released again within the group tolerance become
+  `press_key` / `click_mouse`, and held keys repeated by the OS are dropped;
+- mouse move streams are thinned to at most one `move_mouse_relative` per
+  MOVE_INTERVAL, skipping moves of less than MOVE_EPSILON pixels; the stream
+  is cut at every button event, so the cursor still lands on the exact pixel
+  of every click;
+- actions within GROUP_TOLERANCE of the first action of a line are written
+  on that line, comma separated, and dispatched together.
+
+Events come from PynputEventSource (live, `python run.py --record out.ini`)
+or from ScriptedEventSource, which replays a text file of events:
+
+    0 key_down w
+    120 key_up w
+    200 move 960 540
+    250 mouse_down left
+    260 mouse_up left
+"""
+import math
+import os
+import time
+
+from src.key_mapping import VK_MAPPING, vk_for_key
+
+GROUP_TOLERANCE = 0.008  # Seconds: actions this close to a line's first action share the line
+MOVE_EPSILON = 2.0  # Pixels the replayed cursor may lag behind the recorded one
+MOVE_INTERVAL = 0.016  # Seconds: at most one relative move per interval (about 60 Hz)
+DEFAULT_STOP_KEY = 'f12'
+
+# pynput special key names that differ from key_mapping names
+_PYNPUT_ALIASES = {'backspace': 'back', 'cmd': 'lwin', 'cmd_l': 'lwin', 'cmd_r': 'rwin', 'alt_gr': 'alt'}
+_PYNPUT_BUTTONS = {'left': 'left', 'right': 'right', 'middle': 'middle', 'x1': 'xbutton1', 'x2': 'xbutton2'}
+
+
+class Recorder:
+    """Raw event list: (time, kind, args) with kind 'key', 'button' or 'move'."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = []
+        self._down = set()  # Keys and buttons currently held, to drop OS auto-repeat
+        self.repeats = 0
+
+    def key(self, name: str, pressed: bool, t: float = None):
+        self._press('key', name, pressed, t)
+
+    def button(self, name: str, pressed: bool, t: float = None):
+        self._press('button', name, pressed, t)
+
+    def _press(self, kind, name, pressed, t):
+        held = (kind, name) in self._down
+        if pressed and held:
+            self.repeats += 1
+            return
+        if not pressed and not held:
+            return  # Released a key pressed before the recording started
+        if pressed:
+            self._down.add((kind, name))
+        else:
+            self._down.discard((kind, name))
+        self.events.append((self.clock() if t is None else t, kind, (name, pressed)))
+
+    def move(self, x: int, y: int, t: float = None):
+        self.events.append((self.clock() if t is None else t, 'move', (int(x), int(y))))
+
+
+def _moves(points, origin, epsilon, interval):
+    """
+    Relative move actions (t, command, args) from `origin` along the recorded
+    [(t, x, y)] points: a move is written once the cursor is `epsilon` pixels
+    away from where the replay has put it, at most once per `interval`, and
+    always for the last point.
+    """
+    actions = []
+    x, y = origin
+    last_t = None
+    for i, (t, px, py) in enumerate(points):
+        if (px, py) == (x, y):
+            continue
+        if i != len(points) - 1:
+            if math.hypot(px - x, py - y) < epsilon:
+                continue
+            if last_t is not None and t - last_t < interval:
+                continue
+        actions.append((t, 'move_mouse_relative', (str(px - x), str(py - y))))
+        x, y, last_t = px, py, t
+    return actions
+
+
+def compress(events, tolerance: float = GROUP_TOLERANCE, epsilon: float = MOVE_EPSILON,
+             interval: float = MOVE_INTERVAL):
+    """
+    Turn raw Recorder events into [(offset ms, [action text, ...])] lines.
+    The first line is at offset 0.
+    """
+    actions = []
+    points = []
+    origin = None
+
+    def flush_moves():
+        nonlocal origin, points
+        if points:
+            actions.extend(_moves(points, origin, epsilon, interval))
+            origin = points[-1][1:]
+            points = []
+
+    for t, kind, args in events:
+        if kind == 'move':
+            if origin is None:
+                origin = args  # First known cursor position, the reference for relative moves
+            else:
+                points.append((t, args[0], args[1]))
+            continue
+        if kind == 'button':
+            # The cursor has to be on the recorded pixel when the button changes
+            flush_moves()
+        name, pressed = args
+        if kind == 'key':
+            actions.append((t, 'key_down' if pressed else 'key_up', (name,)))
+        else:
+            actions.append((t, 'mouse_down' if pressed else 'mouse_up', (name,)))
+    flush_moves()
+    actions.sort(key=lambda a: a[0])  # Stable: same-time actions keep their recorded order
+
+    # down + up of the same key (or button) right after each other -> one press / click,
+    # back-to-back relative moves -> one move
+    merged = []
+    for action in actions:
+        t, command, args = action
+        if merged and t - merged[-1][0] <= tolerance:
+            last_t, last_command, last_args = merged[-1]
+            if command in ('key_up', 'mouse_up') and last_args == args and last_command == command.replace('_up', '_down'):
+                merged[-1] = (last_t, 'press_key' if command == 'key_up' else 'click_mouse', args)
+                continue
+            if command == last_command == 'move_mouse_relative':
+                merged[-1] = (last_t, command, tuple(str(int(a) + int(b)) for a, b in zip(last_args, args)))
+                continue
+        merged.append(action)
+
+    lines = []
+    start = None
+    for t, command, args in merged:
+        if start is None:
+            start = t
+        offset = (t - start) * 1000.0
+        text = " ".join((command,) + tuple(args))
+        if lines and offset - lines[-1][2] <= tolerance * 1000.0:
+            lines[-1][1].append(text)
+        else:
+            lines.append([round(offset), [text], offset])
+    return [(offset, texts) for offset, texts, _ in lines]
+
+
+def format_timeline(lines, name: str, trigger: str = None, target: str = None, remark: str = None) -> str:
+    """A `[Timeline]` section for `compress()` output."""
+    out = [f"[Timeline: {name}]"]
+    if trigger:
+        out.append(f"Trigger: {trigger}")
+    if target:
+        out.append(f"Target: {target}")
+    out.append("Mode: OneShot")
+    if remark:
+        out.append(f"Remark: {remark}")
+    for offset, texts in lines:
+        out.append(f"{offset} {', '.join(texts)}")
+    return "\n".join(out) + "\n"
+
+
+def raw_action_count(events) -> int:
+    """Actions a one-to-one transcription of the events would have (auto-repeat already dropped)."""
+    moves = sum(1 for _, kind, _ in events if kind == 'move')
+    return len(events) - (1 if moves else 0)
+
+
+# --- Event sources ---
+
+class ScriptedEventSource:
+    """Feeds a Recorder from a text file: `<ms> key_down|key_up|mouse_down|mouse_up <name>` or `<ms> move <x> <y>`."""
+
+    def __init__(self, file_path: str):
+        self.events = []
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_num, raw in enumerate(f, 1):
+                line = raw.split(';')[0].strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split()
+                try:
+                    at = float(parts[0]) / 1000.0
+                    command = parts[1].lower()
+                    if command == 'move':
+                        self.events.append((at, command, (int(parts[2]), int(parts[3]))))
+                    elif command in ('key_down', 'key_up', 'mouse_down', 'mouse_up'):
+                        self.events.append((at, command, (parts[2].lower(),)))
+                    else:
+                        raise ValueError(f"unknown event '{command}'")
+                except (IndexError, ValueError) as e:
+                    print(f"[Warning] Event line {line_num}: {e or 'incomplete line'}, ignored.")
+        self.events.sort(key=lambda e: e[0])
+
+    def run(self, recorder: Recorder):
+        for at, command, args in self.events:
+            if command == 'move':
+                recorder.move(*args, t=at)
+            elif command.startswith('key'):
+                recorder.key(args[0], command == 'key_down', t=at)
+            else:
+                recorder.button(args[0], command == 'mouse_down', t=at)
+
+
+def pynput_key_name(key):
+    """key_mapping name for a pynput key, or None."""
+    name = getattr(key, 'name', None)
+    if name:  # pynput.keyboard.Key member
+        name = _PYNPUT_ALIASES.get(name, name)
+        if name not in VK_MAPPING and name.endswith(('_l', '_r')):
+            name = name[:-2]
+        return name if name in VK_MAPPING else None
+    char = getattr(key, 'char', None)
+    if char and vk_for_key(char) is not None:
+        return char.lower()
+    vk = getattr(key, 'vk', None)
+    if vk is not None:
+        for mapped, code in VK_MAPPING.items():
+            if code == vk:
+                return mapped
+    return None
+
+
+class PynputEventSource:
+    """Live capture through pynput listeners until `stop_key` is pressed."""
+
+    def __init__(self, stop_key: str = DEFAULT_STOP_KEY):
+        from pynput import keyboard, mouse
+        self._keyboard, self._mouse = keyboard, mouse
+        self.stop_key = stop_key
+        self.skipped = set()
+
+    def run(self, recorder: Recorder):
+        recorder.move(*self._mouse.Controller().position)  # Reference point for relative moves
+
+        def on_press(key):
+            name = pynput_key_name(key)
+            if name == self.stop_key:
+                return False  # Stops the keyboard listener
+            if name is None:
+                self.skipped.add(str(key))
+                return
+            recorder.key(name, True)
+
+        def on_release(key):
+            name = pynput_key_name(key)
+            if name is not None and name != self.stop_key:
+                recorder.key(name, False)
+
+        def on_click(x, y, button, pressed):
+            name = _PYNPUT_BUTTONS.get(getattr(button, 'name', None))
+            if name is None:
+                self.skipped.add(str(button))
+                return
+            recorder.move(x, y)
+            recorder.button(name, pressed)
+
+        with self._mouse.Listener(on_move=lambda x, y: recorder.move(x, y), on_click=on_click) as mouse_listener:
+            with self._keyboard.Listener(on_press=on_press, on_release=on_release) as keyboard_listener:
+                keyboard_listener.join()
+            mouse_listener.stop()
+
+
+def record(output_path: str, name: str = None, trigger: str = None, events_path: str = None,
+           stop_key: str = DEFAULT_STOP_KEY) -> str:
+    """Record (live, or from `events_path`) and append the timeline to `output_path`. Returns the section text."""
+    recorder = Recorder()
+    if events_path:
+        ScriptedEventSource(events_path).run(recorder)
+    else:
+        source = PynputEventSource(stop_key)
+        print(f"[System] Recording... Press {stop_key} to stop.")
+        source.run(recorder)
+        if source.skipped:
+            print(f"[Warning] Input without a config name was not recorded: {', '.join(sorted(source.skipped))}")
+    lines = compress(recorder.events)
+    if not lines:
+        print("[Warning] Nothing was recorded.")
+        return ""
+    name = name or time.strftime("Recorded %Y-%m-%d %H:%M:%S")
+    actions = sum(len(texts) for _, texts in lines)
+    section = format_timeline(lines, name, trigger)
+    exists = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+    with open(output_path, 'a', encoding='utf-8') as f:
+        f.write(("\n" if exists else "") + section)
+    print(f"[System] Recorded {len(recorder.events)} event(s) ({recorder.repeats} auto-repeat(s) dropped) "
+          f"into {actions} action(s) on {len(lines)} line(s), appended to {output_path}")
+    return section
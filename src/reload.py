@@ -0,0 +1,318 @@
+"""
+Hot reload of the config file.
+
+A ConfigWatcher thread polls the file's size and mtime. When the content
+changes it splits the text into the global block and one section per
+`[Timeline: ...]` header and compares every section with the text it was
+built from. Only changed sections are parsed and compiled again; callers of
+changed or removed timelines (`run_timeline`) are re-bound. Everything is
+built on the watcher thread, including the new TriggerIndex, and staged in
+`pending`.
+
+The trigger thread calls `apply()` between ticks. That only swaps references:
+a changed timeline is a new Timeline object, its predecessor points to it
+through `replaced_by`, and running instances keep walking the plan they
+started with. If a changed section has lines the parser skipped or does not
+compile, the reload is rejected and the previous version stays loaded until
+the file changes again.
+
+`[Template: ...]` sections are sections of their own. When one of them
+changes, every section is parsed again, since any timeline may `use` it.
+
+Global settings are read once at startup; changing them only prints a note.
+"""
+import os
+import re
+import threading
+import time
+
+from src.log import log
+from src.plan import bind_plan, by_name, compile_timeline, flatten_timelines, walk_plan
+from src.triggers import TriggerIndex
+
+RELOAD_POLL = 0.5  # Seconds between two stat() calls
+SETTLE_DELAY = 0.05  # Give editors time to finish writing before the file is read
+
+_HEADER = re.compile(r'^\[(Timeline|Template)(?::\s*(.*))?\]$', re.IGNORECASE)
+
+
+def is_template(key) -> bool:
+    """Template sections are keyed ('template', name, occurrence), timeline sections (name, occurrence)."""
+    return key is not None and len(key) == 3
+
+
+def split_sections(text: str):
+    """
+    Returns [(key, lines)] in file order. The first entry (key None) holds the
+    lines before the first header, each other entry one `[Timeline]` section
+    keyed by (lowercased header name, occurrence) or one `[Template]` section
+    (see `is_template`). Unnamed headers are given the `Timeline_<n>` name
+    `parse_lines` would give them.
+    """
+    from src.control import parse_lines
+    sections = [(None, [])]
+    seen = {}
+    ordinal = None
+    for line in text.splitlines():
+        match = _HEADER.match(line.strip())
+        if match and match.group(1).lower() == 'template':
+            name = (match.group(2) or '').strip().lower()
+            seen[('template', name)] = seen.get(('template', name), 0) + 1
+            sections.append((('template', name, seen[('template', name)]), [line]))
+        elif match:
+            if ordinal is None:
+                # A Default timeline from lines before the first header counts too
+                ordinal = len(parse_lines(sections[0][1])[1])
+            ordinal += 1
+            name = match.group(2)
+            if not name:
+                name = f"Timeline_{ordinal}"
+                line = f"[Timeline: {name}]"
+            name = name.strip().lower()
+            seen[name] = seen.get(name, 0) + 1
+            sections.append(((name, seen[name]), [line]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+class StagedReload:
+    """A compiled, bound and indexed config version waiting for `ConfigWatcher.apply`."""
+
+    def __init__(self, timelines, index, sections, settings, replaced, rebound, removed, changed):
+        self.timelines = timelines
+        self.index = index
+        self.sections = sections  # key -> (section text, timelines built from it)
+        self.settings = settings
+        self.replaced = replaced  # [(old, new)] same name, new version
+        self.rebound = rebound  # [(timeline, plan)] unchanged callers of changed timelines
+        self.removed = removed  # Old timelines without a successor
+        self.changed = changed  # New Timeline objects
+
+
+class ConfigWatcher:
+    """
+    Watches `file_path` for the runtime in control.main_loop. `timelines`,
+    `index` and `settings` are the live versions; they are only replaced by
+    `apply()` on the trigger thread.
+    """
+
+    def __init__(self, file_path: str, timelines: list, index: TriggerIndex, settings: dict,
+                 run_sub_timeline, backend, interval: float = RELOAD_POLL):
+        self.file_path = file_path
+        self.timelines = timelines
+        self.index = index
+        self.settings = settings
+        self.run_sub_timeline = run_sub_timeline
+        self.backend = backend
+        self.interval = interval
+        self.inline = self._inline(settings)
+        self.pending = None  # StagedReload, set by the watcher thread, cleared by apply()
+        self.reloads = 0
+        self.rejected = 0
+        self._stopping = threading.Event()
+        self._thread = None
+        self._signature = self._stat()
+        self.sections = {}
+        try:
+            with open(file_path, 'rb') as f:
+                self._data = f.read()
+            self.sections = self._map_sections(split_sections(self._data.decode('utf-8')), timelines)
+        except (OSError, UnicodeDecodeError):
+            self._data = None
+
+    @staticmethod
+    def _inline(settings) -> bool:
+        from src.control import is_enabled
+        return is_enabled(settings.get('inlinesubtimelines'))
+
+    @staticmethod
+    def _map_sections(sections, timelines) -> dict:
+        """Pair the startup timelines with the sections they were parsed from (same order)."""
+        from src.control import parse_lines
+        mapped = {}
+        remaining = list(timelines)
+        for key, lines in sections:
+            count = len(parse_lines(lines)[1]) if key is None or is_template(key) else 1
+            mapped[key] = ("\n".join(lines), tuple(remaining[:count]))
+            remaining = remaining[count:]
+        if remaining:
+            return {}  # The file changed since startup; the first reload rebuilds everything
+        return mapped
+
+    def _stat(self):
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            # Stage the next version only after the previous one was applied
+            if self.pending is None:
+                self.check()
+
+    def check(self) -> bool:
+        """Stage a reload if the file content changed. Returns True if one was staged."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        time.sleep(SETTLE_DELAY)
+        self._signature = self._stat()
+        try:
+            with open(self.file_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+        if data == self._data:
+            return False
+        name = os.path.basename(self.file_path)
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            self.rejected += 1
+            log.warning("[Warning] Reload of '%s' rejected: %s. Keeping the previous version.", name, e)
+            return False
+        staged = self.stage(text)
+        if staged is None:
+            self.rejected += 1
+            return False
+        self._data = data
+        self.pending = staged
+        return True
+
+    def stage(self, text: str):
+        """Build the new version of `text` next to the live one. Returns a StagedReload, or None if rejected."""
+        from src.control import collect_templates, parse_lines
+        name = os.path.basename(self.file_path)
+        settings = self.settings
+        sections = {}
+        timelines = []
+        changed = []
+        invalid_lines = 0
+        split = split_sections(text)
+        templates = collect_templates(text.splitlines())
+        template_texts = ["\n".join(lines) for key, lines in split if is_template(key)]
+        rebuild = self.inline or template_texts != [live_text for key, (live_text, _) in self.sections.items() if is_template(key)]
+        for key, lines in split:
+            section_text = "\n".join(lines)
+            live = self.sections.get(key)
+            if live is not None and live[0] == section_text and not rebuild:
+                sections[key] = live
+                timelines.extend(live[1])
+                continue
+            # Sections parsed alone still see the live FPS / FrameAlign globals
+            section_settings, parsed, section_errors = parse_lines(lines, self.settings, templates)
+            invalid_lines += section_errors
+            if key is None:
+                settings = section_settings
+            sections[key] = (section_text, tuple(parsed))
+            timelines.extend(parsed)
+            changed.extend(parsed)
+            time.sleep(0)  # Let the trigger thread have the GIL between sections
+        if invalid_lines:
+            log.warning("[Warning] Reload of '%s' rejected: %d invalid line(s). Keeping the previous version.", name, invalid_lines)
+            return None
+        if not timelines:
+            log.warning("[Warning] Reload of '%s' rejected: no timelines. Keeping the previous version.", name)
+            return None
+
+        timelines_by_name = by_name(timelines)
+        errors = 0
+        for t in changed:
+            errors += compile_timeline(t, timelines_by_name, None, None)
+
+        kept = set(map(id, timelines))
+        new_by_name = by_name(changed)
+        replaced, removed = [], []
+        for old in self.timelines:
+            if id(old) in kept:
+                continue
+            new = new_by_name.get(old.name.lower())
+            if new is not None and not any(new is n for _, n in replaced):
+                replaced.append((old, new))
+            else:
+                removed.append(old)
+
+        # Unchanged callers of changed or removed timelines are bound to the new objects
+        stale = {t.name.lower() for t in changed} | {t.name.lower() for t in removed} | {o.name.lower() for o, _ in replaced}
+        rebound = []
+        changed_ids = set(map(id, changed))
+        for t in timelines:
+            if id(t) in changed_ids:
+                continue
+            targets = [a.args[0] for a in walk_plan(t.plan) if a.command == 'run_timeline' and a.args[0].lower() in stale]
+            if not targets:
+                continue
+            invalid = 0
+            for target_name in targets:
+                target_t = timelines_by_name.get(target_name.lower())
+                if target_t is None or target_t.mode != 'oneshot':
+                    problem = "not found" if target_t is None else "not OneShot"
+                    print(f"[Error] Timeline '{t.name}': timeline '{target_name}' {problem} in 'run_timeline {target_name}'.")
+                    invalid += 1
+            errors += invalid
+            if not invalid:
+                rebound.append((t, bind_plan(t.plan, timelines_by_name, self.run_sub_timeline, self.backend)))
+
+        if errors:
+            log.warning("[Warning] Reload of '%s' rejected: %d invalid action(s). Keeping the previous version.", name, errors)
+            return None
+        for t in changed:
+            t.plan = bind_plan(t.plan, timelines_by_name, self.run_sub_timeline, self.backend)
+        if self.inline:
+            flatten_timelines(timelines)
+        index = TriggerIndex(timelines)
+        index.activate(self.index.title_lower)
+        if settings != self.settings:
+            log.warning("[Warning] Global settings in '%s' changed; restart to apply them.", name)
+        return StagedReload(timelines, index, sections, settings, replaced, rebound, removed, changed)
+
+    def apply(self) -> TriggerIndex:
+        """
+        Swap the staged version in. Call on the trigger thread between ticks;
+        returns the new TriggerIndex for the trigger source.
+        """
+        staged = self.pending
+        for old, new in staged.replaced:
+            # One version runs at a time: the new one starts once the old instance is done
+            new.run_state = old.run_state  # Same runs, queue and counters
+            new.loop_stats = old.loop_stats
+            new.active_run, old.active_run = old.active_run, None
+            if old.loop_run and not old.loop_run.finished:
+                if new.mode == 'loop':
+                    new.loop_run = old.loop_run
+                else:
+                    old.loop_run.stop()
+            old.loop_run = None
+            old.replaced_by = new
+        for t, plan in staged.rebound:
+            t.plan = plan
+        for t in staged.removed:
+            if t.loop_run:
+                t.loop_run.stop()
+                t.loop_run = None
+        index = staged.index
+        index.activate(self.index.title_lower)  # The window may have changed since staging
+        index.carry_state(self.index)  # Keys held across the swap are not new presses
+        self.timelines = staged.timelines
+        self.index = index
+        self.sections = staged.sections
+        self.settings = staged.settings
+        self.pending = None
+        self.reloads += 1
+        log.info("[System] Reloaded '%s': %d timeline(s) rebuilt, %d re-bound, %d removed.",
+                 os.path.basename(self.file_path), len(staged.changed), len(staged.rebound), len(staged.removed))
+        return index
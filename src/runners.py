@@ -0,0 +1,379 @@
+"""
+Timeline instances driven by the scheduler.
+
+Each OneShot / Loop / Hold activation is a small state machine: it walks the
+compiled plan through `iter_plan` (which expands repeat blocks as it goes)
+and has exactly one pending scheduler event at a time (next action, release
+check or next loop cycle). Instances share the scheduler, so their actions
+interleave by deadline. With `Workers`, events run on pool workers; every
+event of an instance (steps, release checks, stop) takes the instance's
+lock, so two events of one instance never overlap while different
+instances still run side by side.
+With a Telemetry object, every dispatched action is recorded with its
+scheduled, dispatch and completion times (see src/telemetry.py).
+"""
+import functools
+import math
+import threading
+
+from src.log import log
+from src.plan import dispatch_action, iter_plan
+
+# Release watching intervals (seconds)
+RELEASE_POLL = 0.01
+RELEASE_DEBOUNCE = 0.05
+HOLD_RELEASE_POLL = 0.005
+
+NAN = float('nan')
+
+# What a fixed-rate loop does when a cycle starts a period or more after its deadline:
+# catchup runs missed cycles back to back, skip drops them, stretch re-anchors the grid.
+OVERRUN_POLICIES = ('catchup', 'skip', 'stretch')
+
+# A start this close after a frame boundary counts as on it (dispatch lateness, sub-timeline calls)
+FRAME_SNAP = 0.001
+
+
+def frame_start(now: float, grid: float) -> float:
+    """
+    First boundary of the frame grid at or after `now`. Boundaries are the
+    multiples of `grid` on the scheduler clock, so the grid is anchored at
+    the clock's zero (perf_counter's unspecified epoch): aligned timelines
+    stay whole frames apart from each other, but nothing ties the grid to the
+    display's vsync.
+    """
+    boundary = math.floor(now / grid) * grid
+    return boundary if now - boundary <= FRAME_SNAP else boundary + grid
+
+
+def _event(method):
+    # Scheduler event of a run: serialised with its other events, skipped once it has finished
+    @functools.wraps(method)
+    def event(self, *args):
+        with self.lock:
+            if not self.finished:
+                method(self, *args)
+    return event
+
+
+class TimelineRun:
+    """Base instance: walks `timeline.plan` from a start time."""
+
+    def __init__(self, timeline, scheduler, key_state, trigger_key: str = None, backend=None,
+                 detected_at: float = None, telemetry=None):
+        self.timeline = timeline
+        self.run_state = timeline.run_state  # Shared with newer versions of the timeline after a hot reload
+        self.plan = timeline.plan
+        self.scheduler = scheduler
+        self.key_state = key_state  # key_state(key_name) -> bool, e.g. control.key_check
+        self.trigger_key = trigger_key
+        self.backend = backend  # InputBackend, needed by Hold cleanup
+        self.detected_at = NAN if detected_at is None else detected_at  # Trigger press time
+        self.telemetry = telemetry
+        self._telemetry_id = telemetry.timeline_id(timeline.name) if telemetry is not None else 0
+        self.start_time = None
+        self.index = 0  # Actions dispatched so far in this cycle
+        self._actions = None  # iter_plan(plan) of the current cycle
+        self._next = None  # Next (offset, action) of _actions, None when the plan is done
+        self.not_before = 0.0  # Set by `wait` actions
+        self.handle = None
+        self.finished = False
+        self.lock = threading.RLock()  # Held by every event of this run (see _event)
+
+    def start(self):
+        with self.lock:
+            if self.finished:
+                return self  # Stopped before it started
+            self.start_time = self._start_time(self.scheduler.now())
+            self.on_start()
+            self._rewind()
+            self._schedule_next()
+        return self
+
+    def on_start(self):
+        pass
+
+    def _rewind(self):
+        self.index = 0
+        self.not_before = 0.0
+        self._actions = iter_plan(self.plan)
+        self._next = next(self._actions, None)
+
+    def _start_time(self, now: float) -> float:
+        # With FrameAlign the plan starts on the next frame boundary, so offsets land on frame edges
+        grid = self.timeline.frame_grid
+        return frame_start(now, grid) if grid else now
+
+    def _schedule_next(self):
+        if self.finished:
+            return
+        if self._next is None:
+            self.handle = None
+            self.on_plan_done()
+            return
+        deadline = max(self.start_time + self._next[0], self.not_before)
+        self.handle = self.scheduler.call_at(deadline, self._step)
+
+    @_event
+    def _step(self):
+        actions = self._actions
+        telemetry = self.telemetry
+        clock = self.scheduler.clock
+        now = clock()
+        # Run every action of this instance that is already due
+        while self._next is not None and not self.finished:
+            offset, action = self._next
+            scheduled = max(self.start_time + offset, self.not_before)
+            if scheduled > now:
+                break
+            self._next = next(actions, None)
+            self.index += 1
+            if action.command == 'wait':
+                # Later actions may not run before the wait is over
+                self.not_before = now + action.args[0]
+                continue
+            self.before_action(action)
+            if telemetry is None:
+                dispatch_action(action)
+                now = clock()
+            else:
+                dispatched = clock()
+                dispatch_action(action)
+                now = clock()
+                telemetry.record(self._telemetry_id, telemetry.command_id(action.command), self.index - 1,
+                                 self.detected_at, scheduled, dispatched, now)
+                self.detected_at = NAN  # Trigger latency is taken on the first action sent
+        self._schedule_next()
+
+    def stop(self):
+        """Request a stop. Runs as an event of this run, so it never overlaps a step, and cancels any pending wait."""
+        self.scheduler.call_soon(self.finish)
+
+    def before_action(self, action):
+        pass
+
+    def on_plan_done(self):
+        self.finish()
+
+    def finish(self):
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+            self.scheduler.cancel(self.handle)
+            self.handle = None
+            # Free the slot; it may go straight to a queued activation
+            queued = self.run_state.exit(self)
+            self.on_finished()
+        if queued is not None:
+            queued()
+
+    def on_finished(self):
+        pass
+
+
+class OneShotRun(TimelineRun):
+    """Runs the plan once, then stays running until the trigger key is released."""
+
+    def start(self):
+        if self.trigger_key and self.trigger_key.lower() in self.timeline.action_keys:
+            log.error("[Error] Timeline '%s' conflict: Trigger key '%s' cannot be used in actions.", self.timeline.name, self.trigger_key)
+            self.finished = True
+            # Activations queued behind it would hit the same conflict: drop them, give the slot back
+            self.run_state.stop_all()
+            self.run_state.exit(self)
+            return self
+        log.info("[Action] '%s' (OneShot) started. Triggered by: %s", self.timeline.name, self.trigger_key)
+        return super().start()
+
+    def on_plan_done(self):
+        if self.trigger_key:
+            self._watch_release()
+        else:
+            self.finish()
+
+    @_event
+    def _watch_release(self):
+        if not self.key_state(self.trigger_key):
+            self.handle = self.scheduler.call_later(RELEASE_DEBOUNCE, self._confirm_release)
+        else:
+            self.handle = self.scheduler.call_later(RELEASE_POLL, self._watch_release)
+
+    @_event
+    def _confirm_release(self):
+        if not self.key_state(self.trigger_key):
+            self.finish()
+        else:
+            self.handle = self.scheduler.call_later(RELEASE_POLL, self._watch_release)
+
+    def on_finished(self):
+        log.info("[Action] '%s' finished and ready for next trigger.", self.timeline.name)
+
+
+class HoldRun(TimelineRun):
+    """Runs the plan once, then releases whatever it left pressed when the trigger is released."""
+
+    def __init__(self, timeline, scheduler, key_state, trigger_key: str = None, backend=None,
+                 detected_at: float = None, telemetry=None):
+        super().__init__(timeline, scheduler, key_state, trigger_key, backend, detected_at, telemetry)
+        self.keys_held_down = set()
+        self.mouse_buttons_held = set()
+
+    def start(self):
+        log.info("[Action] '%s' (Hold) started. Hold trigger '%s' to keep state.", self.timeline.name, self.trigger_key)
+        return super().start()
+
+    def before_action(self, action):
+        # Track state before executing (args are validated at compile time)
+        command = action.command
+        if command == 'key_down':
+            self.keys_held_down.add(action.args[0])
+        elif command == 'key_up':
+            self.keys_held_down.discard(action.args[0])
+        elif command == 'mouse_down':
+            self.mouse_buttons_held.add(action.args[0])
+        elif command == 'mouse_up':
+            self.mouse_buttons_held.discard(action.args[0])
+
+    def on_plan_done(self):
+        if self.keys_held_down or self.mouse_buttons_held:
+            log.debug("  [Hold] Holding keys: %s, Mouse: %s", list(self.keys_held_down), list(self.mouse_buttons_held))
+        log.debug("  -> Script finished. Waiting for trigger '%s' release...", self.trigger_key)
+        self._watch_release()
+
+    @_event
+    def _watch_release(self):
+        if self.trigger_key and self.key_state(self.trigger_key):
+            self.handle = self.scheduler.call_later(HOLD_RELEASE_POLL, self._watch_release)
+            return
+        log.debug("  -> Trigger released. Cleaning up keys.")
+        self.release_held()
+        self.finish()
+
+    def release_held(self):
+        for k in self.keys_held_down:
+            log.debug("    [Cleanup] Releasing Key: %s", k)
+            self.backend.key_up(k)
+        for b in self.mouse_buttons_held:
+            log.debug("    [Cleanup] Releasing Mouse: %s", b)
+            self.backend.mouse_up(b)
+        self.keys_held_down.clear()
+        self.mouse_buttons_held.clear()
+
+    def stop(self):
+        self.scheduler.call_soon(self._stop_now)
+
+    @_event
+    def _stop_now(self):
+        self.release_held()
+        self.finish()
+
+    def on_finished(self):
+        log.debug("[Debug] Hold run of '%s' finished.", self.timeline.name)
+
+
+class LoopStats:
+    """Actual cycle period (running mean / deviation), wake-up lateness and missed cycles."""
+
+    def __init__(self):
+        self.cycles = 0
+        self.missed = 0
+        self.stretched = 0
+        self.max_late = 0.0
+        self._last_start = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._periods = 0
+
+    def cycle_started(self, actual: float, scheduled: float):
+        self.cycles += 1
+        self.max_late = max(self.max_late, actual - scheduled)
+        if self._last_start is not None:
+            # Welford's online mean / variance of the start-to-start period
+            period = actual - self._last_start
+            self._periods += 1
+            delta = period - self._mean
+            self._mean += delta / self._periods
+            self._m2 += delta * (period - self._mean)
+        self._last_start = actual
+
+    @property
+    def mean_period(self) -> float:
+        return self._mean
+
+    @property
+    def jitter(self) -> float:
+        return math.sqrt(self._m2 / (self._periods - 1)) if self._periods > 1 else 0.0
+
+    def __str__(self):
+        return (f"cycles {self.cycles}, period {self.mean_period * 1000:.3f} ms, "
+                f"jitter {self.jitter * 1000:.3f} ms, max late {self.max_late * 1000:.3f} ms, "
+                f"missed {self.missed}, stretched {self.stretched}")
+
+
+class LoopRun(TimelineRun):
+    """
+    Repeats the plan until stopped. By default the next cycle starts
+    `loop_interval` after the last action; with `loop_period` set, cycle k
+    starts at the absolute deadline `anchor + k * period`, so it does not drift.
+    """
+
+    def __init__(self, timeline, scheduler, key_state, trigger_key: str = None, backend=None,
+                 detected_at: float = None, telemetry=None):
+        super().__init__(timeline, scheduler, key_state, trigger_key, backend, detected_at, telemetry)
+        self.stats = LoopStats()
+        self.cycle = 0
+        self.anchor = None
+
+    def start(self):
+        if self.timeline.loop_period:
+            log.info("[Action] '%s' (Loop) started. Period: %ss, Overrun: %s", self.timeline.name, self.timeline.loop_period, self.timeline.loop_overrun)
+        else:
+            log.info("[Action] '%s' (Loop) started. Interval: %ss", self.timeline.name, self.timeline.loop_interval)
+        self.timeline.loop_stats = self.stats
+        return super().start()
+
+    def on_start(self):
+        # Anchor before the first cycle is scheduled: an empty plan ends it at once
+        self.anchor = self.start_time
+        self.stats.cycle_started(self.start_time, self.start_time)
+
+    def on_plan_done(self):
+        period = self.timeline.loop_period
+        if not period:
+            self.handle = self.scheduler.call_later(self.timeline.loop_interval, self._next_cycle, None)
+            return
+        self.cycle += 1
+        deadline = self.anchor + self.cycle * period
+        self.handle = self.scheduler.call_at(deadline, self._next_cycle, deadline)
+
+    @_event
+    def _next_cycle(self, scheduled):
+        now = self.scheduler.now()
+        self._rewind()
+        self.detected_at = NAN  # Only the first cycle was started by the trigger
+        if scheduled is None:
+            start = self._start_time(now)
+        else:
+            # Fixed-rate cycles are anchored to the grid, not to when we woke up
+            start = scheduled
+            late = now - scheduled
+            period = self.timeline.loop_period
+            overrun = self.timeline.loop_overrun
+            if late >= period and overrun == 'skip':
+                missed = int(late // period)
+                self.cycle += missed
+                self.stats.missed += missed
+                start += missed * period
+            elif late >= period and overrun == 'stretch':
+                # Only a real overrun moves the grid; normal wake-up lateness does not
+                self.anchor += late
+                self.stats.stretched += 1
+                start = now
+            # catchup: start on the past deadline so the overdue cycles run back to back
+        self.start_time = start
+        self.stats.cycle_started(now, now if scheduled is None else scheduled)
+        self._schedule_next()
+
+    def on_finished(self):
+        log.info("[Action] '%s' (Loop) stopped. %s", self.timeline.name, str(self.stats))
@@ -0,0 +1,64 @@
+"""
+Sample rings and percentiles for the runtime statistics.
+
+Wait lateness (src/waiting.py), pool queue waits (src/pool.py) and injector
+hand-off delays (src/injector.py) keep their newest samples in a SampleRing:
+a preallocated `array('d')`, so recording never allocates. Percentiles are
+taken from a sorted copy only when a summary is printed; telemetry
+(src/telemetry.py) uses the same helpers on its own record arrays.
+
+Buffers written by several threads at once (these rings, the log ring, the
+injector's CommandRing, telemetry) claim their slot with `sequence()`:
+next() on an itertools.count is a single C call and therefore atomic under
+the GIL, so writers need no lock.
+"""
+import itertools
+from array import array
+
+STATS_SIZE = 4096
+
+
+def sequence():
+    """Slot counter for a buffer with several writers (see above)."""
+    return itertools.count()
+
+
+def percentile(samples, q: float):
+    """Nearest-rank `q` quantile (0..1) of sorted `samples`."""
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def summarize(samples: list, quantiles=(0.50, 0.99)):
+    """
+    Sorts `samples` (seconds) in place. Returns None if empty, else a dict
+    with `n`, `p50_us` style keys for `quantiles` and `max_us`.
+    """
+    if not samples:
+        return None
+    samples.sort()
+    result = {'n': len(samples)}
+    for q in quantiles:
+        result[f"p{round(q * 100)}_us"] = percentile(samples, q) * 1e6
+    result['max_us'] = samples[-1] * 1e6
+    return result
+
+
+class SampleRing:
+    """The newest `size` samples of one measurement."""
+
+    def __init__(self, size: int = STATS_SIZE):
+        self.values = array('d', bytes(8 * size))
+        self.size = size
+        self.count = 0
+        self._seq = sequence()
+
+    def record(self, value: float):
+        seq = next(self._seq)
+        self.values[seq % self.size] = value
+        self.count = seq + 1
+
+    def samples(self) -> list:
+        return list(self.values[:min(self.count, self.size)])
+
+    def summary(self, quantiles=(0.50, 0.99)):
+        return summarize(self.samples(), quantiles)
@@ -0,0 +1,136 @@
+"""
+Deadline scheduler shared by all running timelines.
+
+Every timeline instance, release watcher and cancellation is an event in one
+priority queue ordered by deadline, and a single dispatch thread runs them.
+The clock is injectable: tests can pass a fake clock and drive the queue with
+`run_pending()` instead of starting the thread.
+
+With an `executor` (src/pool.py WorkerPool) the dispatch thread only keeps
+time: due events are submitted to the pool's pre-started workers, which call
+`on_task_end` after each event instead of `on_batch_end`.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from src.log import log
+from src.waiting import HybridWait
+
+
+class Scheduler:
+    def __init__(self, clock=time.perf_counter, wait_strategy=None, on_batch_end=None, executor=None):
+        self.clock = clock
+        # How the dispatch thread waits for the next deadline (see src/waiting.py)
+        self.wait_strategy = wait_strategy or HybridWait(clock=clock)
+        # Called after each run of due events, e.g. InputBackend.flush
+        self.on_batch_end = on_batch_end
+        # Optional WorkerPool that runs due events instead of the dispatch thread
+        self.executor = executor
+        self._heap = []  # Entries: [deadline, seq, callback, args]; callback None = cancelled
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._wakeup = False
+        self._stopping = False
+        self._thread = None
+
+    def now(self) -> float:
+        return self.clock()
+
+    def call_at(self, deadline: float, callback, *args):
+        """Schedule `callback(*args)` at `deadline`. Returns a handle for `cancel`."""
+        entry = [deadline, next(self._counter), callback, args]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._wakeup = True
+                self._cond.notify()
+                self.wait_strategy.notify()
+        return entry
+
+    def call_later(self, delay: float, callback, *args):
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def call_soon(self, callback, *args):
+        return self.call_at(self.clock(), callback, *args)
+
+    def cancel(self, handle):
+        """Cancel a pending event. Cancelling a finished event is a no-op."""
+        if handle is not None:
+            with self._cond:
+                handle[2] = None
+                handle[3] = ()
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(1 for entry in self._heap if entry[2] is not None)
+
+    def run_pending(self):
+        """
+        Run every event whose deadline has passed.
+        Returns the next pending deadline, or None if the queue is empty.
+        """
+        ran = False
+        executor = self.executor
+        while True:
+            with self._cond:
+                while self._heap and self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                if not self._heap or self._heap[0][0] > self.clock():
+                    next_deadline = self._heap[0][0] if self._heap else None
+                    break
+                _, _, callback, args = heapq.heappop(self._heap)
+            if executor is not None:
+                executor.submit(callback, *args)
+                continue
+            ran = True
+            try:
+                callback(*args)
+            except Exception as e:
+                log.error("[Error] Scheduled event %s failed: %s", getattr(callback, '__qualname__', callback), e)
+        if ran and self.on_batch_end:
+            try:
+                self.on_batch_end()
+            except Exception as e:
+                log.error("[Error] Batch flush failed: %s", e)
+        return next_deadline
+
+    # --- Dispatch thread ---
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        if self.executor is not None:
+            self.executor.start()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            self.wait_strategy.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.executor is not None:
+            self.executor.stop(timeout)
+
+    def _dispatch_loop(self):
+        while not self._stopping:
+            next_deadline = self.run_pending()
+            with self._cond:
+                if self._stopping:
+                    break
+                if self._wakeup:
+                    # An earlier event was pushed while we were running callbacks
+                    self._wakeup = False
+                    continue
+                if next_deadline is None:
+                    self._cond.wait()
+                    self._wakeup = False
+                    continue
+            # Returns early if call_at pushes an earlier event
+            self.wait_strategy.wait_until(next_deadline)
@@ -0,0 +1,199 @@
+"""
+Deterministic dry run of a config on a virtual clock.
+
+`python run.py --simulate script.txt [config.ini]` loads the config like the
+real runtime, but the scheduler runs on a VirtualClock, key states and the
+foreground window come from an input script, and actions go to a
+RecordingBackend. Triggers go through the same TriggerIndex and
+`trigger_timeline` path as `main_loop`, so window filters, chords, multi-tap
+and hold-time triggers, cooldowns, Loop toggles and Hold cleanup behave as
+they would live. Nothing sleeps, and the same script always produces the
+same trace, on any OS.
+
+Input script, one event per line, time in milliseconds:
+
+    0 window 明日方舟
+    100 press rbutton
+    400 release rbutton
+    1000 end            ; optional, default: last event + 1000 ms
+
+Lines starting with `#` or `;` are comments.
+"""
+import io
+import os
+
+from src import control
+from src.backends import RecordingBackend
+from src.key_mapping import vk_for_key
+from src.log import log
+from src.plan import compile_timelines, flatten_timelines
+from src.scheduler import Scheduler
+from src.triggers import TriggerIndex
+from src.window import FakeWindowTracker
+
+DEFAULT_TAIL = 1.0  # Seconds simulated after the last input event without `end`
+SCRIPT_COMMANDS = ('press', 'release', 'window', 'end')
+
+
+class VirtualClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+
+    def __call__(self) -> float:
+        return self.time
+
+    def advance_to(self, t: float):
+        if t > self.time:
+            self.time = t
+
+
+class _NullWait:
+    """Wait strategy stand-in: the simulation never starts the dispatch thread."""
+    name = "virtual"
+
+    def notify(self):
+        pass
+
+
+def parse_script(file_path: str):
+    """Returns a list of (time_s, command, argument) sorted by time, and the end time."""
+    events = []
+    end = None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_num, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not line or line.startswith(('#', ';')):
+                continue
+            line = line.split(';')[0].strip()
+            parts = line.split(None, 2)
+            try:
+                at = float(parts[0]) / 1000.0
+            except ValueError:
+                print(f"[Warning] Script line {line_num}: invalid time '{parts[0]}' ignored.")
+                continue
+            command = parts[1].lower() if len(parts) > 1 else ""
+            arg = parts[2].strip() if len(parts) > 2 else ""
+            if command not in SCRIPT_COMMANDS:
+                print(f"[Warning] Script line {line_num}: unknown command '{command}' ignored.")
+                continue
+            if command in ('press', 'release') and vk_for_key(arg) is None:
+                print(f"[Warning] Script line {line_num}: unknown key '{arg}' ignored.")
+                continue
+            if command == 'end':
+                end = at
+                continue
+            events.append((at, command, arg))
+    events.sort(key=lambda e: e[0])  # Stable: same-time events keep their order
+    if end is None:
+        end = (events[-1][0] if events else 0.0) + DEFAULT_TAIL
+    return events, end
+
+
+class Simulation:
+    def __init__(self, config_path: str, clock: VirtualClock = None):
+        self.clock = clock or VirtualClock()
+        self.trace = []  # (time_s, kind, text); kind is 'input', 'action' or 'log'
+        self.pressed = set()  # VK codes held in the script
+        self.window = FakeWindowTracker("")
+        self.backend = RecordingBackend(clock=self.clock)
+        self.engine = Scheduler(clock=self.clock, wait_strategy=_NullWait(), on_batch_end=self.backend.flush)
+        self._log_buffer = io.StringIO()
+        self._seen_events = 0
+
+        # Route the runtime's module state to the simulated engine, backend and key state
+        control.engine = self.engine
+        control.backend = self.backend
+        control.pool = None
+        control.telemetry = None
+        control.key_check = self.key_check
+        log.auto_flush = False
+        log.stream = self._log_buffer
+
+        settings, self.timelines = control.load_config(config_path)
+        log.set_level(settings.get('loglevel', 'info'))
+        compile_timelines(self.timelines, control.run_timeline_async, self.backend)
+        if control.is_enabled(settings.get('inlinesubtimelines')):
+            flatten_timelines(self.timelines)
+        self.index = TriggerIndex(self.timelines)
+        self.last_triggered = {}
+
+    def key_check(self, key_name: str) -> bool:
+        return vk_for_key(key_name) in self.pressed
+
+    def _collect(self):
+        now = self.clock()
+        events = self.backend.events
+        for t, _, name, args in events[self._seen_events:]:
+            self.trace.append((t, 'action', " ".join([name] + [str(a) for a in args])))
+        self._seen_events = len(events)
+        log.flush()
+        text = self._log_buffer.getvalue()
+        if text:
+            self._log_buffer.seek(0)
+            self._log_buffer.truncate()
+            for line in text.splitlines():
+                self.trace.append((now, 'log', line.strip()))
+
+    def _run_until(self, t: float):
+        """Run every scheduler event and hold trigger due up to `t`, stepping the clock from deadline to deadline."""
+        while True:
+            next_deadline = self.engine.run_pending()
+            self._collect()
+            hold_deadline = self.index.next_deadline()
+            if hold_deadline is not None and hold_deadline <= t and (next_deadline is None or hold_deadline <= next_deadline):
+                self.clock.advance_to(hold_deadline)
+                self._fire(self.index.due(self.clock()))
+                continue
+            if next_deadline is None or next_deadline > t:
+                break
+            self.clock.advance_to(next_deadline)
+        self.clock.advance_to(t)
+
+    def _fire(self, fired):
+        for t, key in fired:
+            control.trigger_timeline(t, key, self.window, self.last_triggered, self.clock())
+
+    def _apply(self, command: str, arg: str):
+        if command == 'window':
+            self.window.set_title(arg)
+            self.trace.append((self.clock(), 'input', f"window {arg}"))
+            return
+        vk = vk_for_key(arg)
+        pressed = command == 'press'
+        if pressed:
+            self.pressed.add(vk)
+        else:
+            self.pressed.discard(vk)
+        self.trace.append((self.clock(), 'input', f"{command} {arg}"))
+        # Same path as main_loop.on_key
+        if self.window.changed():
+            self.index.activate(self.window.title_lower())
+        if self.index.update(vk, pressed):
+            self._fire(self.index.triggered(vk, pressed, self.clock()))
+
+    def run(self, events, end: float):
+        for at, command, arg in events:
+            if at > end:
+                break
+            self._run_until(at)
+            self._apply(command, arg)
+            self.engine.run_pending()
+            self._collect()
+        self._run_until(end)
+        return self.trace
+
+    def format_trace(self) -> str:
+        marks = {'input': '>', 'action': ' ', 'log': '#'}
+        return "\n".join(f"{t * 1000:10.3f} ms {marks[kind]} {text}" for t, kind, text in self.trace)
+
+
+def run_simulation(script_path: str, config_path: str) -> str:
+    """Simulate `config_path` against the input script and return the trace text."""
+    events, end = parse_script(script_path)
+    sim = Simulation(config_path)
+    sim.run(events, end)
+    print(f"[System] Simulated {end * 1000:.0f} ms of '{os.path.basename(config_path)}' "
+          f"with {len(events)} input event(s).")
+    return sim.format_trace()
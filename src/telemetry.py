@@ -0,0 +1,146 @@
+"""
+Per-action timing telemetry.
+
+For every dispatched action the runners record, in preallocated arrays:
+- scheduled: the deadline the action was due at
+- dispatched: when the runner called into the backend
+- completed: when the backend call returned (for batched backends this is
+  when the event was queued; the flush follows right after the batch)
+- detected: when the trigger key press of the activation was detected, on
+  the first action the activation sends (NaN on its other actions and for
+  activations without a trigger, e.g. run_timeline sub-timelines)
+
+The buffer is a ring: once full, the oldest records are overwritten.
+`summary()` gives percentiles per timeline or per command, `export()` writes
+the raw records as CSV or JSONL.
+"""
+import csv
+import json
+import math
+import time
+from array import array
+
+from src.samples import sequence, summarize
+
+BUFFER_SIZE = 65536
+NAN = float('nan')
+FIELDS = ('timeline', 'command', 'index', 'detected', 'scheduled', 'dispatched', 'completed')
+QUANTILES = (0.50, 0.90, 0.99)
+
+
+class Telemetry:
+    def __init__(self, size: int = BUFFER_SIZE, clock=time.perf_counter):
+        self.size = size
+        self.clock = clock
+        self.timeline_ids = {}
+        self.command_ids = {}
+        self.timeline_names = []
+        self.command_names = []
+        self._timeline = array('H', bytes(2 * size))
+        self._command = array('B', bytes(size))
+        self._index = array('H', bytes(2 * size))
+        self._detected = array('d', bytes(8 * size))
+        self._scheduled = array('d', bytes(8 * size))
+        self._dispatched = array('d', bytes(8 * size))
+        self._completed = array('d', bytes(8 * size))
+        self._seq = sequence()
+        self.count = 0
+
+    def _intern(self, ids, names, name):
+        key = ids.get(name)
+        if key is None:
+            key = ids[name] = len(names)
+            names.append(name)
+        return key
+
+    def timeline_id(self, name: str) -> int:
+        return self._intern(self.timeline_ids, self.timeline_names, name)
+
+    def command_id(self, command: str) -> int:
+        return self._intern(self.command_ids, self.command_names, command)
+
+    def record(self, timeline: int, command: int, index: int, detected: float,
+               scheduled: float, dispatched: float, completed: float):
+        seq = next(self._seq)
+        i = seq % self.size
+        self._timeline[i] = timeline
+        self._command[i] = command
+        self._index[i] = min(index, 0xFFFF)
+        self._detected[i] = detected
+        self._scheduled[i] = scheduled
+        self._dispatched[i] = dispatched
+        self._completed[i] = completed
+        self.count = seq + 1
+
+    def clear(self):
+        self._seq = sequence()
+        self.count = 0
+
+    def records(self):
+        """Yield (timeline, command, index, detected, scheduled, dispatched, completed), oldest first."""
+        count = self.count
+        start = max(0, count - self.size)
+        for seq in range(start, count):
+            i = seq % self.size
+            yield (self.timeline_names[self._timeline[i]], self.command_names[self._command[i]], self._index[i],
+                   self._detected[i], self._scheduled[i], self._dispatched[i], self._completed[i])
+
+    def summary(self, by: str = 'timeline') -> dict:
+        """
+        Percentiles per timeline (`by='timeline'`) or per command (`by='command'`):
+        lateness = dispatched - scheduled, backend = completed - dispatched and,
+        for the first action sent by triggered activations, trigger = dispatched - detected.
+        """
+        key_pos = 0 if by == 'timeline' else 1
+        groups = {}
+        for record in self.records():
+            late, backend, trigger = groups.setdefault(record[key_pos], ([], [], []))
+            _, _, _, detected, scheduled, dispatched, completed = record
+            late.append(dispatched - scheduled)
+            backend.append(completed - dispatched)
+            if not math.isnan(detected):
+                trigger.append(dispatched - detected)
+        return {name: {'lateness': summarize(late, QUANTILES), 'backend': summarize(backend, QUANTILES),
+                       'trigger': summarize(trigger, QUANTILES)}
+                for name, (late, backend, trigger) in groups.items()}
+
+    def histogram(self, bucket_us: float = 100.0, timeline: str = None) -> dict:
+        """Lateness histogram: bucket start (us) -> action count."""
+        buckets = {}
+        for record in self.records():
+            if timeline is not None and record[0] != timeline:
+                continue
+            bucket = math.floor((record[5] - record[4]) * 1e6 / bucket_us) * bucket_us
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        return dict(sorted(buckets.items()))
+
+    def format_summary(self, by: str = 'timeline') -> str:
+        fmt = lambda stats, key: f"{stats[key]:.0f}" if stats else "-"
+        lines = [f"{by.capitalize():<20} | {'Actions':>7} | {'Late p50':>8} | {'p99':>6} | {'max':>6} | "
+                 f"{'Backend p50':>11} | {'p99':>6} | {'Trigger p50':>11} | {'p99':>6}  (us)"]
+        lines.append("-" * len(lines[0]))
+        for name, s in sorted(self.summary(by).items()):
+            late, backend, trigger = s['lateness'], s['backend'], s['trigger']
+            lines.append(f"{name:<20} | {late['n']:>7} | {fmt(late, 'p50_us'):>8} | {fmt(late, 'p99_us'):>6} | "
+                         f"{fmt(late, 'max_us'):>6} | {fmt(backend, 'p50_us'):>11} | {fmt(backend, 'p99_us'):>6} | "
+                         f"{fmt(trigger, 'p50_us'):>11} | {fmt(trigger, 'p99_us'):>6}")
+        return "\n".join(lines)
+
+    def export(self, path: str) -> int:
+        """Write the records to `path` as JSONL (.jsonl / .json) or CSV (anything else). Returns the record count."""
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if path.lower().endswith(('.jsonl', '.json')):
+                for record in self.records():
+                    row = dict(zip(FIELDS, record))
+                    if math.isnan(row['detected']):
+                        row['detected'] = None
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    count += 1
+            else:
+                writer = csv.writer(f)
+                writer.writerow(FIELDS)
+                for record in self.records():
+                    writer.writerow(record[:3] + tuple('' if math.isnan(v) else repr(v) for v in record[3:]))
+                    count += 1
+        return count
@@ -0,0 +1,437 @@
+"""
+Trigger index: which timelines listen to which virtual-key code, per window.
+
+Trigger key names are resolved to VK codes once at load time and every
+distinct VK gets one bit. Each poll reads every active VK exactly once into a
+bitmask snapshot; pressed / released edges are the XOR with the previous
+snapshot, so the cost of a tick grows with the number of distinct trigger
+keys instead of the number of timelines. Release watchers read the same
+snapshot through `is_down()` instead of querying the key again.
+
+A trigger is a key, a chord of keys, optionally tapped several times or held
+for a while before it fires:
+
+    e               press of e
+    ctrl+e          e pressed while ctrl is held (or ctrl while e is held)
+    e*2             double tap: two presses within TAP_WINDOW
+    e*3@400         triple tap, at most 400 ms between two presses
+    xbutton2>500    fires once xbutton2 has been held for 500 ms
+    ctrl+e*2>300    double tap of the chord, second press held for 300 ms
+
+A press that completes a chord is not also a press of the shorter triggers
+whose keys the chord contains: with both `g` and `ctrl+g` bound, ctrl+g only
+fires the chord, and a bare g still fires `g`.
+
+Key events come from a TriggerSource: polling GetAsyncKeyState (default),
+low-level hooks through pynput, or a queue that tests can push into.
+"""
+import ctypes
+import queue
+import re
+import time
+
+from src.key_mapping import vk_for_key
+
+TAP_WINDOW = 0.3  # Default maximum gap between two presses of a multi-tap trigger (seconds)
+
+# keys [*taps [@tap window ms]] [>hold ms]
+_TRIGGER_SPEC = re.compile(r'^([^*@>]+?)\s*(?:\*\s*(\d+))?\s*(?:@\s*(\d+(?:\.\d+)?))?\s*(?:>\s*(\d+(?:\.\d+)?))?$')
+
+
+def parse_trigger(spec: str):
+    """
+    Split a `Trigger:` entry into (key names, taps, tap window s, hold s).
+    Raises ValueError for malformed entries.
+    """
+    match = _TRIGGER_SPEC.match(spec.strip())
+    if not match:
+        raise ValueError("invalid trigger syntax")
+    keys, taps, window, hold = match.groups()
+    names = tuple(k.strip() for k in keys.split('+'))
+    if not all(names):
+        raise ValueError("empty key in chord")
+    taps = int(taps) if taps else 1
+    if taps < 1:
+        raise ValueError("tap count must be at least 1")
+    window = float(window) / 1000.0 if window else TAP_WINDOW
+    hold = float(hold) / 1000.0 if hold else 0.0
+    return names, taps, window, hold
+
+
+class Binding:
+    """One trigger of one timeline, with its tap / hold state."""
+    __slots__ = ('timeline', 'key', 'spec', 'vks', 'mask', 'taps', 'window', 'hold', 'count', 'last_press', 'deadline')
+
+    def __init__(self, timeline, spec: str, keys, vks, mask: int, taps: int, window: float, hold: float):
+        self.timeline = timeline
+        self.key = keys[-1]  # Key the runners watch for release (the last key of a chord)
+        self.spec = spec
+        self.vks = vks
+        self.mask = mask
+        self.taps = taps
+        self.window = window
+        self.hold = hold
+        self.count = 0  # Presses of the current tap sequence
+        self.last_press = float('-inf')
+        self.deadline = None  # When a pending hold fires
+
+
+class TriggerIndex:
+    """
+    Timelines are grouped by their lowercased `Target:` at load time. Only the
+    groups matching the current foreground window (plus the group without a
+    target) are active; `activate()` recomputes that set when the window
+    changes, and polls only look at the keys of active timelines.
+    """
+
+    def __init__(self, timelines):
+        self.bindings = {}  # vk -> list of Binding using the vk, every timeline
+        self.bits = {}  # vk -> its bit in the state masks
+        for t in timelines:
+            for spec in t.trigger_keys:
+                try:
+                    keys, taps, window, hold = parse_trigger(spec)
+                except ValueError as e:
+                    print(f"[Warning] Timeline '{t.name}': {e} in trigger '{spec}', ignored.")
+                    continue
+                vks = tuple(vk_for_key(key) for key in keys)
+                if None in vks:
+                    key = keys[vks.index(None)]
+                    print(f"[Warning] Timeline '{t.name}': unknown trigger key '{key}' ignored.")
+                    continue
+                mask = 0
+                for vk in vks:
+                    mask |= self.bits.setdefault(vk, 1 << len(self.bits))
+                binding = Binding(t, spec, keys, vks, mask, taps, window, hold)
+                for vk in dict.fromkeys(vks):
+                    self.bindings.setdefault(vk, []).append(binding)
+        self.targets = tuple(sorted({t.target_lower for t in timelines if t.target_lower is not None}))
+        self.active_targets = None
+        self.title_lower = ""  # Window title of the last activate()
+        self.subscribers = {}  # vk -> list of Binding using the vk, active timelines only
+        self.vks = ()
+        self.active_mask = 0  # Bits of the subscribed VKs
+        self.state = 0  # Bits of the keys seen pressed
+        self.live = 0  # Bits whose state is current (read by the last poll, or pushed)
+        self._reads = ()  # (vk, bit) of every subscribed VK, in poll order
+        self._fresh = 0  # Newly activated bits whose state must be read before reporting edges
+        self._holding = []  # Bindings waiting for their hold time
+        self.activate("")
+
+    def activate(self, title_lower: str) -> bool:
+        """Recompute the active set for a window title. Returns True if it changed."""
+        self.title_lower = title_lower
+        matched = frozenset(target for target in self.targets if target in title_lower)
+        if matched == self.active_targets:
+            return False
+        self.active_targets = matched
+        subscribers = {}
+        for vk, bound in self.bindings.items():
+            active = [b for b in bound if b.timeline.target_lower is None or b.timeline.target_lower in matched]
+            if active:
+                subscribers[vk] = active
+        self.subscribers = subscribers
+        self.vks = tuple(subscribers)
+        self._reads = tuple((vk, self.bits[vk]) for vk in self.vks)
+        active_mask = 0
+        for _, bit in self._reads:
+            active_mask |= bit
+        self._fresh |= active_mask & ~self.active_mask
+        self.active_mask = active_mask
+        self.live &= active_mask
+        # A pending hold of a timeline that is no longer active never fires
+        self._holding = [b for b in self._holding if any(b in subscribers.get(vk, ()) for vk in b.vks)]
+        return True
+
+    def poll(self, read_vk):
+        """
+        Query every distinct active trigger key once with `read_vk(vk) -> bool`.
+        Returns a list of (vk, pressed) for keys whose state changed.
+        """
+        snapshot = 0
+        for vk, bit in self._reads:
+            if read_vk(vk):
+                snapshot |= bit
+        active_mask = self.active_mask
+        state = self.state
+        if self._fresh:
+            # A key already held when its group became active is not a new press
+            state = (state & ~self._fresh) | (snapshot & self._fresh)
+            self._fresh = 0
+        changed = (snapshot ^ state) & active_mask
+        self.state = (state & ~active_mask) | snapshot
+        self.live = active_mask
+        if not changed:
+            return []
+        return [(vk, bool(snapshot & bit)) for vk, bit in self._reads if changed & bit]
+
+    def update(self, vk: int, pressed: bool) -> bool:
+        """Apply one pushed key event. Returns True if an active trigger key changed state."""
+        bit = self.bits.get(vk)
+        if bit is None or pressed == bool(self.state & bit):
+            return False
+        self.state ^= bit
+        self.live |= bit
+        return vk in self.subscribers
+
+    def is_down(self, vk: int):
+        """Pressed state of `vk` from the latest snapshot, or None if the index does not track it right now."""
+        bit = self.bits.get(vk)
+        if bit is None or not self.live & bit:
+            return None
+        return bool(self.state & bit)
+
+    def triggered(self, vk: int, pressed: bool, now: float) -> list:
+        """
+        Advance the trigger state machines for one key edge (after `poll` or
+        `update`). Returns the (timeline, key) pairs that fire now.
+        """
+        bound = self.subscribers.get(vk, ())
+        if not pressed:
+            for binding in bound:
+                binding.deadline = None  # Released before the hold time
+            return []
+        state = self.state
+        complete = [b for b in bound if state & b.mask == b.mask]
+        if len(complete) > 1:
+            # The longest held chord wins: ctrl+g does not also count as a press of g
+            complete = [b for b in complete
+                        if not any(o.mask != b.mask and o.mask & b.mask == b.mask for o in complete)]
+        fired = []
+        for binding in complete:
+            if binding.taps > 1:
+                binding.count = binding.count + 1 if now - binding.last_press <= binding.window else 1
+                binding.last_press = now
+                if binding.count < binding.taps:
+                    continue
+                binding.count = 0
+            if binding.hold:
+                if binding.deadline is None:
+                    self._holding.append(binding)
+                binding.deadline = now + binding.hold
+                continue
+            fired.append((binding.timeline, binding.key))
+        return fired
+
+    def due(self, now: float) -> list:
+        """(timeline, key) pairs whose hold time has passed with the trigger still held."""
+        if not self._holding:
+            return []
+        fired = []
+        holding = []
+        for binding in self._holding:
+            if binding.deadline is None:
+                continue
+            if self.state & binding.mask != binding.mask:
+                binding.deadline = None
+            elif binding.deadline <= now:
+                binding.deadline = None
+                fired.append((binding.timeline, binding.key))
+            else:
+                holding.append(binding)
+        self._holding = holding
+        return fired
+
+    def next_deadline(self):
+        """Earliest pending hold deadline, or None."""
+        deadlines = [b.deadline for b in self._holding if b.deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def carry_state(self, other):
+        """Take over the key state of the index this one replaces, so held keys are not new presses."""
+        state = 0
+        for vk, bit in self.bits.items():
+            old = other.bits.get(vk)
+            if old is not None and other.state & old:
+                state |= bit
+        self.state = state
+
+
+# --- Trigger sources ---
+#
+# A trigger source turns physical input into `on_key(vk, pressed, detected_at)`
+# calls on the thread that runs `run()`. `on_tick()` is called at least every
+# few hundred milliseconds (and in time for pending hold triggers) so the
+# caller can do housekeeping and fire `TriggerIndex.due()` triggers.
+
+POLL_INTERVAL = 0.001
+QUEUE_TIMEOUT = 0.1
+# How often an event-driven source checks its key state against GetAsyncKeyState
+RECONCILE_INTERVAL = 0.05
+
+# Side-specific modifier VKs reported by hooks -> generic VKs used in key_mapping
+GENERIC_VK = {0xA0: 0x10, 0xA1: 0x10, 0xA2: 0x11, 0xA3: 0x11, 0xA4: 0x12, 0xA5: 0x12}
+MOUSE_BUTTON_VK = {'left': 0x01, 'right': 0x02, 'middle': 0x04, 'x1': 0x05, 'x2': 0x06}
+
+
+def async_key_reader():
+    """`read_vk(vk) -> bool` backed by GetAsyncKeyState."""
+    get_async_key_state = ctypes.windll.user32.GetAsyncKeyState
+    return lambda vk: (get_async_key_state(vk) & 0x8000) != 0
+
+
+class TriggerSource:
+    name = "base"
+
+    def __init__(self, index: TriggerIndex, clock=time.perf_counter):
+        self.index = index
+        self.clock = clock
+        self._stopping = False
+
+    def run(self, on_key, on_tick=None):
+        raise NotImplementedError
+
+    def stop(self):
+        self._stopping = True
+
+    def wake(self):
+        """Make `run()` call `on_tick()` soon. Polling sources tick every interval anyway."""
+        pass
+
+
+class PollingTriggerSource(TriggerSource):
+    """Polls every distinct trigger key with `read_vk` once per POLL_INTERVAL."""
+    name = "poll"
+
+    def __init__(self, index: TriggerIndex, read_vk=None, clock=time.perf_counter, interval: float = POLL_INTERVAL):
+        super().__init__(index, clock)
+        self.read_vk = read_vk or async_key_reader()
+        self.interval = interval
+
+    def run(self, on_key, on_tick=None):
+        self._stopping = False
+        while not self._stopping:
+            changes = self.index.poll(self.read_vk)
+            if changes:
+                now = self.clock()
+                for vk, pressed in changes:
+                    on_key(vk, pressed, now)
+            if on_tick:
+                on_tick()
+            time.sleep(self.interval)
+
+
+class QueueTriggerSource(TriggerSource):
+    """
+    Event-driven source: producers call `push(vk, pressed)` from any thread and
+    `run()` delivers the events in order. Tests and scripts can push directly.
+
+    With `read_vk`, every `reconcile_interval` seconds in which no event is
+    waiting the pushed state is checked against the real key state, the way
+    the polling source reads it, so a lost release does not leave a key down.
+    """
+    name = "queue"
+
+    def __init__(self, index: TriggerIndex, clock=time.perf_counter, read_vk=None,
+                 reconcile_interval: float = RECONCILE_INTERVAL):
+        super().__init__(index, clock)
+        self.events = queue.SimpleQueue()
+        self.read_vk = read_vk
+        self.reconcile_interval = reconcile_interval
+
+    def push(self, vk: int, pressed: bool):
+        # Timestamp on the producer thread, before the hand-off
+        self.events.put((vk, pressed, self.clock()))
+
+    def reconcile(self, on_key):
+        """Report every subscribed key whose real state differs from the pushed one."""
+        changes = self.index.poll(self.read_vk)
+        if changes:
+            now = self.clock()
+            for vk, pressed in changes:
+                on_key(vk, pressed, now)
+
+    def run(self, on_key, on_tick=None):
+        self._stopping = False
+        wait = QUEUE_TIMEOUT if self.read_vk is None else min(QUEUE_TIMEOUT, self.reconcile_interval)
+        if self.read_vk is not None:
+            # Baseline: keys already held at start never get a press event either
+            self.index.poll(self.read_vk)
+        next_reconcile = self.clock() + self.reconcile_interval
+        while not self._stopping:
+            timeout = wait
+            deadline = self.index.next_deadline()
+            if deadline is not None:
+                # Wake up in time for a pending hold trigger
+                timeout = min(timeout, max(0.0, deadline - self.clock()))
+            try:
+                vk, pressed, detected_at = self.events.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                # Drop auto-repeat and keys nobody listens to
+                if self.index.update(vk, pressed):
+                    on_key(vk, pressed, detected_at)
+            if self.read_vk is not None and self.events.empty():
+                now = self.clock()
+                if now >= next_reconcile:
+                    self.reconcile(on_key)
+                    next_reconcile = now + self.reconcile_interval
+            if on_tick:
+                on_tick()
+
+    def stop(self):
+        super().stop()
+        self.wake()
+
+    def wake(self):
+        self.events.put((0, False, 0.0))  # Wake up run(); VK 0 is never bound
+
+
+class HookTriggerSource(QueueTriggerSource):
+    """
+    Low-level keyboard/mouse hooks through pynput, pushing into the queue.
+    Hooks can miss events (e.g. a release while another window has a hook
+    that swallows it), so the state is reconciled with GetAsyncKeyState.
+    """
+    name = "hook"
+
+    def __init__(self, index: TriggerIndex, clock=time.perf_counter, read_vk=None):
+        super().__init__(index, clock, read_vk or async_key_reader())
+        from pynput import keyboard, mouse
+        self._listeners = [
+            keyboard.Listener(on_press=self._on_press, on_release=self._on_release),
+            mouse.Listener(on_click=self._on_click),
+        ]
+
+    def _key_vk(self, key):
+        vk = getattr(key, 'vk', None)
+        if vk is None:
+            vk = getattr(getattr(key, 'value', None), 'vk', None)
+        if vk in GENERIC_VK and vk not in self.index.bindings:
+            vk = GENERIC_VK[vk]
+        return vk
+
+    def _on_press(self, key):
+        vk = self._key_vk(key)
+        if vk in self.index.bindings:
+            self.push(vk, True)
+
+    def _on_release(self, key):
+        vk = self._key_vk(key)
+        if vk in self.index.bindings:
+            self.push(vk, False)
+
+    def _on_click(self, x, y, button, pressed):
+        vk = MOUSE_BUTTON_VK.get(getattr(button, 'name', None))
+        if vk in self.index.bindings:
+            self.push(vk, pressed)
+
+    def run(self, on_key, on_tick=None):
+        for listener in self._listeners:
+            listener.start()
+        try:
+            super().run(on_key, on_tick)
+        finally:
+            for listener in self._listeners:
+                listener.stop()
+
+
+def create_trigger_source(mode: str, index: TriggerIndex) -> TriggerSource:
+    """`mode` is 'poll' (default) or 'hook'. Hooks fall back to polling if pynput is unavailable."""
+    if (mode or 'poll').strip().lower() == 'hook':
+        try:
+            return HookTriggerSource(index)
+        except ImportError as e:
+            print(f"[Warning] Hook trigger source unavailable ({e}), falling back to polling.")
+    return PollingTriggerSource(index)
@@ -0,0 +1,200 @@
+"""
+Wait strategies used by the scheduler's dispatch thread to reach a deadline.
+
+- SpinWait: busy-waits on the clock. Most precise, burns a full core.
+- HybridWait: sleeps until `margin` before the deadline, then spins. The margin
+  can be calibrated at startup from the measured sleep overshoot.
+- TimerWait: Windows high-resolution waitable timer, then a short spin.
+
+`notify()` interrupts a wait early (a new earlier event was scheduled). Every
+wait that reaches its deadline records how late it returned in `stats`.
+"""
+import ctypes
+import statistics
+import threading
+import time
+
+from src.samples import STATS_SIZE, SampleRing
+
+DEFAULT_MARGIN = 0.001
+
+
+class WaitStats:
+    """Ring of wait lateness samples plus sleep/spin time totals."""
+
+    def __init__(self, size: int = STATS_SIZE):
+        self.lateness = SampleRing(size)
+        self.sleep_time = 0.0
+        self.spin_time = 0.0
+
+    def record(self, late: float):
+        self.lateness.record(late)
+
+    def summary(self) -> dict:
+        late = self.lateness.summary()
+        if late is None:
+            return {'waits': 0}
+        busy = self.sleep_time + self.spin_time
+        return {
+            'waits': self.lateness.count,
+            'p50_us': late['p50_us'],
+            'p99_us': late['p99_us'],
+            'max_us': late['max_us'],
+            'spin_share': self.spin_time / busy if busy else 0.0,
+        }
+
+
+class WaitStrategy:
+    name = "base"
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = WaitStats()
+
+    def notify(self):
+        """Wake up a wait in progress."""
+        raise NotImplementedError
+
+    def wait_until(self, deadline: float) -> bool:
+        """Wait for `deadline`. Returns False if interrupted by `notify()`."""
+        raise NotImplementedError
+
+    def _spin(self, deadline: float, interrupted) -> bool:
+        clock = self.clock
+        start = clock()
+        now = start
+        while now < deadline:
+            if interrupted():
+                self.stats.spin_time += now - start
+                return False
+            now = clock()
+        self.stats.spin_time += now - start
+        self.stats.record(now - deadline)
+        return True
+
+
+class SpinWait(WaitStrategy):
+    name = "spin"
+
+    def __init__(self, clock=time.perf_counter):
+        super().__init__(clock)
+        self._woken = False
+
+    def notify(self):
+        self._woken = True
+
+    def _interrupted(self):
+        return self._woken
+
+    def wait_until(self, deadline: float) -> bool:
+        if self._woken:
+            self._woken = False
+            return False
+        return self._spin(deadline, self._interrupted)
+
+
+class HybridWait(WaitStrategy):
+    name = "hybrid"
+
+    def __init__(self, margin: float = DEFAULT_MARGIN, clock=time.perf_counter):
+        super().__init__(clock)
+        self.margin = margin
+        self._wake = threading.Event()
+
+    def notify(self):
+        self._wake.set()
+
+    def wait_until(self, deadline: float) -> bool:
+        wake = self._wake
+        remaining = deadline - self.clock() - self.margin
+        if remaining > 0:
+            start = self.clock()
+            woken = wake.wait(remaining)
+            self.stats.sleep_time += self.clock() - start
+            if woken:
+                wake.clear()
+                return False
+        elif wake.is_set():
+            wake.clear()
+            return False
+        return self._spin(deadline, wake.is_set)
+
+
+class TimerWait(WaitStrategy):
+    """Windows only: CREATE_WAITABLE_TIMER_HIGH_RESOLUTION plus a wake event."""
+    name = "timer"
+    CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+    TIMER_ALL_ACCESS = 0x1F0003
+    INFINITE = 0xFFFFFFFF
+    WAIT_OBJECT_0 = 0
+
+    def __init__(self, margin: float = 0.0002, clock=time.perf_counter):
+        super().__init__(clock)
+        self.margin = margin
+        kernel32 = ctypes.windll.kernel32
+        kernel32.CreateWaitableTimerExW.restype = ctypes.c_void_p
+        kernel32.CreateEventW.restype = ctypes.c_void_p
+        timer = kernel32.CreateWaitableTimerExW(None, None, self.CREATE_WAITABLE_TIMER_HIGH_RESOLUTION, self.TIMER_ALL_ACCESS)
+        if not timer:
+            raise OSError("high-resolution waitable timers are not supported")
+        self._kernel32 = kernel32
+        self._timer = timer
+        self._wake = kernel32.CreateEventW(None, False, False, None)  # Auto-reset
+        self._handles = (ctypes.c_void_p * 2)(timer, self._wake)
+        self._due = ctypes.c_longlong(0)
+        self._woken = False
+
+    def notify(self):
+        self._woken = True
+        self._kernel32.SetEvent(self._wake)
+
+    def _interrupted(self):
+        return self._woken
+
+    def wait_until(self, deadline: float) -> bool:
+        remaining = deadline - self.clock() - self.margin
+        if remaining > 0:
+            start = self.clock()
+            # Negative due time = relative, in 100 ns units
+            self._due.value = -int(remaining * 1e7)
+            self._kernel32.SetWaitableTimer(ctypes.c_void_p(self._timer), ctypes.byref(self._due), 0, None, None, False)
+            result = self._kernel32.WaitForMultipleObjects(2, self._handles, False, self.INFINITE)
+            self.stats.sleep_time += self.clock() - start
+            if result == self.WAIT_OBJECT_0 + 1:
+                self._kernel32.CancelWaitableTimer(ctypes.c_void_p(self._timer))
+                self._woken = False
+                return False
+        if self._woken:
+            self._woken = False
+            return False
+        return self._spin(deadline, self._interrupted)
+
+
+def calibrate_margin(samples: int = 50, request: float = 0.001) -> float:
+    """
+    Measure how far Event.wait overshoots a short timeout and return a spin
+    margin that covers the 95th percentile (clamped to 0.2 .. 4 ms).
+    """
+    event = threading.Event()
+    overshoots = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        event.wait(request)
+        overshoots.append(time.perf_counter() - start - request)
+    overshoot = statistics.quantiles(overshoots, n=20)[18]
+    return min(max(overshoot + 0.0001, 0.0002), 0.004)
+
+
+def create_wait_strategy(mode: str = 'hybrid') -> WaitStrategy:
+    """`mode` is 'hybrid' (default, calibrated), 'spin' or 'timer' (falls back to hybrid)."""
+    mode = (mode or 'hybrid').strip().lower()
+    if mode == 'spin':
+        return SpinWait()
+    if mode == 'timer':
+        try:
+            return TimerWait()
+        except (AttributeError, OSError) as e:
+            print(f"[Warning] Waitable timer unavailable ({e}), using hybrid wait.")
+    elif mode != 'hybrid':
+        print(f"[Warning] Unknown wait mode '{mode}', using hybrid wait.")
+    return HybridWait(calibrate_margin())
@@ -0,0 +1,92 @@
+"""
+Foreground window tracking for `Target:` filters.
+
+The title is only read again when the foreground HWND changes, or when the
+cached title is older than TITLE_RECHECK (titles of the same window can
+change, e.g. when a game finishes loading). FakeWindowTracker stands in for
+the real one on Linux.
+"""
+import ctypes
+import time
+
+TITLE_RECHECK = 0.5
+
+
+class WindowTracker:
+    def title(self) -> str:
+        raise NotImplementedError
+
+    def title_lower(self) -> str:
+        raise NotImplementedError
+
+    def changed(self) -> bool:
+        """True if the title differs from the one seen by the previous `changed()` call."""
+        raise NotImplementedError
+
+
+class ForegroundWindowTracker(WindowTracker):
+    def __init__(self, clock=time.perf_counter):
+        user32 = ctypes.windll.user32
+        self._get_foreground = user32.GetForegroundWindow
+        self._get_length = user32.GetWindowTextLengthW
+        self._get_text = user32.GetWindowTextW
+        self.clock = clock
+        self._buffer = ctypes.create_unicode_buffer(256)
+        self._hwnd = None
+        self._read_at = 0.0
+        self._title = ""
+        self._title_lower = ""
+        self._reported = None
+
+    def _refresh(self):
+        hwnd = self._get_foreground()
+        now = self.clock()
+        if hwnd == self._hwnd and now - self._read_at < TITLE_RECHECK:
+            return
+        length = self._get_length(hwnd)
+        if length >= len(self._buffer):
+            self._buffer = ctypes.create_unicode_buffer(length + 1)
+        self._get_text(hwnd, self._buffer, len(self._buffer))
+        self._hwnd = hwnd
+        self._read_at = now
+        self._title = self._buffer.value
+        self._title_lower = self._title.lower()
+
+    def title(self) -> str:
+        self._refresh()
+        return self._title
+
+    def title_lower(self) -> str:
+        self._refresh()
+        return self._title_lower
+
+    def changed(self) -> bool:
+        # One GetForegroundWindow call unless the HWND changed or the title is stale
+        self._refresh()
+        if self._title_lower == self._reported:
+            return False
+        self._reported = self._title_lower
+        return True
+
+
+class FakeWindowTracker(WindowTracker):
+    """Reports whatever title was last set with `set_title`."""
+
+    def __init__(self, title: str = ""):
+        self._changed = False
+        self.set_title(title)
+
+    def set_title(self, title: str):
+        self._title = title
+        self._title_lower = title.lower()
+        self._changed = True
+
+    def title(self) -> str:
+        return self._title
+
+    def title_lower(self) -> str:
+        return self._title_lower
+
+    def changed(self) -> bool:
+        changed, self._changed = self._changed, False
+        return changed
@@ -0,0 +1,80 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src import control
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.log import log
+from src.plan import compile_timelines
+from src.scheduler import Scheduler
+from src.simulate import VirtualClock
+
+
+class Engine:
+    """A Scheduler on a VirtualClock, driven by hand through `run_pending()`."""
+
+    def __init__(self):
+        self.clock = VirtualClock()
+        self.backend = RecordingBackend(clock=self.clock)
+        self.scheduler = Scheduler(clock=self.clock, on_batch_end=self.backend.flush)
+        self.keys = set()  # Trigger keys currently held
+
+    def key_state(self, key: str) -> bool:
+        return key in self.keys
+
+    def load(self, text: str) -> dict:
+        """Parse and compile config text; returns the timelines by name."""
+        _, timelines, errors = parse_lines(text.splitlines())
+        assert errors == 0
+        assert compile_timelines(timelines, lambda target: None, self.backend) == 0
+        return {t.name: t for t in timelines}
+
+    def start(self, run_class, timeline, trigger_key: str = None, **kwargs):
+        """Admit, attach and start a run the way control.start_run does."""
+        timeline.run_state.admit('drop', 1, None, self.clock())
+        run = run_class(timeline, self.scheduler, self.key_state, trigger_key, self.backend, **kwargs)
+        timeline.run_state.attach(run)
+        return run.start()
+
+    def advance(self, until: float, late: float = 0.0):
+        """
+        Run every event due up to `until`. Each wake-up happens `late`
+        seconds after its deadline, like a real dispatch thread.
+        """
+        while True:
+            deadline = self.scheduler.run_pending()
+            if deadline is None or deadline + late > until:
+                break
+            self.clock.advance_to(deadline + late)
+        self.clock.advance_to(until)
+        self.scheduler.run_pending()
+
+    def jump(self, to: float):
+        """Move the clock without running anything, as if the dispatch thread had stalled."""
+        self.clock.advance_to(to)
+
+    def events(self, name: str = None):
+        """(time, name, args) of the recorded input, optionally only one kind."""
+        return [(at, event, args) for at, _, event, args in self.backend.events if name is None or event == name]
+
+
+@pytest.fixture
+def engine():
+    log.set_level('error')  # Runs log every start and stop at info level
+    yield Engine()
+    log.set_level('info')
+
+
+@pytest.fixture
+def runtime(engine, monkeypatch):
+    """control's module state routed to `engine`, the way main_loop sets it up."""
+    monkeypatch.setattr(control, 'engine', engine.scheduler)
+    monkeypatch.setattr(control, 'backend', engine.backend)
+    monkeypatch.setattr(control, 'key_check', engine.key_state)
+    monkeypatch.setattr(control, 'pool', None)
+    monkeypatch.setattr(control, 'telemetry', None)
+    return engine
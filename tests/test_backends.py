@@ -0,0 +1,54 @@
+from src.backends import RecordingBackend
+from src.runners import OneShotRun
+
+GROUPED = """
+[Timeline: grouped]
+0 mouse_up left, key_down esc
+10 press_key a
+"""
+
+
+class TickingClock:
+    """Every reading is 1 ms after the previous one, like time spent sending."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 0.001
+        return self.now
+
+
+def batches(engine):
+    return [[name for _, batch_id, name, _ in engine.backend.events if batch_id == batch]
+            for batch in sorted({e[1] for e in engine.backend.events})]
+
+
+def test_comma_grouped_actions_go_out_in_one_flush(engine):
+    engine.backend.batched = True
+    t = engine.load(GROUPED)['grouped']
+    engine.start(OneShotRun, t)
+    engine.advance(0.02)
+    assert batches(engine) == [['mouse_up', 'key_down'], ['press_key']]
+    assert engine.backend.spreads() == [0.0]
+
+
+def test_actions_due_together_in_two_runs_share_a_flush(engine):
+    engine.backend.batched = True
+    timelines = engine.load(GROUPED + "[Timeline: other]\n0 press_key b\n")
+    engine.start(OneShotRun, timelines['grouped'])
+    engine.start(OneShotRun, timelines['other'])
+    engine.advance(0.02)
+    assert batches(engine) == [['mouse_up', 'key_down', 'press_key'], ['press_key']]
+
+
+def test_batching_removes_the_spread_between_grouped_events():
+    spreads = []
+    for batched in (False, True):
+        backend = RecordingBackend(clock=TickingClock(), batched=batched)
+        backend.mouse_up('left')
+        backend.key_down('esc')
+        backend.flush()
+        spreads.append(backend.spreads())
+    unbatched, batched = spreads
+    assert unbatched[0] > 0 and batched == [0.0]
@@ -0,0 +1,76 @@
+import os
+
+from src.cache import cache_path
+from src.control import load_startup
+from src.plan import bind_timelines
+from src.runners import OneShotRun
+
+CONFIG = """
+InputBackend = recording
+
+[Timeline: shot]
+Trigger: e
+0 press_key a, mouse_down left
+10 jump
+20 press_key b
+"""
+
+
+def write_config(tmp_path, text=CONFIG):
+    path = tmp_path / "config.ini"
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def plans(timelines):
+    return [(t.name, [(a[0], a[1], a[2]) for a in t.plan]) for t in timelines]
+
+
+def test_second_start_loads_the_same_result_from_the_cache(tmp_path):
+    path = write_config(tmp_path)
+    settings, timelines, errors, cached = load_startup(path)
+    assert not cached and errors == 1  # `jump` is rejected once, at compile time
+    assert os.path.exists(cache_path(path))
+
+    settings2, timelines2, errors2, cached2 = load_startup(path)
+    assert cached2
+    assert (settings2, errors2) == (settings, errors)
+    assert plans(timelines2) == plans(timelines)
+    assert timelines2[0].trigger_keys == ['e'] and timelines2[0].action_keys == {'a', 'b'}
+
+
+def test_changed_config_misses_the_cache(tmp_path):
+    path = write_config(tmp_path)
+    load_startup(path)
+    write_config(tmp_path, CONFIG.replace("20 press_key b", "30 press_key c"))
+    _, timelines, _, cached = load_startup(path)
+    assert not cached
+    assert plans(timelines)[0][1][-1] == (0.03, 'press_key', ('c',))
+
+
+def test_cache_can_be_turned_off(tmp_path):
+    path = write_config(tmp_path, "ConfigCache = False\n" + CONFIG)
+    load_startup(path)
+    assert not os.path.exists(cache_path(path))
+    assert not load_startup(path)[3]
+
+
+def test_unreadable_cache_entry_is_ignored(tmp_path):
+    path = write_config(tmp_path)
+    load_startup(path)
+    with open(cache_path(path), 'wb') as f:
+        f.write(b"not marshal data")
+    _, timelines, _, cached = load_startup(path)
+    assert not cached and timelines
+
+
+def test_cached_plans_run_once_bound(engine, tmp_path):
+    path = write_config(tmp_path)
+    load_startup(path)
+    _, timelines, _, cached = load_startup(path)
+    assert cached
+    bind_timelines(timelines, lambda target: None, engine.backend)
+    engine.start(OneShotRun, timelines[0])
+    engine.advance(0.05)
+    assert [(at, name, args) for at, name, args in engine.events()] == [
+        (0.0, 'press_key', ('a',)), (0.0, 'mouse_down', ('left',)), (0.02, 'press_key', ('b',))]
@@ -0,0 +1,119 @@
+import threading
+
+import pytest
+
+from src import control
+from src.concurrency import DEBOUNCED, DROPPED, QUEUED, RESTART, START, RunState, parse_concurrency
+
+SHOT = """
+[Timeline: shot]
+Trigger: e
+Concurrency: {policy}
+Cooldown: {cooldown}
+0 press_key a
+100 press_key b
+"""
+
+
+def test_parse_concurrency():
+    assert parse_concurrency("Queue 3") == ('queue', 3)
+    assert parse_concurrency("restart") == ('restart', 1)
+    for value in ("", "sometimes", "parallel 0", "queue x"):
+        with pytest.raises(ValueError):
+            parse_concurrency(value)
+
+
+def test_queued_activation_takes_the_freed_slot():
+    state = RunState()
+    launched = []
+    assert state.admit('queue', 1, None, 0.0) == (START, None)
+    state.attach('first')
+    assert state.admit('queue', 1, None, 0.1, lambda: launched.append('second')) == (QUEUED, None)
+    assert state.admit('queue', 1, None, 0.2, lambda: launched.append('third')) == (DROPPED, None)  # Queue full
+    queued = state.exit('first')
+    assert state.active == 1  # Handed over without a gap
+    queued()
+    assert launched == ['second']
+    assert state.counters() == {'started': 2, 'dropped': 1, 'queued': 1, 'restarted': 0, 'debounced': 0}
+
+
+def test_restart_hands_the_slot_to_the_new_run():
+    state = RunState()
+    state.admit('restart', 1, None, 0.0)
+    state.attach('old')
+    assert state.admit('restart', 1, None, 0.5) == (RESTART, 'old')
+    state.attach('new')
+    assert state.exit('old') is None and state.active == 1  # The victim's exit no longer counts
+    state.exit('new')
+    assert state.active == 0
+
+
+def test_cooldown_counts_from_the_last_accepted_trigger():
+    state = RunState()
+    assert state.admit('parallel', 5, 0.3, 0.0)[0] == START
+    assert state.admit('parallel', 5, 0.3, 0.2)[0] == DEBOUNCED
+    assert state.admit('parallel', 5, 0.3, 0.35)[0] == START  # Ignored triggers do not restart the cooldown
+    assert state.debounced == 1
+
+
+def test_concurrent_admits_never_exceed_the_limit():
+    state = RunState()
+    peak = []
+    barrier = threading.Barrier(8)
+
+    def worker(n):
+        barrier.wait()
+        for i in range(2000):
+            result, _ = state.admit('parallel', 3, None, 0.0)
+            if result == START:
+                run = (n, i)
+                state.attach(run)
+                peak.append(state.active)
+                state.exit(run)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3
+    assert state.active == 0 and not state.runs
+    assert state.started + state.dropped == 8 * 2000
+
+
+def press(t, at, last_triggered):
+    return control.trigger_timeline(t, 'e', None, last_triggered, at)
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ('drop', [(0.0, 'a'), (0.1, 'b')]),
+    # The first run ends once it sees the trigger key up, one poll after its last action
+    ('queue 1', [(0.0, 'a'), (0.1, 'b'), (0.15, 'a'), (0.25, 'b')]),
+    ('restart', [(0.0, 'a'), (0.05, 'a'), (0.15, 'b')]),
+    ('parallel 2', [(0.0, 'a'), (0.05, 'a'), (0.1, 'b'), (0.15, 'b')]),
+])
+def test_policies_through_trigger_timeline(runtime, policy, expected):
+    t = runtime.load(SHOT.format(policy=policy, cooldown=0))['shot']
+    last_triggered = {}
+    assert press(t, 0.0, last_triggered)
+    runtime.advance(0.05)
+    press(t, 0.05, last_triggered)
+    runtime.advance(0.5)
+    assert [(round(at, 6), args[0]) for at, _, args in runtime.events()] == expected
+    assert not t.is_running and t.run_state.active == 0
+
+
+def test_cooldown_setting_debounces_presses(runtime):
+    t = runtime.load(SHOT.format(policy='parallel 5', cooldown=200))['shot']
+    last_triggered = {}
+    assert press(t, 0.0, last_triggered)
+    runtime.advance(0.1)
+    assert not press(t, 0.1, last_triggered)
+    runtime.advance(0.25)
+    assert press(t, 0.25, last_triggered)
+    assert t.run_state.debounced == 1
+
+
+def test_invalid_settings_are_counted():
+    _, _, errors = control.parse_lines(SHOT.format(policy='sometimes', cooldown=-5).splitlines())
+    assert errors == 2
@@ -0,0 +1,93 @@
+import pytest
+
+from src.control import parse_lines
+from src.runners import FRAME_SNAP, LoopRun, OneShotRun, frame_start
+
+FRAME = 1 / 60
+
+
+def parse(text, defaults=None):
+    _, timelines, errors = parse_lines(text.splitlines(), defaults)
+    assert errors == 0
+    return {t.name: t for t in timelines}
+
+
+def test_frame_offsets_use_the_timelines_frame_length():
+    timelines = parse("""
+FPS = 30
+
+[Timeline: global]
+0 press_key a
+2f press_key b
+16.67 press_key c
+
+[Timeline: own]
+FramePeriod: 16.6833
+FPS: 144
+1.5f press_key a
+""")
+    assert [a[0] for a in timelines['global'].actions] == pytest.approx([0.0, 0.01667, 2 / 30])
+    # FramePeriod beats FPS, even when both are set
+    assert timelines['own'].frame_period == pytest.approx(0.0166833)
+    assert timelines['own'].actions[0][0] == pytest.approx(1.5 * 0.0166833)
+
+
+def test_loop_period_and_interval_accept_frames():
+    timelines = parse("""
+[Timeline: period]
+Mode: Loop
+Period: 2f
+FPS: 120
+
+[Timeline: interval]
+Mode: Loop
+Interval: 3f
+Interval: 0.25
+
+[Timeline: seconds]
+Mode: Loop
+Period: 0.05
+""", defaults={'fps': '30'})
+    assert timelines['period'].loop_period == pytest.approx(2 / 120)  # FPS set after Period still applies
+    assert timelines['interval'].loop_interval == 0.25  # The later line wins
+    assert timelines['seconds'].loop_period == 0.05
+
+
+def test_invalid_frame_values_are_counted():
+    _, _, errors = parse_lines("FPS = fast\n[Timeline: t]\nMode: Loop\nPeriod: xf\nFramePeriod: 0\n1g press_key a\n".splitlines())
+    assert errors == 4
+
+
+def test_frame_grid_is_anchored_at_clock_zero():
+    assert frame_start(0.0, FRAME) == 0.0
+    assert frame_start(1.0, 0.25) == 1.0
+    assert frame_start(1.0 + FRAME_SNAP / 2, 0.25) == 1.0  # Just late: still this boundary
+    assert frame_start(1.01, 0.25) == 1.25
+
+
+def test_aligned_runs_start_on_the_next_frame(engine):
+    t = engine.load("""
+[Timeline: shot]
+FrameAlign: true
+0 press_key a
+1f press_key b
+""")['shot']
+    engine.jump(0.005)
+    engine.start(OneShotRun, t)
+    engine.advance(0.1)
+    assert [at for at, _, _ in engine.events()] == pytest.approx([FRAME, 2 * FRAME])
+
+
+def test_aligned_loop_with_period_in_frames_stays_on_the_grid(engine):
+    t = engine.load("""
+[Timeline: loop]
+Mode: Loop
+FrameAlign: true
+Period: 2f
+0 press_key a
+""")['loop']
+    engine.jump(0.02)
+    engine.start(LoopRun, t)
+    engine.advance(0.19, late=0.0002)
+    # Every cycle starts 0.2 ms (the wake-up lateness) after an even frame boundary
+    assert [round((at - 0.0002) / FRAME, 6) for at, _, _ in engine.events()] == [2, 4, 6, 8, 10]
@@ -0,0 +1,53 @@
+import threading
+
+from src.backends import RecordingBackend
+from src.injector import CommandRing, InjectorBackend, create_injector, parse_cpus
+
+
+def test_ring_pops_in_sequence_order_and_wraps():
+    ring = CommandRing(size=4)
+    for round_ in range(3):  # More pushes than slots, so the ring wraps
+        for i in range(4):
+            assert not ring.push(print, (round_, i), 0.0)
+        assert [ring.pop()[2] for _ in range(4)] == [(round_, i) for i in range(4)]
+        assert ring.pop() is None
+
+
+def test_injector_keeps_each_producers_order():
+    recorder = RecordingBackend()
+    injector = InjectorBackend(recorder, priority='normal', ring_size=8).start()
+
+    def produce(key):
+        for _ in range(50):
+            injector.key_down(key)
+            injector.key_up(key)
+
+    producers = [threading.Thread(target=produce, args=(key,)) for key in 'abc']
+    for thread in producers:
+        thread.start()
+    for thread in producers:
+        thread.join()
+    injector.flush()
+    injector.stop()
+
+    events = [(event, args[0]) for _, _, event, args in recorder.events]
+    assert len(events) == 300
+    for key in 'abc':
+        # Calls from one thread reach the backend in the order they were made
+        assert [e for e, k in events if k == key] == ['key_down', 'key_up'] * 50
+    assert injector.stats.count == 301  # Every call, the flush included
+
+
+def test_stopped_injector_calls_the_backend_directly():
+    recorder = RecordingBackend()
+    injector = InjectorBackend(recorder)
+    injector.press('a')
+    assert [event for _, _, event, _ in recorder.events] == ['press_key']
+    assert injector.stats.count == 0
+
+
+def test_create_injector_settings():
+    recorder = RecordingBackend()
+    assert create_injector(recorder, 'off') is recorder
+    assert create_injector(recorder, 'bogus') is recorder
+    assert parse_cpus(' 3, 2,3') == (2, 3) and parse_cpus('') == ()
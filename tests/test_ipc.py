@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from src import control
+from src.ipc import ControlClient, ControlServer, parse_request
+
+CONFIG = """
+[Timeline: shot]
+Trigger: e
+0 press_key a
+10 press_key b
+
+[Timeline: loop]
+Trigger: l
+Mode: Loop
+Interval: 0.1
+0 press_key d
+"""
+
+
+def test_parse_request():
+    assert parse_request(" trigger 连招 ; status 连招;;ping\n") == [('trigger', '连招'), ('status', '连招'), ('ping', '')]
+
+
+@pytest.fixture
+def server():
+    """A ControlServer on a free port whose requests a background 'trigger thread' processes."""
+    calls = []
+
+    def handler(verb, name):
+        calls.append((verb, name))
+        if name == 'broken':
+            raise RuntimeError("boom")
+        return f"{verb} {name}".strip()
+
+    server = ControlServer(handler, port=0).start()
+    stopping = threading.Event()
+
+    def trigger_thread():
+        while not stopping.wait(0.001):
+            server.process()
+
+    thread = threading.Thread(target=trigger_thread)
+    thread.start()
+    server.calls = calls
+    yield server
+    stopping.set()
+    thread.join()
+    server.stop()
+
+
+def test_replies_come_back_in_order(server):
+    client = ControlClient(server.port)
+    assert client.request('trigger a', 'status a') == ['trigger a', 'status a']
+    assert client.request('jump a; ping; status broken') == ["error unknown command 'jump'", 'ping', 'error boom']
+    client.close()
+    assert server.calls == [('trigger', 'a'), ('status', 'a'), ('ping', ''), ('status', 'broken')]
+    assert server.handled == 2
+
+
+def test_stop_releases_waiting_requests():
+    server = ControlServer(lambda verb, name: "ok", port=0).start()  # Nobody calls process()
+    client = ControlClient(server.port, timeout=2.0)
+    replies = []
+    thread = threading.Thread(target=lambda: replies.append(client.request('ping')))
+    thread.start()
+    while server.requests.empty():
+        thread.join(0.001)
+    server.stop()
+    thread.join()
+    client.close()
+    assert replies == [['error stopping']]
+
+
+@pytest.fixture
+def command(runtime):
+    """control_command on CONFIG, with the runtime state on the test engine."""
+    timelines = runtime.load(CONFIG)
+    last_triggered = {}
+    return lambda verb, name='': control.control_command(verb, name, timelines, None, last_triggered)
+
+
+def test_control_commands_drive_the_timelines(engine, command):
+    assert command('list') == "shot, loop"
+    assert command('status', 'nosuch') == "error unknown timeline"
+    assert command('trigger', 'shot') == "ok"
+    assert command('status', 'shot') == "running"
+    engine.advance(0.05)
+    assert command('status', 'shot') == "idle"  # No trigger key to wait for
+    assert [args for _, _, args in engine.events()] == [('a',), ('b',)]
+
+    assert command('toggle', 'loop') == "on"  # Starts at 0.05
+    engine.advance(0.2)
+    assert command('toggle', 'loop') == "off"
+    engine.advance(0.5)
+    assert command('status', 'loop') == "idle" and command('stop', 'loop') == "idle"
+    assert [args for _, _, args in engine.events()][2:] == [('d',), ('d',)]
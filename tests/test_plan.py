@@ -0,0 +1,43 @@
+import pytest
+
+from src.backends import RecordingBackend
+from src.control import Timeline
+from src.plan import compile_timelines
+
+
+def timeline(name, *actions, mode='oneshot'):
+    t = Timeline(name)
+    t.mode = mode
+    t.actions = [(offset, command, list(args)) for offset, command, *args in actions]
+    return t
+
+
+def test_actions_are_bound_once_in_offset_order():
+    t = timeline("t", (0.0, 'key_down', 'a'), (0.01, 'key_up', 'a'), (0.02, 'move_mouse', '10', '20'))
+    assert compile_timelines([t], lambda target: None, RecordingBackend()) == 0
+    assert [(a.offset, a.command, a.args) for a in t.plan] == [
+        (0.0, 'key_down', ('a',)), (0.01, 'key_up', ('a',)), (0.02, 'move_mouse', (10, 20))]
+    assert t.action_keys == {'a'}
+
+
+@pytest.mark.parametrize("command, args", [
+    ('key_down', ()),  # Missing key
+    ('press_key', ('notakey',)),
+    ('click_mouse', ('wheel',)),
+    ('move_mouse', ('10',)),
+    ('wait', ('soon',)),
+    ('jump', ()),  # Unknown command
+    ('run_timeline', ('missing',)),
+])
+def test_invalid_actions_are_counted_and_left_out(command, args):
+    t = timeline("t", (0.0, 'press_key', 'a'), (0.01, command, *args))
+    assert compile_timelines([t], lambda target: None, RecordingBackend()) == 1
+    assert [a.command for a in t.plan] == ['press_key']
+
+
+def test_run_timeline_needs_a_oneshot_target():
+    loop = timeline("loop", (0.0, 'press_key', 'a'), mode='loop')
+    shot = timeline("shot", (0.0, 'press_key', 'b'))
+    caller = timeline("caller", (0.0, 'run_timeline', 'Shot'), (0.01, 'run_timeline', 'loop'))
+    assert compile_timelines([loop, shot, caller], lambda target: None, RecordingBackend()) == 1
+    assert [a.target for a in caller.plan] == [shot]
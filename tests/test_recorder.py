@@ -0,0 +1,47 @@
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.plan import compile_timelines
+from src.recorder import Recorder, compress, format_timeline
+
+
+def test_press_and_release_become_one_press_and_repeats_are_dropped():
+    recorder = Recorder()
+    recorder.key('e', True, t=1.0)
+    recorder.key('e', True, t=1.001)  # OS auto-repeat
+    recorder.key('e', False, t=1.004)
+    recorder.key('w', True, t=1.1)
+    recorder.key('w', True, t=1.2)
+    recorder.key('w', False, t=1.5)
+    recorder.key('q', False, t=1.6)  # Pressed before the recording started
+    assert recorder.repeats == 2
+    assert compress(recorder.events) == [(0, ['press_key e']), (100, ['key_down w']), (500, ['key_up w'])]
+
+
+def test_moves_are_thinned_but_clicks_land_on_the_recorded_pixel():
+    recorder = Recorder()
+    recorder.move(100, 100, t=0.0)
+    for i in range(1, 11):
+        recorder.move(100 + i, 100, t=i * 0.001)  # 1 px per ms, ten times
+    recorder.button('left', True, t=0.0105)
+    recorder.button('left', False, t=0.012)
+    lines = compress(recorder.events)
+    moves = [text for _, texts in lines for text in texts if text.startswith('move_mouse_relative')]
+    # Fewer moves than points, and they add up to the click position
+    assert len(moves) < 10
+    assert sum(int(text.split()[1]) for text in moves) == 10
+    assert lines[-1][1][-1] == 'click_mouse left'
+
+
+def test_close_actions_share_a_line_and_parse_back():
+    recorder = Recorder()
+    recorder.key('shift', True, t=0.0)
+    recorder.key('e', True, t=0.003)
+    recorder.key('e', False, t=0.05)
+    recorder.key('shift', False, t=0.052)
+    lines = compress(recorder.events)
+    assert lines == [(0, ['key_down shift', 'key_down e']), (50, ['key_up e', 'key_up shift'])]
+
+    text = format_timeline(lines, "rec", trigger='f1')
+    _, timelines, errors = parse_lines(text.splitlines())
+    assert errors == 0 and compile_timelines(timelines, lambda target: None, RecordingBackend()) == 0
+    assert timelines[0].trigger_keys == ['f1'] and len(timelines[0].plan) == 4
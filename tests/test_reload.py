@@ -0,0 +1,84 @@
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.plan import compile_timelines
+from src.reload import ConfigWatcher
+from src.triggers import TriggerIndex
+
+CONFIG = """
+[Timeline: shot]
+Trigger: e
+0 press_key a
+
+[Timeline: other]
+Trigger: q
+0 press_key q
+"""
+
+
+def start_watcher(tmp_path, text=CONFIG):
+    path = tmp_path / "config.ini"
+    path.write_text(text, encoding='utf-8')
+    backend = RecordingBackend()
+    settings, timelines, errors = parse_lines(text.splitlines())
+    assert errors == 0
+    compile_timelines(timelines, lambda target: None, backend)
+    watcher = ConfigWatcher(str(path), timelines, TriggerIndex(timelines), settings, lambda target: None, backend)
+    return path, watcher
+
+
+def plan_commands(timeline):
+    return [(a.command, a.args) for a in timeline.plan]
+
+
+def test_parse_lines_counts_skipped_lines():
+    _, timelines, errors = parse_lines("""
+[Timeline: shot]
+Mode: Loop
+Period: fast
+Overrun: never
+abc press_key a
+press_key b
+10 press_key c
+""".splitlines())
+    assert errors == 4
+    assert timelines[0].actions == [(0.01, 'press_key', ['c'])]
+
+
+def test_changed_section_is_reloaded(tmp_path):
+    path, watcher = start_watcher(tmp_path)
+    old_shot, other = watcher.timelines
+    path.write_text(CONFIG.replace("0 press_key a", "10 press_key b"), encoding='utf-8')
+    assert watcher.check()
+    index = watcher.apply()
+    new_shot = watcher.timelines[0]
+    assert old_shot.replaced_by is new_shot
+    assert plan_commands(new_shot)[0] == ('press_key', ('b',))
+    assert watcher.timelines[1] is other  # Unchanged section kept as is
+    assert watcher.index is index and watcher.reloads == 1
+
+
+def test_reload_with_invalid_line_is_rejected(tmp_path):
+    path, watcher = start_watcher(tmp_path)
+    live = list(watcher.timelines)
+    # A typo in the timestamp used to drop the line and reload the rest
+    path.write_text(CONFIG.replace("0 press_key a", "0 press_key a\n1O press_key b"), encoding='utf-8')
+    assert not watcher.check()
+    assert watcher.pending is None and watcher.rejected == 1
+    assert watcher.timelines == live and live[0].replaced_by is None
+    assert plan_commands(live[0]) == [('press_key', ('a',))]
+
+    # Fixing the line stages the reload (a different size, so coarse mtimes cannot hide it)
+    path.write_text(CONFIG.replace("0 press_key a", "0 press_key a\n100 press_key b"), encoding='utf-8')
+    assert watcher.check()
+    watcher.apply()
+    assert plan_commands(watcher.timelines[0]) == [('press_key', ('a',)), ('press_key', ('b',))]
+
+
+def test_changed_template_rebuilds_the_timelines_using_it(tmp_path):
+    text = "[Template: tap]\nParams: k\n0 press_key $k\n\n" + CONFIG.replace("0 press_key a", "0 use tap a")
+    path, watcher = start_watcher(tmp_path, text)
+    assert plan_commands(watcher.timelines[0]) == [('press_key', ('a',))]
+    path.write_text(text.replace("0 press_key $k", "0 press_key $k\n20 press_key $k"), encoding='utf-8')
+    assert watcher.check()
+    watcher.apply()
+    assert plan_commands(watcher.timelines[0]) == [('press_key', ('a',)), ('press_key', ('a',))]
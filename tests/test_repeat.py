@@ -0,0 +1,105 @@
+import pytest
+
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.plan import compile_timelines, iter_plan
+from src.runners import LoopRun, OneShotRun
+
+REPEAT = """
+[Timeline: farm]
+0 press_key a
+0 repeat 3 100
+0 click_mouse left
+20 repeat 2 10 press_key b
+end
+150 press_key c
+"""
+
+TEMPLATES = """
+[Template: combo]
+Params: key, gap=30
+0 press_key $key
+$gap press_key $key
+
+[Timeline: shot]
+0 use combo q
+100 use combo e 50
+2f use combo w
+"""
+
+
+def compile_text(text):
+    _, timelines, errors = parse_lines(text.splitlines())
+    rejected = compile_timelines(timelines, lambda target: None, RecordingBackend())
+    return {t.name: t for t in timelines}, errors, rejected
+
+
+def walk(timeline):
+    return [(round(offset * 1000, 3), action.command, action.args) for offset, action in iter_plan(timeline.plan)]
+
+
+def test_repeat_block_is_one_plan_entry_expanded_in_time_order():
+    timelines, errors, rejected = compile_text(REPEAT)
+    assert (errors, rejected) == (0, 0)
+    farm = timelines['farm']
+    assert [a.command for a in farm.plan] == ['press_key', 'repeat', 'press_key']
+    assert walk(farm) == [
+        (0.0, 'press_key', ('a',)), (0.0, 'click_mouse', ('left',)),
+        (20.0, 'press_key', ('b',)), (30.0, 'press_key', ('b',)),
+        (100.0, 'click_mouse', ('left',)), (120.0, 'press_key', ('b',)), (130.0, 'press_key', ('b',)),
+        (150.0, 'press_key', ('c',)),
+        (200.0, 'click_mouse', ('left',)), (220.0, 'press_key', ('b',)), (230.0, 'press_key', ('b',)),
+    ]
+
+
+def test_templates_expand_with_arguments_defaults_and_shift():
+    timelines, errors, rejected = compile_text(TEMPLATES)
+    assert (errors, rejected) == (0, 0)
+    assert walk(timelines['shot']) == [
+        (0.0, 'press_key', ('q',)), (30.0, 'press_key', ('q',)),
+        (33.333, 'press_key', ('w',)),  # `2f` at 60 FPS
+        (63.333, 'press_key', ('w',)),
+        (100.0, 'press_key', ('e',)), (150.0, 'press_key', ('e',)),
+    ]
+
+
+@pytest.mark.parametrize("lines, expected", [
+    ("0 repeat 3\nend", 2),  # No period, so its `end` has no block either
+    ("end", 1),  # Without repeat
+    ("0 use nosuch", 1),
+    ("0 use", 1),
+    ("0 use combo", 1),  # Missing value for $key
+    ("0 repeat 2 100\n0 press_key a", 1),  # Not closed
+])
+def test_block_and_template_mistakes_are_counted(lines, expected):
+    text = "[Template: combo]\nParams: key\n0 press_key $key\n\n[Timeline: t]\n" + lines + "\n"
+    _, _, errors = parse_lines(text.splitlines())
+    assert errors == expected
+
+
+def test_recursive_template_is_refused():
+    _, timelines, errors = parse_lines("[Template: loop]\n0 use loop\n\n[Timeline: t]\n0 use loop\n".splitlines())
+    assert errors == 1 and timelines[0].actions == []
+
+
+def test_run_streams_the_repetitions(engine):
+    farm = engine.load(REPEAT)['farm']
+    run = engine.start(OneShotRun, farm)
+    engine.advance(1.0)
+    assert run.finished
+    times = [round(at * 1000, 3) for at, _, _ in engine.events()]
+    assert times == [0, 0, 20, 30, 100, 120, 130, 150, 200, 220, 230]
+
+
+def test_loop_cycles_restart_the_repeat(engine):
+    t = engine.load("""
+[Timeline: loop]
+Mode: Loop
+Period: 0.1
+0 repeat 2 20 press_key a
+""")['loop']
+    run = engine.start(LoopRun, t)
+    engine.advance(0.25)
+    run.stop()
+    engine.advance(0.3)
+    assert [round(at * 1000, 3) for at, _, _ in engine.events()] == [0, 20, 100, 120, 200, 220]
@@ -0,0 +1,172 @@
+import pytest
+
+from src.runners import RELEASE_DEBOUNCE, RELEASE_POLL, HoldRun, LoopRun, OneShotRun
+
+ONESHOT = """
+[Timeline: shot]
+Trigger: e
+0 press_key a
+10 press_key b
+"""
+
+HOLD = """
+[Timeline: hold]
+Trigger: r
+Mode: Hold
+0 key_down a
+0 mouse_down left
+10 key_down b
+20 key_up b
+"""
+
+
+def loop_config(timing: str, overrun: str = 'skip') -> str:
+    return f"""
+[Timeline: loop]
+Mode: Loop
+{timing}
+Overrun: {overrun}
+0 press_key a
+"""
+
+
+def press_times(engine, key='a'):
+    return [at for at, _, args in engine.events('press_key') if args == (key,)]
+
+
+# --- OneShot: release debounce ---
+
+def test_oneshot_runs_plan_then_waits_for_release(engine):
+    t = engine.load(ONESHOT)['shot']
+    engine.keys.add('e')
+    run = engine.start(OneShotRun, t, 'e')
+    engine.advance(0.1)
+    assert [(at, args) for at, _, args in engine.events()] == [(0.0, ('a',)), (0.01, ('b',))]
+    assert not run.finished and t.is_running  # Key still held
+
+    engine.keys.discard('e')
+    engine.advance(0.1 + RELEASE_DEBOUNCE - 0.001)
+    assert not run.finished  # Release seen, not confirmed yet
+    engine.advance(0.1 + RELEASE_POLL + RELEASE_DEBOUNCE)
+    assert run.finished and not t.is_running
+    assert engine.scheduler.pending() == 0
+
+
+def test_oneshot_release_bounce_is_ignored(engine):
+    t = engine.load(ONESHOT)['shot']
+    engine.keys.add('e')
+    run = engine.start(OneShotRun, t, 'e')
+    engine.advance(0.1)
+    engine.keys.discard('e')
+    engine.advance(0.115)  # Release seen by a poll...
+    engine.keys.add('e')  # ...but the key is pressed again before the debounce confirms it
+    engine.advance(0.3)
+    assert not run.finished
+    engine.keys.discard('e')
+    engine.advance(0.5)
+    assert run.finished
+    assert len(press_times(engine)) == 1  # The plan ran once
+
+
+def test_oneshot_without_trigger_key_finishes_with_its_plan(engine):
+    t = engine.load(ONESHOT)['shot']
+    run = engine.start(OneShotRun, t)
+    engine.advance(0.01)
+    assert run.finished and not t.is_running
+
+
+# --- Hold: cleanup ---
+
+def test_hold_releases_what_it_holds_on_trigger_release(engine):
+    t = engine.load(HOLD)['hold']
+    engine.keys.add('r')
+    run = engine.start(HoldRun, t, 'r')
+    engine.advance(0.05)
+    assert not run.finished
+    assert [(e, args) for _, e, args in engine.events()] == [
+        ('key_down', ('a',)), ('mouse_down', ('left',)), ('key_down', ('b',)), ('key_up', ('b',))]
+
+    engine.keys.discard('r')
+    engine.advance(0.1)
+    assert run.finished and not t.is_running
+    cleanup = [(e, args) for _, e, args in engine.events()[4:]]
+    assert sorted(cleanup) == [('key_up', ('a',)), ('mouse_up', ('left',))]  # b was already released
+
+
+def test_hold_stop_mid_plan_releases_and_sends_nothing_after(engine):
+    t = engine.load(HOLD)['hold']
+    engine.keys.add('r')
+    run = engine.start(HoldRun, t, 'r')
+    engine.advance(0.005)
+    run.stop()
+    engine.advance(0.1)
+    assert run.finished and not t.is_running
+    assert [(e, args) for _, e, args in engine.events()][:2] == [('key_down', ('a',)), ('mouse_down', ('left',))]
+    assert sorted((e, args) for _, e, args in engine.events()[2:]) == [('key_up', ('a',)), ('mouse_up', ('left',))]
+    assert engine.scheduler.pending() == 0
+
+
+# --- Loop: stop during the interval wait ---
+
+def test_loop_stop_during_interval_wait(engine):
+    t = engine.load(loop_config("Interval: 0.1"))['loop']
+    run = engine.start(LoopRun, t)
+    engine.advance(0.05)  # First cycle done, waiting for the interval
+    assert press_times(engine) == [0.0]
+    run.stop()
+    engine.advance(1.0)
+    assert press_times(engine) == [0.0]
+    assert run.finished and not t.is_running
+    assert engine.scheduler.pending() == 0
+
+
+def test_loop_interval_follows_the_last_action(engine):
+    t = engine.load(loop_config("Interval: 0.1"))['loop']
+    engine.start(LoopRun, t)
+    engine.advance(0.35)
+    assert press_times(engine) == pytest.approx([0.0, 0.1, 0.2, 0.3])
+
+
+# --- Fixed-rate loops: period and overrun ---
+
+def test_fixed_rate_cycles_stay_on_the_grid(engine):
+    t = engine.load(loop_config("Period: 0.01"))['loop']
+    run = engine.start(LoopRun, t)
+    engine.advance(0.0955, late=0.0003)  # Every wake-up a little late
+    # Lateness does not accumulate: cycle k still starts 0.3 ms after k * period
+    assert press_times(engine) == pytest.approx([0.0] + [k * 0.01 + 0.0003 for k in range(1, 10)])
+    assert run.stats.missed == 0 and run.stats.stretched == 0
+
+
+def test_stretch_ignores_normal_lateness(engine):
+    t = engine.load(loop_config("Period: 0.01", 'stretch'))['loop']
+    run = engine.start(LoopRun, t)
+    engine.advance(0.0955, late=0.0003)
+    assert press_times(engine) == pytest.approx([0.0] + [k * 0.01 + 0.0003 for k in range(1, 10)])
+    assert run.stats.stretched == 0
+
+
+@pytest.mark.parametrize("overrun, expected, missed, stretched", [
+    # The cycles due at 0.01, 0.02 and 0.03 are overdue when the loop wakes up at 0.035
+    ('skip', [0.0, 0.035, 0.04, 0.05], 2, 0),
+    ('catchup', [0.0, 0.035, 0.035, 0.035, 0.04, 0.05], 0, 0),
+    ('stretch', [0.0, 0.035, 0.045], 0, 1),
+])
+def test_fixed_rate_overrun(engine, overrun, expected, missed, stretched):
+    t = engine.load(loop_config("Period: 0.01", overrun))['loop']
+    run = engine.start(LoopRun, t)
+    engine.advance(0.0)
+    engine.jump(0.035)  # The dispatch thread stalled past three deadlines
+    engine.advance(0.0505)
+    assert press_times(engine) == pytest.approx(expected)
+    assert run.stats.missed == missed and run.stats.stretched == stretched
+
+
+def test_fixed_rate_loop_with_empty_plan(engine):
+    t = engine.load("[Timeline: loop]\nMode: Loop\nPeriod: 0.05\n")['loop']
+    run = engine.start(LoopRun, t)
+    engine.advance(0.2)
+    assert run.stats.cycles == 5
+    run.stop()
+    engine.advance(0.3)
+    assert run.finished and not t.is_running
@@ -0,0 +1,31 @@
+def test_runs_due_events_in_deadline_order(engine):
+    order = []
+    engine.scheduler.call_at(0.02, order.append, 'late')
+    engine.scheduler.call_at(0.01, order.append, 'first')
+    engine.scheduler.call_at(0.01, order.append, 'second')  # Same deadline: scheduling order
+    assert engine.scheduler.run_pending() == 0.01
+    assert order == []
+    engine.advance(0.015)
+    assert order == ['first', 'second']
+    engine.advance(0.02)
+    assert order == ['first', 'second', 'late']
+    assert engine.scheduler.run_pending() is None
+
+
+def test_cancelled_event_does_not_run(engine):
+    order = []
+    handle = engine.scheduler.call_at(0.01, order.append, 'cancelled')
+    engine.scheduler.call_at(0.02, order.append, 'kept')
+    engine.scheduler.cancel(handle)
+    assert engine.scheduler.pending() == 1
+    engine.advance(0.05)
+    assert order == ['kept']
+    engine.scheduler.cancel(handle)  # No-op once done
+
+
+def test_failing_event_does_not_stop_the_batch(engine):
+    order = []
+    engine.scheduler.call_at(0.01, lambda: 1 / 0)
+    engine.scheduler.call_at(0.01, order.append, 'after')
+    engine.advance(0.01)
+    assert order == ['after']
@@ -0,0 +1,78 @@
+import pytest
+
+from src import control
+from src.log import log
+from src.simulate import Simulation, parse_script
+
+CONFIG = """
+[Timeline: shot]
+Trigger: e
+0 press_key a
+10 press_key b
+
+[Timeline: game only]
+Trigger: f
+Target: Game
+0 press_key c
+
+[Timeline: loop]
+Trigger: l
+Mode: Loop
+Interval: 0.1
+0 press_key d
+"""
+
+
+@pytest.fixture
+def simulate(tmp_path, monkeypatch):
+    """Run a script against CONFIG; returns the (time_ms, kind, text) trace."""
+    # The simulation routes control's module state to its own engine and backend
+    for name in ('engine', 'backend', 'pool', 'telemetry', 'key_check'):
+        monkeypatch.setattr(control, name, getattr(control, name, None))
+    monkeypatch.setattr(log, 'auto_flush', log.auto_flush)
+    monkeypatch.setattr(log, 'stream', log.stream)
+    monkeypatch.setattr(log, 'level', log.level)
+    config = tmp_path / "config.ini"
+    config.write_text(CONFIG, encoding='utf-8')
+
+    def run(script: str):
+        path = tmp_path / "script.txt"
+        path.write_text(script, encoding='utf-8')
+        events, end = parse_script(str(path))
+        trace = Simulation(str(config)).run(events, end)
+        return [(round(t * 1000, 3), kind, text) for t, kind, text in trace if kind != 'log']
+    return run
+
+
+def actions(trace):
+    return [(t, text) for t, kind, text in trace if kind == 'action']
+
+
+def test_oneshot_runs_at_virtual_time(simulate):
+    trace = simulate("100 press e\n300 release e\n500 end\n")
+    assert actions(trace) == [(100.0, 'press_key a'), (110.0, 'press_key b')]
+
+
+def test_same_script_gives_the_same_trace(simulate):
+    script = "0 window Game\n100 press e\n150 press f\n200 release f\n300 release e\n500 end\n"
+    assert simulate(script) == simulate(script)
+
+
+def test_window_filter_follows_the_script(simulate):
+    trace = simulate("0 window Notepad\n100 press f\n150 release f\n"
+                     "500 window Game\n600 press f\n650 release f\n800 end\n")
+    assert actions(trace) == [(600.0, 'press_key c')]
+
+
+def test_loop_toggles_on_and_off(simulate):
+    trace = simulate("100 press l\n150 release l\n520 press l\n570 release l\n1000 end\n")
+    assert [t for t, _ in actions(trace)] == [100.0, 200.0, 300.0, 400.0, 500.0]
+
+
+def test_script_lines_that_cannot_run_are_skipped(tmp_path):
+    path = tmp_path / "script.txt"
+    path.write_text("# comment\nsoon press e\n100 jump e\n200 press notakey\n"
+                    "300 press e ; inline comment\n400 release e\n", encoding='utf-8')
+    events, end = parse_script(str(path))
+    assert events == [(0.3, 'press', 'e'), (0.4, 'release', 'e')]
+    assert end == pytest.approx(1.4)  # Last event + DEFAULT_TAIL
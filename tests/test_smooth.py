@@ -0,0 +1,65 @@
+import pytest
+
+from src.backends import RecordingBackend
+from src.control import parse_lines
+from src.plan import DEFAULT_STEP_RATE, compile_timelines, easing_function, smooth_steps
+from src.runners import OneShotRun
+
+
+def test_steps_end_exactly_on_the_target():
+    steps = smooth_steps(301, -7, 0.25)
+    assert len(steps) <= round(0.25 * DEFAULT_STEP_RATE)
+    assert (sum(s[1] for s in steps), sum(s[2] for s in steps)) == (301, -7)
+    assert steps[-1][0] == pytest.approx(0.25)
+    assert all(b[0] > a[0] for a, b in zip(steps, steps[1:]))
+
+
+def test_steps_without_movement_are_dropped():
+    # 3 px over 100 steps: only the steps that change the rounded position remain
+    steps = smooth_steps(3, 0, 1.0, rate=100)
+    assert [(dx, dy) for _, dx, dy in steps] == [(1, 0), (1, 0), (1, 0)]
+
+
+def test_easing_shapes_the_step_times():
+    ease_in = lambda p: p * p
+    linear = smooth_steps(100, 0, 1.0, rate=10)
+    eased = smooth_steps(100, 0, 1.0, ease_in, rate=10)
+    assert [dx for _, dx, _ in linear] == [10] * 10
+    assert [dx for _, dx, _ in eased] == [1, 3, 5, 7, 9, 11, 13, 15, 17, 19]
+    assert easing_function('Linear')(0.3) == 0.3
+    with pytest.raises(ValueError):
+        easing_function('bouncy')
+
+
+def test_drag_holds_the_button_for_the_whole_move(engine):
+    t = engine.load("""
+[Timeline: drag]
+0 drag 40 20 100 right 20
+""")['drag']
+    engine.start(OneShotRun, t)
+    engine.advance(0.5)
+    events = engine.events()
+    assert (events[0][1:], events[-1][1:]) == (('mouse_down', ('right',)), ('mouse_up', ('right',)))
+    moves = [(at, args) for at, name, args in events if name == 'move_mouse_relative']
+    assert [round(at, 6) for at, _ in moves] == [0.05, 0.1]  # 20 steps/s over 100 ms
+    assert (sum(a[0] for _, a in moves), sum(a[1] for _, a in moves)) == (40, 20)
+    assert events[-1][0] == pytest.approx(0.1)
+
+
+def test_smooth_move_in_frames(engine):
+    t = engine.load("[Timeline: t]\nFPS: 50\n0 move_mouse_smooth 10 0 5f linear 50\n")['t']
+    engine.start(OneShotRun, t)
+    engine.advance(0.5)
+    assert [round(at, 6) for at, _, _ in engine.events()] == [0.02, 0.04, 0.06, 0.08, 0.1]
+
+
+@pytest.mark.parametrize("line", [
+    "0 move_mouse_smooth 10 0",  # No duration
+    "0 move_mouse_smooth 10 0 0",
+    "0 move_mouse_smooth 10 0 100 -5",
+    "0 move_mouse_smooth 10 0 100 bouncy",
+])
+def test_invalid_smooth_moves_are_rejected(line):
+    _, timelines, _ = parse_lines(["[Timeline: t]", line])
+    assert compile_timelines(timelines, lambda target: None, RecordingBackend()) == 1
+    assert timelines[0].plan == ()
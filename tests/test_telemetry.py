@@ -0,0 +1,40 @@
+import pytest
+
+from src.runners import LoopRun, OneShotRun
+from src.telemetry import Telemetry
+
+WAIT_FIRST = """
+[Timeline: wait first]
+0 wait 0.01
+0 press_key a
+5 press_key b
+"""
+
+
+def test_actions_are_recorded_with_their_deadlines(engine):
+    telemetry = Telemetry(clock=engine.clock)
+    t = engine.load("[Timeline: shot]\n0 press_key a\n10 press_key b\n")['shot']
+    engine.start(OneShotRun, t, telemetry=telemetry)
+    engine.advance(0.0105, late=0.0005)
+    records = list(telemetry.records())
+    assert [(r[1], r[2]) for r in records] == [('press_key', 0), ('press_key', 1)]
+    assert [r[5] - r[4] for r in records] == pytest.approx([0.0, 0.0005])
+
+
+def test_trigger_latency_is_taken_on_the_first_action_sent(engine):
+    telemetry = Telemetry(clock=engine.clock)
+    t = engine.load(WAIT_FIRST)['wait first']
+    engine.start(OneShotRun, t, detected_at=-0.002, telemetry=telemetry)
+    engine.advance(0.05)
+    trigger = telemetry.summary()['wait first']['trigger']
+    assert trigger['n'] == 1  # The wait sends nothing; the press after it is the first action
+    assert trigger['p50_us'] == pytest.approx(12000)
+
+
+def test_loop_trigger_latency_counts_the_first_cycle_only(engine):
+    telemetry = Telemetry(clock=engine.clock)
+    t = engine.load("[Timeline: loop]\nMode: Loop\nPeriod: 0.01\n0 press_key a\n")['loop']
+    engine.start(LoopRun, t, detected_at=0.0, telemetry=telemetry)
+    engine.advance(0.045)
+    summary = telemetry.summary()['loop']
+    assert summary['lateness']['n'] == 5 and summary['trigger']['n'] == 1
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from src.control import Timeline
+from src.triggers import QueueTriggerSource, TriggerIndex
+
+VK_CTRL = 0x11
+VK_E = 0x45
+VK_G = 0x47
+
+
+def index_for(*keys):
+    t = Timeline("t")
+    t.trigger_keys = list(keys)
+    return TriggerIndex([t])
+
+
+def index_of(**triggers):
+    """One timeline per keyword, named after it, with that trigger."""
+    timelines = []
+    for name, spec in triggers.items():
+        t = Timeline(name)
+        t.trigger_keys = [spec]
+        timelines.append(t)
+    return TriggerIndex(timelines)
+
+
+def key(index, vk, pressed, now=0.0):
+    """Push one key edge; returns the names of the timelines that fire."""
+    if not index.update(vk, pressed):
+        return []
+    return [t.name for t, _ in index.triggered(vk, pressed, now)]
+
+
+def run_source(source, until):
+    """Run `source` on a thread until `until(seen)` holds or a second has passed."""
+    seen = []
+    thread = threading.Thread(target=source.run, args=(lambda vk, pressed, at: seen.append((vk, pressed)),))
+    thread.start()
+    deadline = time.perf_counter() + 1.0
+    while not until(seen) and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    source.stop()
+    thread.join()
+    return seen
+
+
+def test_queue_source_drops_auto_repeat_and_unsubscribed_keys():
+    source = QueueTriggerSource(index_for('e'))
+    source.push(VK_E, True)
+    source.push(VK_E, True)  # Auto-repeat
+    source.push(0x46, True)  # Nobody listens to F
+    source.push(VK_E, False)
+    assert run_source(source, lambda seen: len(seen) >= 2) == [(VK_E, True), (VK_E, False)]
+
+
+def test_lost_release_is_reconciled_with_the_real_key_state():
+    real = {VK_E: True}
+    source = QueueTriggerSource(index_for('e'), read_vk=lambda vk: real.get(vk, False),
+                                reconcile_interval=0.005)
+    source.push(VK_E, True)
+    real[VK_E] = False  # Released, but the release event never arrives
+    seen = run_source(source, lambda seen: len(seen) >= 2)
+    assert seen == [(VK_E, True), (VK_E, False)]
+    assert not source.index.state
+
+
+# --- Chords, multi-tap and hold ---
+
+def test_chord_fires_in_either_order():
+    index = index_of(chord='ctrl+e')
+    assert key(index, VK_E, True) == []  # Chord incomplete
+    assert key(index, VK_CTRL, True) == ['chord']
+    key(index, VK_CTRL, False)
+    key(index, VK_E, False)
+    assert key(index, VK_CTRL, True) == []
+    assert key(index, VK_E, True) == ['chord']
+
+
+def test_chord_shadows_the_bare_key():
+    index = index_of(bare='g', chord='ctrl+g')
+    key(index, VK_CTRL, True)
+    assert key(index, VK_G, True) == ['chord']  # Not 'bare' as well
+    key(index, VK_G, False)
+    key(index, VK_CTRL, False)
+    assert key(index, VK_G, True) == ['bare']
+
+
+def test_multi_tap_needs_the_presses_within_the_window():
+    index = index_of(double='e*2@200')
+    assert key(index, VK_E, True, 0.0) == []
+    key(index, VK_E, False, 0.05)
+    assert key(index, VK_E, True, 0.1) == ['double']
+    key(index, VK_E, False, 0.15)
+    assert key(index, VK_E, True, 0.5) == []  # Starts a new sequence
+    key(index, VK_E, False, 0.55)
+    assert key(index, VK_E, True, 0.8) == []  # 300 ms gap: too slow
+    key(index, VK_E, False, 0.85)
+    assert key(index, VK_E, True, 0.9) == ['double']
+
+
+def test_hold_fires_after_the_hold_time_unless_released():
+    index = index_of(hold='e>500')
+    assert key(index, VK_E, True, 0.0) == []
+    assert index.next_deadline() == 0.5
+    assert index.due(0.4) == []
+    assert [t.name for t, _ in index.due(0.5)] == ['hold']
+    assert index.due(1.0) == []  # Fires once per press
+
+    key(index, VK_E, False, 1.1)
+    key(index, VK_E, True, 2.0)
+    key(index, VK_E, False, 2.3)  # Released early
+    assert index.due(3.0) == [] and index.next_deadline() is None